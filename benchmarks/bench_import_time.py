@@ -0,0 +1,72 @@
+"""Benchmark of CLI startup time.
+
+Runs the CLI in fresh interpreters and prints median wall time of
+importing the main module and of light commands (e.g. '--version').
+Exits with code 1 if some median exceeds the budget.
+Run it from project root::
+
+    python benchmarks/bench_import_time.py [budget in ms]
+"""
+import statistics
+import subprocess
+import sys
+import time
+from typing import List, Tuple
+
+
+RUNS: int = 7
+BUDGET_MS: float = 250.0
+
+SCENARIOS: List[Tuple[str, List[str]]] = [
+    ("python (baseline)", ["-c", "pass"]),
+    ("import playlist_along.cli", ["-c", "import playlist_along.cli"]),
+    ("playlist-along --version", ["-m", "playlist_along", "--version"]),
+    ("playlist-along --help", ["-m", "playlist_along", "--help"]),
+]
+
+# These modules must not be imported until a command really needs them
+HEAVY_MODULES: List[str] = ["charset_normalizer", "mutagen", "natsort", "sqlite3"]
+
+
+def measure(args: List[str]) -> float:
+    """Return median wall time (in ms) of running Python with arguments."""
+    timings: List[float] = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], check=True, capture_output=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def find_heavy_imports() -> List[str]:
+    """Return heavy modules, which are imported with the main module."""
+    code = (
+        "import sys, playlist_along.cli; "
+        f"print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    )
+    return result.stdout.split()
+
+
+def main() -> int:
+    """Print startup timings and return non-zero code if budget is exceeded."""
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else BUDGET_MS
+    exceeded = False
+    print(f"{'scenario':<28} {'median ms':>10}")
+    for name, args in SCENARIOS:
+        median = measure(args)
+        exceeded = exceeded or median > budget
+        print(f"{name:<28} {median:>10.1f}")
+    heavy_imports = find_heavy_imports()
+    if heavy_imports:
+        print(f"Imported eagerly: {', '.join(heavy_imports)}")
+    if exceeded or heavy_imports:
+        print(f"Startup budget ({budget:.0f} ms) is exceeded or startup is heavy.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+"""Benchmark suite of playlist operations.
+
+Generates synthetic playlists in each supported encoding (and folders
+with empty audio files), times main operations on them and saves
+results into a JSON file. Results of a previous run can be compared
+with current ones, the script exits with code 1 on regressions.
+Run it from project root::
+
+    python benchmarks/bench_suite.py --output bench.json
+    python benchmarks/bench_suite.py --lines 1000 100000 --compare bench.json
+"""
+import argparse
+from datetime import datetime, timezone
+import json
+from pathlib import Path
+import platform
+import sys
+import tempfile
+import timeit
+from typing import Any, Callable, Dict, List, Optional
+
+from playlist_along import _utils
+from playlist_along import playlist
+from playlist_along.cli import cli_main
+from playlist_along.commands.inject import inject_content
+
+
+LINE_COUNTS: List[int] = [1_000, 100_000, 1_000_000]
+FILE_COUNTS: List[int] = [100, 1_000, 10_000]
+# Some characters of titles which are valid for each encoding
+ENCODINGS: Dict[str, str] = {
+    "utf-8": "Трек ♪",
+    "utf-8-sig": "Трек ♪",
+    "cp1251": "Трек",
+    "cp1252": "Chanson à",
+    "utf_16_le": "Трек ♪",
+}
+# Relative slowdown, which is treated as regression
+REGRESSION_THRESHOLD: float = 0.2
+
+Result = Dict[str, Any]
+
+
+def generate_playlist_lines(line_count: int, title: str) -> List[str]:
+    """Return lines of extended M3U playlist (without line ends)."""
+    lines: List[str] = ["#EXTM3U"]
+    for i in range(1, (line_count - 1) // 2 + 1):
+        lines.append(f"#EXTINF:{i % 600},Artist {i} - {title} [{i}]")
+        lines.append(f"D:\\Music\\Album #{i % 100}\\Artist {i} - {title} [{i}].mp3")
+    return lines
+
+
+def write_playlist(path: Path, lines: List[str], encoding: str) -> None:
+    """Write playlist in encoding (UTF-16 with BOM, like AIMP does)."""
+    content = "\n".join(lines) + "\n"
+    if encoding == "utf_16_le":
+        content = "\ufeff" + content
+    path.write_bytes(content.encode(encoding))
+
+
+def time_best(action: Callable[[], Any], repeat: int) -> float:
+    """Return the best time (in seconds) of several runs."""
+    return min(timeit.repeat(action, number=1, repeat=repeat))
+
+
+def detect_encoding(path: Path) -> str:
+    """Detect encoding without cached results."""
+    _utils.encoding_cache.clear()
+    return _utils._detect_file_encoding(path)
+
+
+def bench_playlists(folder: Path, line_counts: List[int]) -> List[Result]:
+    """Time playlist operations for each encoding and size."""
+    results: List[Result] = []
+    for encoding, title in ENCODINGS.items():
+        for line_count in line_counts:
+            path = folder / f"{encoding}_{line_count}.m3u8"
+            write_playlist(path, generate_playlist_lines(line_count, title), encoding)
+            content = path.read_text(encoding=encoding)
+            repeat = max(1, min(5, 1_000_000 // line_count))
+            actions: Dict[str, Callable[[], Any]] = {
+                "_detect_file_encoding": lambda: detect_encoding(path),
+                "get_local_tracks_without_comment_lines": lambda: (
+                    playlist.get_local_tracks_without_comment_lines(content)
+                ),
+                "get_playlist_for_vlc_android": lambda: (
+                    playlist.get_playlist_for_vlc_android(path, encoding)
+                ),
+                "inject_content": lambda: inject_content(content, content, True),
+            }
+            for name, action in actions.items():
+                seconds = time_best(action, repeat)
+                results.append(make_result(name, encoding, line_count, seconds))
+                print_result(results[-1])
+            path.unlink()
+    return results
+
+
+def bench_create(folder: Path, file_counts: List[int]) -> List[Result]:
+    """Time creating playlists from folders with empty audio files."""
+    results: List[Result] = []
+    for file_count in file_counts:
+        audio_folder = folder / f"audios_{file_count}"
+        audio_folder.mkdir()
+        for i in range(file_count):
+            (audio_folder / f"Track {i:06}.mp3").touch()
+        target = str(folder / "created.m3u8")
+        variants = {"create": [], "create --ext-m3u": ["--ext-m3u", "--no-cache"]}
+        for name, extra_args in variants.items():
+            args = ["-f", target, "create", "--from", str(audio_folder), *extra_args]
+            seconds = time_best(
+                lambda: cli_main.main(args, standalone_mode=False),
+                repeat=max(1, min(5, 10_000 // file_count)),
+            )
+            results.append(make_result(name, None, file_count, seconds, "files"))
+            print_result(results[-1])
+    return results
+
+
+def make_result(
+    name: str,
+    encoding: Optional[str],
+    size: int,
+    seconds: float,
+    unit: str = "lines",
+) -> Result:
+    """Return result of one measurement."""
+    return {
+        "name": name,
+        "encoding": encoding,
+        "size": size,
+        "unit": unit,
+        "seconds": seconds,
+        "us_per_item": seconds / size * 1_000_000,
+    }
+
+
+def result_key(result: Result) -> str:
+    """Return key of measurement for comparison between runs."""
+    return f"{result['name']} [{result['encoding'] or '-'}] {result['size']}"
+
+
+def print_result(result: Result) -> None:
+    """Print one measurement as a table row."""
+    print(
+        f"{result_key(result):<60} {result['seconds']:>10.4f} s "
+        f"{result['us_per_item']:>10.3f} us/{result['unit'][:-1]}"
+    )
+
+
+def compare_results(
+    current: List[Result], previous_file: Path, threshold: float
+) -> int:
+    """Print changes against previous run and return number of regressions."""
+    previous = json.loads(previous_file.read_text(encoding="utf-8"))
+    previous_seconds = {result_key(r): r["seconds"] for r in previous["results"]}
+    regressions = 0
+    print(f"\nComparison with {previous_file}:")
+    for result in current:
+        before = previous_seconds.get(result_key(result))
+        if not before:
+            continue
+        change = result["seconds"] / before - 1
+        is_regression = change > threshold
+        regressions += is_regression
+        mark = "REGRESSION" if is_regression else ""
+        print(f"{result_key(result):<60} {change:>+8.1%} {mark}")
+    return regressions
+
+
+def main() -> int:
+    """Run benchmarks, save results and compare them with previous ones."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, nargs="+", default=LINE_COUNTS)
+    parser.add_argument("--files", type=int, nargs="+", default=FILE_COUNTS)
+    parser.add_argument("--output", type=Path, help="JSON file for results")
+    parser.add_argument("--compare", type=Path, help="JSON file of previous run")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        results = bench_playlists(Path(temp_dir), args.lines)
+        results += bench_create(Path(temp_dir), args.files)
+
+    report = {
+        "version": 1,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=1), encoding="utf-8")
+    if args.compare and compare_results(results, args.compare, args.threshold):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
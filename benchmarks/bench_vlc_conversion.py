@@ -0,0 +1,46 @@
+"""Benchmark of playlist conversion for VLC for Android.
+
+Shows that conversion time grows linearly with number of lines.
+Run it from project root::
+
+    python benchmarks/bench_vlc_conversion.py
+"""
+import sys
+import timeit
+from typing import List
+
+from playlist_along import playlist
+
+
+LINE_COUNTS: List[int] = [1_000, 10_000, 100_000, 1_000_000]
+
+
+def generate_playlist_content(line_count: int) -> str:
+    """Return extended M3U content with 'line_count' lines."""
+    lines: List[str] = ["#EXTM3U"]
+    for i in range(1, (line_count - 1) // 2 + 1):
+        lines.append(f"#EXTINF:{i % 600},Artist {i} - Title [{i}]")
+        lines.append(f"D:\\Music\\Album #{i % 100}\\Artist {i} - Title [{i}].mp3")
+    return "\n".join(lines) + "\n"
+
+
+def convert(content: str) -> str:
+    """Convert content like 'get_playlist_for_vlc_android' does."""
+    converted_lines = playlist.convert_lines_for_vlc_android(content.splitlines())
+    return "".join(line + "\n" for line in converted_lines)
+
+
+def main() -> int:
+    """Print time per run and per line for each playlist size."""
+    print(f"{'lines':>10} {'seconds':>10} {'us/line':>10}")
+    for line_count in LINE_COUNTS:
+        content = generate_playlist_content(line_count)
+        repeat = max(1, 100_000 // line_count)
+        seconds = min(timeit.repeat(lambda: convert(content), number=1, repeat=repeat))
+        per_line = seconds / line_count * 1_000_000
+        print(f"{line_count:>10} {seconds:>10.4f} {per_line:>10.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
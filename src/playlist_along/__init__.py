@@ -1,8 +1,17 @@
 """Playlist Along."""
 from pathlib import Path
-
-from single_source import get_version
+from typing import Any
 
 
 path_to_project_dir = Path(__file__).parent.parent.parent
-__version__ = get_version(__name__, path_to_project_dir)
+
+
+def __getattr__(name: str) -> Any:
+    """Return version lazily (its retrieving is slow for CLI startup)."""
+    if name == "__version__":
+        from single_source import get_version
+
+        version = get_version(__name__, path_to_project_dir)
+        globals()["__version__"] = version
+        return version
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,269 @@
+"""Module with asyncio engine for slow (network) file systems.
+
+Python has no asynchronous file I/O, so blocking operations are run
+in worker threads and coroutines only schedule them. It lets a copy
+read the next chunk while the previous one is being written and bounds
+simultaneous operations per mount point of source files.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import os
+from pathlib import Path
+import shutil
+from typing import Any, Awaitable, BinaryIO, Callable, Dict, List, Optional, Set
+from typing import Sequence, TypeVar
+
+from ._copying import CopyReport, CopyTask, get_partial_path
+from ._throttling import CopyThrottle
+from ._transfer import TransferBackend
+
+
+T = TypeVar("T")
+
+CHUNK_SIZE: int = 1024 * 1024
+MAX_WORKERS: int = 64
+
+
+def get_mount_point(path: str, cache: Dict[str, str]) -> str:
+    """Return mount point (or drive) of file, cached by its folder."""
+    folder = os.path.dirname(os.path.abspath(path))
+    mount = cache.get(folder)
+    if mount is None:
+        mount = folder
+        while not os.path.ismount(mount):
+            parent = os.path.dirname(mount)
+            if parent == mount:
+                break
+            mount = parent
+        cache[folder] = mount
+    return mount
+
+
+class AsyncFileIO(object):
+    """Runner of blocking file operations from coroutines.
+
+    At most 'per_mount' files of each mount point are processed
+    simultaneously. Temporary files of unfinished copies are remembered,
+    so they are deleted on closing (e.g. after Ctrl+C).
+    """
+
+    def __init__(
+        self,
+        per_mount: int,
+        paths: Sequence[str],
+        threads_per_file: int = 1,
+        backend: Optional[TransferBackend] = None,
+    ) -> None:
+        """Initialization of class instance."""
+        self.per_mount: int = per_mount
+        self.backend: TransferBackend = backend or TransferBackend()
+        self.throttle: Optional[CopyThrottle] = self.backend.throttle
+        # Chunks are small with limited bandwidth (like in backend)
+        self.chunk_size: int = CHUNK_SIZE
+        if self.backend.on_chunk is not None:
+            self.chunk_size = self.backend.chunk_size
+        self.mounts: Dict[str, str] = {}
+        mount_count = len({get_mount_point(path, self.mounts) for path in paths})
+        workers = per_mount * threads_per_file * max(mount_count, 1)
+        self.executor = ThreadPoolExecutor(max_workers=min(workers, MAX_WORKERS))
+        self.partial: Set[Path] = set()
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def close(self) -> None:
+        """Wait for running operations and delete unfinished copies."""
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        for path in self.partial:
+            try:
+                path.unlink(missing_ok=True)
+            except OSError:
+                pass
+        self.partial.clear()
+
+    def limit(self, path: str) -> asyncio.Semaphore:
+        """Return semaphore of mount point of file."""
+        mount = get_mount_point(path, self.mounts)
+        if mount not in self._semaphores:
+            self._semaphores[mount] = asyncio.Semaphore(self.per_mount)
+        return self._semaphores[mount]
+
+    def start(self, func: Callable[..., T], *args: Any) -> "asyncio.Future[T]":
+        """Start blocking function in worker thread."""
+        return asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    def run(self, func: Callable[..., T], *args: Any) -> Awaitable[T]:
+        """Run blocking function in worker thread (for awaiting)."""
+        return self.start(func, *args)
+
+    async def wait_for_file(self) -> None:
+        """Wait until a file can be started (within rate limit)."""
+        if self.throttle is not None:
+            await asyncio.sleep(self.throttle.reserve_file())
+
+    async def wait_for_bytes(self, size: int) -> None:
+        """Wait until bytes can be written (within bandwidth limit)."""
+        if self.throttle is not None:
+            await asyncio.sleep(self.throttle.reserve_bytes(size))
+
+    async def map(self, func: Callable[[str], T], paths: Sequence[str]) -> List[T]:
+        """Return results of function for each file (in the same order)."""
+
+        async def run_limited(path: str) -> T:
+            async with self.limit(path):
+                return await self.run(func, path)
+
+        return list(await asyncio.gather(*(run_limited(path) for path in paths)))
+
+    async def copy_all(
+        self,
+        tasks: Sequence[CopyTask],
+        report: CopyReport,
+        on_progress: Optional[Callable[[int], None]] = None,
+        on_copied: Optional[Callable[[CopyTask], None]] = None,
+    ) -> None:
+        """Copy tracks and register results in report."""
+        await asyncio.gather(
+            *(self.copy_track(task, report, on_progress, on_copied) for task in tasks)
+        )
+
+    async def copy_track(
+        self,
+        task: CopyTask,
+        report: CopyReport,
+        on_progress: Optional[Callable[[int], None]] = None,
+        on_copied: Optional[Callable[[CopyTask], None]] = None,
+    ) -> None:
+        """Copy one track, errors are registered in report."""
+        copied = 0
+
+        def count_progress(size: int) -> None:
+            nonlocal copied
+            copied += size
+            if on_progress is not None:
+                on_progress(size)
+
+        async with self.limit(str(task.source)):
+            await self.wait_for_file()
+            try:
+                await self.copy_file(task.source, task.target, count_progress)
+            except OSError as error:
+                report.errors[str(task.source)] = str(error)
+                if on_progress is not None:
+                    on_progress(max(task.size - copied, 0))
+            else:
+                report.copied.append(str(task.source))
+                if on_copied is not None:
+                    on_copied(task)
+
+    async def copy_file(
+        self, source: Path, target: Path, on_progress: Callable[[int], None]
+    ) -> None:
+        """Copy file with its metadata via temporary file.
+
+        Target file appears only when copying is finished,
+        so it's never left incomplete. Hard link or clone of file
+        is tried first, content is copied by chunks only without them.
+
+        Args:
+            source: The path to file
+            target: The path to copy
+            on_progress: Called with number of bytes after each written chunk
+
+        Raises:
+            OSError: File can't be copied (temporary file is deleted)
+        """
+        temp = get_partial_path(target)
+        self.partial.add(temp)
+        try:
+            if await self.run(self.backend.link_or_clone, source, temp):
+                on_progress(await self.run(os.path.getsize, temp))
+            else:
+                await self.copy_chunks(source, temp, on_progress)
+                await self.run(shutil.copystat, source, temp)
+            await self.run(os.replace, temp, target)
+        except OSError:
+            await self.run(temp.unlink, True)
+            self.partial.discard(temp)
+            raise
+        self.partial.discard(temp)
+
+    async def copy_chunks(
+        self, source: Path, target: Path, on_progress: Callable[[int], None]
+    ) -> None:
+        """Copy content of file, reading next chunk while writing current one."""
+        reader: BinaryIO = await self.run(open, source, "rb")
+        try:
+            writer: BinaryIO = await self.run(open, target, "wb")
+            try:
+                await self._pipe_chunks(reader, writer, on_progress)
+            finally:
+                writer.close()
+        finally:
+            reader.close()
+
+    async def _pipe_chunks(
+        self, reader: BinaryIO, writer: BinaryIO, on_progress: Callable[[int], None]
+    ) -> None:
+        """Write chunks of reader into writer (only one chunk is read ahead)."""
+        next_read = self.start(reader.read, self.chunk_size)
+        try:
+            while True:
+                chunk = await next_read
+                if not chunk:
+                    return
+                next_read = self.start(reader.read, self.chunk_size)
+                await self.wait_for_bytes(len(chunk))
+                await self.run(writer.write, chunk)
+                on_progress(len(chunk))
+        except OSError:
+            # Files can be closed only after the last read
+            await asyncio.gather(next_read, return_exceptions=True)
+            raise
+
+
+def run_copy_tasks_async(
+    tasks: List[CopyTask],
+    report: CopyReport,
+    jobs: int = 1,
+    on_progress: Optional[Callable[[int], None]] = None,
+    on_copied: Optional[Callable[[CopyTask], None]] = None,
+    backend: Optional[TransferBackend] = None,
+) -> CopyReport:
+    """Copy tracks with asyncio engine (like 'run_copy_tasks' does).
+
+    Args:
+        tasks: Planned copy tasks
+        report: Report for registering copied and failed tracks
+        jobs: Number of simultaneous copies per mount point of sources
+        on_progress: Called with number of bytes after each written chunk
+        on_copied: Called with task of each copied track
+        backend: Transfer of files (hard link or clone is tried first)
+
+    Returns:
+        The same report, filled with results.
+    """
+    engine = AsyncFileIO(jobs, [str(task.source) for task in tasks], 2, backend)
+    try:
+        asyncio.run(engine.copy_all(tasks, report, on_progress, on_copied))
+    finally:
+        engine.close()
+    return report
+
+
+def map_files_async(
+    func: Callable[[str], T], paths: Sequence[str], jobs: int = 1
+) -> List[T]:
+    """Return results of blocking function for each file (in the same order).
+
+    Args:
+        func: Function, which reads file (e.g. its metadata)
+        paths: Paths to files
+        jobs: Number of files read simultaneously per mount point
+
+    Returns:
+        Results of function.
+    """
+    engine = AsyncFileIO(jobs, paths)
+    try:
+        return asyncio.run(engine.map(func, paths))
+    finally:
+        engine.close()
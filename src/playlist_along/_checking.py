@@ -0,0 +1,142 @@
+"""Module with bulk check of tracks availability."""
+from concurrent.futures import ThreadPoolExecutor
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Set, Tuple
+
+
+TRACK_OK: str = "ok"
+TRACK_MISSING: str = "missing"
+TRACK_UNREADABLE: str = "unreadable"
+
+# Index of track in playlist, track line and file name in its folder
+TrackItem = Tuple[int, str, str]
+
+
+class CheckReport(object):
+    """Outcome of checking tracks (in playlist order)."""
+
+    def __init__(self) -> None:
+        """Initialization of class instance."""
+        self.checked: int = 0
+        self.folders: int = 0
+        self.missing: List[str] = []
+        self.unreadable: List[str] = []
+        self.duplicates: List[str] = []
+
+
+def resolve_track(track: str, base: Path) -> str:
+    """Return path to track (relative one is relative to playlist folder).
+
+    Paths are strings, because pathlib is too slow for millions of tracks.
+    """
+    return os.path.abspath(os.path.join(base, track))
+
+
+def group_tracks_by_folder(
+    tracks: Iterable[str], base: Path, report: CheckReport
+) -> Dict[str, List[TrackItem]]:
+    """Return unique tracks grouped by their folders.
+
+    Repeated tracks are registered in the report as duplicates
+    (paths are compared as the OS does it).
+
+    Args:
+        tracks: Track lines of playlist
+        base: Folder of playlist
+        report: Report for registering duplicates
+
+    Returns:
+        Tracks of each folder in playlist order.
+    """
+    folders: Dict[str, List[TrackItem]] = {}
+    seen: Set[str] = set()
+    for index, track in enumerate(tracks):
+        report.checked += 1
+        path = resolve_track(track, base)
+        key = os.path.normcase(path)
+        if key in seen:
+            report.duplicates.append(track)
+            continue
+        seen.add(key)
+        folder, name = os.path.split(path)
+        folders.setdefault(folder, []).append((index, track, name))
+    report.folders = len(folders)
+    return folders
+
+
+def check_folder_tracks(
+    folder: str, items: List[TrackItem], readable: bool = False
+) -> List[Tuple[int, str]]:
+    """Return statuses of tracks from one folder, which is listed only once.
+
+    Names absent in the listing are checked one by one
+    (they can differ in case on case-insensitive file systems).
+    Read permission is probed for each file only with 'readable',
+    otherwise any listed file is available.
+
+    Args:
+        folder: Folder of tracks
+        items: Tracks of this folder
+        readable: Check read permission of each track
+
+    Returns:
+        Indexes of tracks with their statuses.
+    """
+    try:
+        with os.scandir(folder) as entries:
+            listed = {entry.name: entry.is_file() for entry in entries}
+    except (FileNotFoundError, NotADirectoryError):
+        return [(index, TRACK_MISSING) for index, _, _ in items]
+    except OSError:
+        return [(index, TRACK_UNREADABLE) for index, _, _ in items]
+    statuses: List[Tuple[int, str]] = []
+    for index, _, name in items:
+        path = os.path.join(folder, name)
+        is_file = listed.get(name)
+        if is_file is None:
+            if not os.path.exists(path):
+                statuses.append((index, TRACK_MISSING))
+                continue
+            is_file = os.path.isfile(path)
+        if is_file and (not readable or os.access(path, os.R_OK)):
+            statuses.append((index, TRACK_OK))
+        else:
+            statuses.append((index, TRACK_UNREADABLE))
+    return statuses
+
+
+def check_tracks(
+    tracks: Iterable[str], base: Path, jobs: int = 1, readable: bool = False
+) -> CheckReport:
+    """Return report of missing, unreadable and duplicate tracks.
+
+    Folders of tracks are checked by pool of 'jobs' workers simultaneously.
+
+    Args:
+        tracks: Track lines of playlist
+        base: Folder of playlist
+        jobs: Number of folders checked simultaneously
+        readable: Check read permission of each track
+
+    Returns:
+        Report with tracks in playlist order.
+    """
+    report = CheckReport()
+    folders = group_tracks_by_folder(tracks, base, report)
+    lines: Dict[int, str] = {
+        index: track for items in folders.values() for index, track, _ in items
+    }
+    statuses: Dict[int, str] = {}
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        for folder_statuses in executor.map(
+            lambda folder: check_folder_tracks(folder, folders[folder], readable),
+            folders,
+        ):
+            statuses.update(folder_statuses)
+    for index in sorted(statuses):
+        if statuses[index] == TRACK_MISSING:
+            report.missing.append(lines[index])
+        elif statuses[index] == TRACK_UNREADABLE:
+            report.unreadable.append(lines[index])
+    return report
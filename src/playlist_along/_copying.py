@@ -0,0 +1,446 @@
+"""Module with engine for copying tracks from playlist."""
+from concurrent.futures import as_completed, Future, ThreadPoolExecutor
+import hashlib
+import json
+import os
+from pathlib import Path
+import threading
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Set
+from typing import TextIO
+
+from ._transfer import TransferBackend
+
+
+SYNC_MANIFEST_NAME: str = ".playlist-along-sync.json"
+COPY_JOURNAL_NAME: str = ".playlist-along-copy.journal"
+PARTIAL_SUFFIX: str = ".part"
+
+# Locks of destination folders by their absolute paths
+_folder_locks: Dict[str, threading.Lock] = {}
+_folder_locks_lock = threading.Lock()
+
+
+class CopyTask(NamedTuple):
+    """One track to be copied into destination folder."""
+
+    source: Path
+    target: Path
+    size: int
+    mtime_ns: int = 0
+    digest: Optional[str] = None
+
+
+class CopyReport(object):
+    """Outcome of copying tracks (per track)."""
+
+    def __init__(self) -> None:
+        """Initialization of class instance."""
+        self.copied: List[str] = []
+        self.skipped: List[str] = []
+        self.missing: List[str] = []
+        self.errors: Dict[str, str] = {}
+        self.deleted: List[str] = []
+
+
+class SyncManifest(object):
+    """Tracks copied into destination folder during previous syncs.
+
+    Manifest is a JSON file in destination folder. Each record is stored
+    by file name and contains source path, size and modification time
+    (and content hash, if it was calculated).
+    """
+
+    def __init__(self, folder: Path) -> None:
+        """Initialization of class instance."""
+        self.path: Path = folder / SYNC_MANIFEST_NAME
+        self.tracks: Dict[str, Dict[str, Any]] = {}
+
+    @classmethod
+    def load(cls, folder: Path) -> "SyncManifest":
+        """Return manifest from folder (empty one if it is absent or broken)."""
+        manifest = cls(folder)
+        try:
+            data = json.loads(manifest.path.read_text(encoding="utf-8"))
+            manifest.tracks = dict(data["tracks"])
+        except (OSError, ValueError, KeyError, TypeError):
+            manifest.tracks = {}
+        return manifest
+
+    def save(self) -> None:
+        """Write manifest atomically (via temporary file)."""
+        temp_path = self.path.with_name(self.path.name + ".tmp")
+        content = json.dumps({"version": 1, "tracks": self.tracks}, indent=1)
+        temp_path.write_text(content, encoding="utf-8")
+        os.replace(temp_path, self.path)
+
+    def record(self, task: CopyTask) -> None:
+        """Remember a track as synced."""
+        self.tracks[task.target.name] = {
+            "source": str(task.source),
+            "size": task.size,
+            "mtime_ns": task.mtime_ns,
+            "sha256": task.digest,
+        }
+
+    def is_fresh(self, task: CopyTask) -> bool:
+        """Return True if the track was synced and source has not changed."""
+        record = self.tracks.get(task.target.name)
+        if record is None:
+            return False
+        return bool(
+            record.get("source") == str(task.source)
+            and record.get("size") == task.size
+            and record.get("mtime_ns") == task.mtime_ns
+        )
+
+
+class CopyJournal(object):
+    """Journal of tracks copied by unfinished copy job.
+
+    Journal is a file in destination folder with one JSON line
+    per copied track, appended right after the track is copied.
+    It's deleted when the job is finished without errors,
+    so an interrupted job can be resumed without checking copied tracks.
+    """
+
+    def __init__(self, folder: Path) -> None:
+        """Initialization of class instance."""
+        self.path: Path = folder / COPY_JOURNAL_NAME
+        self.copied: Set[str] = set()
+        self._file: Optional[TextIO] = None
+
+    @classmethod
+    def load(cls, folder: Path) -> "CopyJournal":
+        """Return journal from folder (empty one if it is absent).
+
+        Broken lines (e.g. the last one after power loss) are ignored.
+        """
+        journal = cls(folder)
+        try:
+            with open(journal.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        journal.copied.add(json.loads(line)["source"])
+                    except (ValueError, KeyError, TypeError):
+                        continue
+        except OSError:
+            journal.copied = set()
+        return journal
+
+    def open(self, resume: bool = False) -> None:
+        """Open journal for appending (a new job starts with empty journal)."""
+        self._file = open(self.path, "a" if resume else "w", encoding="utf-8")
+
+    def record(self, task: CopyTask) -> None:
+        """Append copied track to journal."""
+        self.copied.add(str(task.source))
+        if self._file is not None:
+            self._file.write(json.dumps({"source": str(task.source)}) + "\n")
+            self._file.flush()
+
+    def close(self, is_finished: bool = False) -> None:
+        """Close journal and delete it, if the job is finished."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if is_finished:
+            self.path.unlink(missing_ok=True)
+
+
+def lock_folder(folder: Path) -> threading.Lock:
+    """Return lock of destination folder (shared by all copy jobs of process).
+
+    Sync manifest and copy journal of folder are used by one job at a time
+    (e.g. when 'batch' copies tracks of several playlists into one folder).
+    """
+    key = os.path.normcase(os.path.abspath(folder))
+    with _folder_locks_lock:
+        return _folder_locks.setdefault(key, threading.Lock())
+
+
+def get_partial_path(target: Path) -> Path:
+    """Return path of temporary file for unfinished copy."""
+    return target.with_name(f".{target.name}{PARTIAL_SUFFIX}")
+
+
+def calculate_file_digest(path: Path) -> str:
+    """Return SHA-256 hex digest of file content (read by chunks)."""
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def _list_file_names(folder: Path) -> Dict[str, os.stat_result]:
+    """Return stats of files in folder, listed once."""
+    names: Dict[str, os.stat_result] = {}
+    try:
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    names[entry.name] = entry.stat()
+    except OSError:
+        pass
+    return names
+
+
+def _stat_source(
+    abs_path: str, stats: Optional[Dict[str, os.stat_result]] = None
+) -> Optional[os.stat_result]:
+    """Return stat of track from bulk stats or by itself (None if it's missing)."""
+    if stats is not None:
+        return stats.get(abs_path)
+    try:
+        return os.stat(abs_path)
+    except OSError:
+        return None
+
+
+def plan_copy_tasks(
+    tracklist: Iterable[str],
+    destination: Path,
+    report: CopyReport,
+    journal: Optional[CopyJournal] = None,
+    stats: Optional[Dict[str, os.stat_result]] = None,
+) -> List[CopyTask]:
+    """Return tasks only for existing tracks, absent in destination.
+
+    Missing and already existing tracks are registered in the report.
+    If several tracks have the same file name, only the first one is copied
+    (like it was with one-by-one copying).
+
+    Args:
+        tracklist: Absolute paths to tracks
+        destination: Folder for copied tracks
+        report: Report for registering missing and skipped tracks
+        journal: Journal of resumed job (its tracks are skipped unchecked)
+        stats: Stats of existing tracks (made in bulk), if they are known
+
+    Returns:
+        List of copy tasks in playlist order.
+    """
+    tasks: List[CopyTask] = []
+    taken_names: Set[str] = set()
+    for abs_path in tracklist:
+        source = Path(abs_path)
+        if journal is not None and abs_path in journal.copied:
+            taken_names.add(source.name)
+            report.skipped.append(abs_path)
+            continue
+        source_stat = _stat_source(abs_path, stats)
+        if source_stat is None:
+            report.missing.append(abs_path)
+            continue
+        target = destination / source.name
+        if source.name in taken_names or target.exists():
+            report.skipped.append(abs_path)
+            continue
+        taken_names.add(source.name)
+        tasks.append(
+            CopyTask(source, target, source_stat.st_size, source_stat.st_mtime_ns)
+        )
+    return tasks
+
+
+def copy_one_track(task: CopyTask, backend: Optional[TransferBackend] = None) -> int:
+    """Copy a track with its metadata and return number of copied bytes.
+
+    Track is copied into temporary file, which is renamed when it's complete,
+    so target file is never left half-written.
+    """
+    temp = get_partial_path(task.target)
+    try:
+        (backend or TransferBackend()).transfer(task.source, temp)
+        os.replace(temp, task.target)
+    except BaseException:
+        temp.unlink(missing_ok=True)
+        raise
+    return task.size
+
+
+def run_copy_tasks(
+    tasks: List[CopyTask],
+    report: CopyReport,
+    jobs: int = 1,
+    on_progress: Optional[Callable[[int], None]] = None,
+    on_copied: Optional[Callable[[CopyTask], None]] = None,
+    backend: Optional[TransferBackend] = None,
+) -> CopyReport:
+    """Copy tracks in a pool of worker threads.
+
+    Errors do not stop other workers, they are collected per track.
+    On interruption (Ctrl+C) not started tasks are cancelled.
+
+    Args:
+        tasks: Planned copy tasks
+        report: Report for registering copied and failed tracks
+        jobs: Number of simultaneous copy workers
+        on_progress: Called with number of bytes after each finished track
+        on_copied: Called with task of each copied track
+        backend: Transfer of files (the cheapest method by default)
+
+    Returns:
+        The same report, filled with results.
+    """
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+        futures: Dict[Future[int], CopyTask] = {
+            executor.submit(copy_one_track, task, backend): task for task in tasks
+        }
+        try:
+            for future in as_completed(futures):
+                task = futures[future]
+                try:
+                    copied_bytes = future.result()
+                except OSError as error:
+                    report.errors[str(task.source)] = str(error)
+                    copied_bytes = task.size
+                else:
+                    report.copied.append(str(task.source))
+                    if on_copied is not None:
+                        on_copied(task)
+                if on_progress is not None:
+                    on_progress(copied_bytes)
+        finally:
+            # Not started tasks are cancelled on interruption (e.g. Ctrl+C)
+            for future in futures:
+                future.cancel()
+    return report
+
+
+def plan_sync_tasks(
+    tracklist: Iterable[str],
+    destination: Path,
+    report: CopyReport,
+    manifest: SyncManifest,
+    checksum: bool = False,
+    stats: Optional[Dict[str, os.stat_result]] = None,
+) -> List[CopyTask]:
+    """Return tasks only for new or changed tracks.
+
+    A track is up to date when its source size and modification time
+    are the same as in manifest (or as for existing file in destination).
+    With 'checksum' a content hash is compared as well,
+    so touched, but not changed, files are not copied again.
+
+    Args:
+        tracklist: Absolute paths to tracks
+        destination: Folder for copied tracks
+        report: Report for registering missing and skipped tracks
+        manifest: Manifest from previous syncs
+        checksum: Compare content hashes of changed tracks
+        stats: Stats of existing tracks (made in bulk), if they are known
+
+    Returns:
+        List of copy tasks in playlist order.
+    """
+    tasks: List[CopyTask] = []
+    taken_names: Set[str] = set()
+    existing = _list_file_names(destination)
+    for abs_path in tracklist:
+        source = Path(abs_path)
+        source_stat = _stat_source(abs_path, stats)
+        if source_stat is None:
+            report.missing.append(abs_path)
+            continue
+        if source.name in taken_names:
+            report.skipped.append(abs_path)
+            continue
+        taken_names.add(source.name)
+        task = CopyTask(
+            source,
+            destination / source.name,
+            source_stat.st_size,
+            source_stat.st_mtime_ns,
+        )
+        target_stat = existing.get(source.name)
+        if target_stat is not None:
+            if manifest.is_fresh(task) or _is_same_stat(task, target_stat):
+                manifest.record(task._replace(digest=_recorded_digest(task, manifest)))
+                report.skipped.append(abs_path)
+                continue
+            if checksum:
+                task = task._replace(digest=calculate_file_digest(source))
+                if task.digest == _target_digest(task, target_stat, manifest):
+                    manifest.record(task)
+                    report.skipped.append(abs_path)
+                    continue
+        elif checksum:
+            task = task._replace(digest=calculate_file_digest(source))
+        tasks.append(task)
+    return tasks
+
+
+def _is_same_stat(task: CopyTask, target_stat: os.stat_result) -> bool:
+    """Return True if target has the same size and mtime as source."""
+    return target_stat.st_size == task.size and target_stat.st_mtime_ns == task.mtime_ns
+
+
+def _recorded_digest(task: CopyTask, manifest: SyncManifest) -> Optional[str]:
+    """Return hash from manifest (if record is for the same source)."""
+    record = manifest.tracks.get(task.target.name, {})
+    if record.get("source") == str(task.source):
+        digest: Optional[str] = record.get("sha256")
+        return digest
+    return None
+
+
+def _target_digest(
+    task: CopyTask, target_stat: os.stat_result, manifest: SyncManifest
+) -> Optional[str]:
+    """Return hash of file in destination (from manifest if possible)."""
+    if target_stat.st_size != task.size:
+        return None
+    record = manifest.tracks.get(task.target.name, {})
+    if record.get("sha256") and record.get("size") == target_stat.st_size:
+        digest: Optional[str] = record["sha256"]
+        return digest
+    try:
+        return calculate_file_digest(task.target)
+    except OSError:
+        return None
+
+
+def finish_sync(
+    tasks: List[CopyTask],
+    tracklist: Iterable[str],
+    destination: Path,
+    report: CopyReport,
+    manifest: SyncManifest,
+    delete: bool = False,
+) -> CopyReport:
+    """Record copied tracks in the sync manifest and save it.
+
+    With 'delete', files from previous syncs which are no longer
+    in the playlist are deleted from destination.
+    Only files, recorded in manifest, can be deleted.
+
+    Args:
+        tasks: Copy tasks, which have been run
+        tracklist: Absolute paths to tracks of the playlist
+        destination: Folder for copied tracks
+        report: Report with copying results
+        manifest: Manifest to be updated
+        delete: Delete synced files, which are absent in the playlist
+
+    Returns:
+        The same report, filled with deleted files.
+    """
+    copied = set(report.copied)
+    for task in tasks:
+        if str(task.source) in copied:
+            manifest.record(task)
+    if delete:
+        playlist_names = {Path(abs_path).name for abs_path in tracklist}
+        for name in list(manifest.tracks):
+            if name in playlist_names:
+                continue
+            try:
+                (destination / name).unlink(missing_ok=True)
+            except OSError as error:
+                report.errors[str(destination / name)] = str(error)
+                continue
+            del manifest.tracks[name]
+            report.deleted.append(name)
+    try:
+        manifest.save()
+    except OSError as error:
+        report.errors[str(manifest.path)] = str(error)
+    return report
@@ -0,0 +1,165 @@
+"""Module with indexes of track locations for removing duplicates."""
+import hashlib
+from pathlib import Path
+import sqlite3
+import tempfile
+from typing import Optional, Set, Union
+
+from .playlist import PlaylistEntry
+
+
+# Size of location hash (collisions are negligible even for billions of tracks)
+KEY_SIZE: int = 16
+# Size of SQLite page cache (in KiB), it bounds used memory
+DISK_INDEX_CACHE_KIB: int = 64 * 1024
+
+
+def normalize_location(
+    location: str, ignore_case: bool = False, any_separator: bool = False
+) -> str:
+    """Return location of track for comparison with other ones.
+
+    Args:
+        location: Line with location of track
+        ignore_case: Compare locations case-insensitively
+        any_separator: Treat backslashes and slashes as the same separator
+
+    Returns:
+        Location without surrounding spaces (case-folded and with '/' only,
+        if needed).
+    """
+    location = location.strip()
+    if any_separator:
+        location = location.replace("\\", "/")
+    if ignore_case:
+        location = location.casefold()
+    return location
+
+
+def get_location_key(location: str) -> bytes:
+    """Return hash of normalized location (the same size for any location)."""
+    return hashlib.blake2b(
+        location.encode("utf-8", "surrogatepass"), digest_size=KEY_SIZE
+    ).digest()
+
+
+class LocationIndex(object):
+    """In-memory index of seen locations.
+
+    Only hashes of locations are kept, so memory doesn't depend on
+    length of paths (it's about 100 bytes per unique location).
+    """
+
+    def __init__(self) -> None:
+        """Initialization of class instance."""
+        self.keys: Set[bytes] = set()
+
+    def __enter__(self) -> "LocationIndex":
+        """Return index itself."""
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """Forget seen locations."""
+        self.close()
+
+    def add(self, location: str) -> bool:
+        """Remember location and return True if it wasn't seen before."""
+        key = get_location_key(location)
+        if key in self.keys:
+            return False
+        self.keys.add(key)
+        return True
+
+    def close(self) -> None:
+        """Forget seen locations."""
+        self.keys = set()
+
+
+class DiskLocationIndex(object):
+    """Index of seen locations in temporary SQLite database.
+
+    It's slower than in-memory index, but memory is bounded
+    by SQLite page cache for playlists of any size.
+    """
+
+    def __init__(self, folder: Optional[Path] = None) -> None:
+        """Initialization of class instance."""
+        self.folder: Optional[Path] = folder
+        self._temp_dir: Optional[tempfile.TemporaryDirectory[str]] = None
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def __enter__(self) -> "DiskLocationIndex":
+        """Create database in temporary folder."""
+        self.open()
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """Delete database."""
+        self.close()
+
+    def open(self) -> None:
+        """Create database in temporary folder."""
+        if self._connection is None:
+            self._connection = self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return connection to new database with created table.
+
+        Database is not needed after run, so durability is turned off.
+        """
+        if self.folder is not None:
+            self.folder.mkdir(parents=True, exist_ok=True)
+        self._temp_dir = tempfile.TemporaryDirectory(dir=self.folder)
+        connection = sqlite3.connect(Path(self._temp_dir.name) / "index.db")
+        connection.execute("PRAGMA journal_mode = OFF")
+        connection.execute("PRAGMA synchronous = OFF")
+        connection.execute(f"PRAGMA cache_size = -{DISK_INDEX_CACHE_KIB}")
+        connection.execute(
+            "CREATE TABLE locations (key BLOB PRIMARY KEY) WITHOUT ROWID"
+        )
+        return connection
+
+    def add(self, location: str) -> bool:
+        """Remember location and return True if it wasn't seen before."""
+        if self._connection is None:
+            self._connection = self._connect()
+        cursor = self._connection.execute(
+            "INSERT OR IGNORE INTO locations VALUES (?)",
+            (get_location_key(location),),
+        )
+        return cursor.rowcount == 1
+
+    def close(self) -> None:
+        """Delete database with its folder."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+        if self._temp_dir is not None:
+            self._temp_dir.cleanup()
+            self._temp_dir = None
+
+
+class DuplicateFilter(object):
+    """Predicate, which is True only for the first occurrence of location."""
+
+    def __init__(
+        self,
+        index: Union[LocationIndex, DiskLocationIndex],
+        ignore_case: bool = False,
+        any_separator: bool = False,
+    ) -> None:
+        """Initialization of class instance."""
+        self.index: Union[LocationIndex, DiskLocationIndex] = index
+        self.ignore_case: bool = ignore_case
+        self.any_separator: bool = any_separator
+        self.duplicates: int = 0
+
+    def __call__(self, entry: PlaylistEntry) -> bool:
+        """Return True if location of entry wasn't seen before."""
+        location = normalize_location(
+            entry.location, self.ignore_case, self.any_separator
+        )
+        if self.index.add(location):
+            return True
+        self.duplicates += 1
+        return False
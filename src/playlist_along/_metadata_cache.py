@@ -0,0 +1,93 @@
+"""Module with persistent cache of audio metadata."""
+from pathlib import Path
+import sqlite3
+import time
+from typing import Optional
+
+from ._utils import _open_cache_database
+
+
+METADATA_CACHE_FILE_NAME: str = "metadata.sqlite3"
+METADATA_CACHE_MAX_ENTRIES: int = 200_000
+
+
+class MetadataCache(object):
+    """SQLite cache of audio metadata (durations of files).
+
+    Records are keyed by absolute path and are valid only for the same
+    size and modification time of file. Least recently used records
+    are deleted when there are more than 'max_entries' ones.
+    """
+
+    def __init__(
+        self, file: Path, max_entries: int = METADATA_CACHE_MAX_ENTRIES
+    ) -> None:
+        """Initialization of class instance."""
+        self.file: Path = file
+        self.max_entries: int = max_entries
+        self.hits: int = 0
+        self.misses: int = 0
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def __enter__(self) -> "MetadataCache":
+        """Open cache database."""
+        self.open()
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """Close cache database."""
+        self.close()
+
+    def open(self) -> None:
+        """Open (or create) cache database."""
+        self._connection = _open_cache_database(
+            self.file,
+            "CREATE TABLE IF NOT EXISTS audio ("
+            "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, "
+            "duration INTEGER, used_at REAL)",
+        )
+
+    def close(self) -> None:
+        """Delete least recently used records over limit and close database."""
+        if self._connection is None:
+            return
+        self._connection.execute(
+            "DELETE FROM audio WHERE path NOT IN "
+            "(SELECT path FROM audio ORDER BY used_at DESC LIMIT ?)",
+            (self.max_entries,),
+        )
+        self._connection.commit()
+        self._connection.close()
+        self._connection = None
+
+    def get(self, path: str, size: int, mtime_ns: int) -> Optional[int]:
+        """Return duration of unchanged file (None, if it's absent or stale)."""
+        if self._connection is None:
+            return None
+        row = self._connection.execute(
+            "SELECT duration FROM audio "
+            "WHERE path = ? AND size = ? AND mtime_ns = ?",
+            (path, size, mtime_ns),
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._connection.execute(
+            "UPDATE audio SET used_at = ? WHERE path = ?", (time.time(), path)
+        )
+        return int(row[0])
+
+    def put(self, path: str, size: int, mtime_ns: int, duration: int) -> None:
+        """Save duration (in seconds) of file (replacing stale one)."""
+        if self._connection is None:
+            return
+        self._connection.execute(
+            "INSERT OR REPLACE INTO audio (path, size, mtime_ns, duration, used_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (path, size, mtime_ns, duration, time.time()),
+        )
+
+    def stats(self) -> str:
+        """Return text with numbers of hits and misses."""
+        return f"Metadata cache: {self.hits} hits, {self.misses} misses."
@@ -0,0 +1,232 @@
+"""Module with planning of copy jobs before copying starts."""
+from concurrent.futures import ThreadPoolExecutor
+import os
+from pathlib import Path
+import shutil
+import stat
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from ._copying import CopyTask
+
+
+# Bytes read from the largest sources for measuring of reading speed
+PROBE_SIZE: int = 8 * 1024 * 1024
+PROBE_CHUNK_SIZE: int = 1024 * 1024
+# Folders stat simultaneously by default (stat calls wait for drive mostly)
+STAT_JOBS: int = 4
+
+
+class CopyPlan(object):
+    """Planned copy tasks with their totals."""
+
+    def __init__(self, tasks: List[CopyTask]) -> None:
+        """Initialization of class instance."""
+        self.tasks: List[CopyTask] = tasks
+        self.files: int = len(tasks)
+        self.bytes: int = sum(task.size for task in tasks)
+        self.free_space: Optional[int] = None
+        self.required_space: int = self.bytes
+        self.seconds: Optional[float] = None
+
+    @property
+    def has_enough_space(self) -> bool:
+        """Return True, if destination has space for copied tracks."""
+        return self.free_space is None or self.required_space <= self.free_space
+
+    def check_space(self, destination: Path, replaces: bool = False) -> bool:
+        """Return True, if destination has space for copied tracks.
+
+        With 'replaces' space of existing files, replaced by copied ones,
+        is counted as free (they are checked only if space isn't enough).
+        """
+        self.free_space = get_free_space(destination)
+        if replaces and not self.has_enough_space:
+            self.required_space = self.bytes - get_replaced_bytes(self.tasks)
+        return self.has_enough_space
+
+    def estimate(
+        self,
+        max_bandwidth: Optional[int] = None,
+        max_files_per_sec: Optional[float] = None,
+    ) -> Optional[float]:
+        """Return estimated time of copying by reading speed of sources and limits."""
+        self.seconds = estimate_seconds(
+            self, measure_read_speed(self.tasks), max_bandwidth, max_files_per_sec
+        )
+        return self.seconds
+
+
+def _list_folder_files(
+    folder: str, wanted: Set[str]
+) -> Tuple[Dict[str, os.stat_result], Optional[Set[str]]]:
+    """Return stats of wanted files from listing of folder.
+
+    Stats are taken from entries of the listing: on Windows they are
+    in the listing for free, on other systems only listed files are stat.
+
+    Args:
+        folder: Folder of tracks
+        wanted: Names of tracks in this folder
+
+    Returns:
+        Stats by names and other listed names in any case
+        (None, if folder can't be listed).
+    """
+    stats: Dict[str, os.stat_result] = {}
+    folded: Set[str] = set()
+    try:
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if entry.name not in wanted:
+                    folded.add(entry.name.casefold())
+                elif entry.is_file():
+                    stats[entry.name] = entry.stat()
+    except OSError:
+        return stats, None
+    return stats, folded
+
+
+def _stat_folder_files(folder: str, names: List[str]) -> Dict[str, os.stat_result]:
+    """Return stats of files from one folder, which is listed only once.
+
+    Missing tracks and folders cost nothing. Names absent in the listing
+    are checked one by one only if they can differ in case from listed ones
+    (or folder can't be listed).
+    """
+    wanted = set(names)
+    stats, folded = _list_folder_files(folder, wanted)
+    for name in wanted.difference(stats):
+        if folded is not None and name.casefold() not in folded:
+            continue
+        try:
+            file_stat = os.stat(os.path.join(folder, name))
+        except OSError:
+            continue
+        if stat.S_ISREG(file_stat.st_mode):
+            stats[name] = file_stat
+    return stats
+
+
+def stat_tracks(
+    tracklist: Iterable[str], jobs: int = STAT_JOBS
+) -> Dict[str, os.stat_result]:
+    """Return stats of existing tracks, grouped by their folders.
+
+    Folders are processed by pool of 'jobs' workers simultaneously.
+
+    Args:
+        tracklist: Absolute paths to tracks
+        jobs: Number of folders processed simultaneously
+
+    Returns:
+        Stats by paths of tracks (missing tracks are absent).
+    """
+    folders: Dict[str, List[Tuple[str, str]]] = {}
+    for abs_path in tracklist:
+        folder, name = os.path.split(abs_path)
+        folders.setdefault(folder, []).append((abs_path, name))
+    stats: Dict[str, os.stat_result] = {}
+
+    def stat_folder(folder: str) -> None:
+        items = folders[folder]
+        folder_stats = _stat_folder_files(folder, [name for _, name in items])
+        for abs_path, name in items:
+            if name in folder_stats:
+                stats[abs_path] = folder_stats[name]
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        list(executor.map(stat_folder, folders))
+    return stats
+
+
+def balance_tasks(tasks: List[CopyTask]) -> List[CopyTask]:
+    """Return tasks with large and small files taking turns.
+
+    The largest file goes first, then the smallest one, then the next
+    largest one and so on. So simultaneous workers copy big and small
+    files at the same time, and no worker is left with big files at the end.
+    """
+    by_size = sorted(tasks, key=lambda task: task.size, reverse=True)
+    balanced: List[CopyTask] = []
+    first, last = 0, len(by_size) - 1
+    while first <= last:
+        balanced.append(by_size[first])
+        if first != last:
+            balanced.append(by_size[last])
+        first, last = first + 1, last - 1
+    return balanced
+
+
+def get_free_space(destination: Path) -> Optional[int]:
+    """Return free bytes on drive of destination (it can be absent yet)."""
+    folder = destination.absolute()
+    while not folder.exists() and folder.parent != folder:
+        folder = folder.parent
+    try:
+        return shutil.disk_usage(folder).free
+    except OSError:
+        return None
+
+
+def get_replaced_bytes(tasks: Iterable[CopyTask]) -> int:
+    """Return size of existing files, which are replaced by tasks."""
+    replaced = 0
+    for task in tasks:
+        try:
+            replaced += task.target.stat().st_size
+        except OSError:
+            continue
+    return replaced
+
+
+def measure_read_speed(tasks: List[CopyTask]) -> Optional[float]:
+    """Return reading speed of sources (bytes per second).
+
+    Only the beginning of the largest files is read.
+    """
+    read = 0
+    started = time.perf_counter()
+    for task in sorted(tasks, key=lambda task: task.size, reverse=True):
+        try:
+            with open(task.source, "rb") as f:
+                while read < PROBE_SIZE:
+                    chunk = f.read(PROBE_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    read += len(chunk)
+        except OSError:
+            continue
+        if read >= PROBE_SIZE:
+            break
+    elapsed = time.perf_counter() - started
+    if read == 0 or elapsed <= 0:
+        return None
+    return read / elapsed
+
+
+def estimate_seconds(
+    plan: CopyPlan,
+    read_speed: Optional[float],
+    max_bandwidth: Optional[int] = None,
+    max_files_per_sec: Optional[float] = None,
+) -> Optional[float]:
+    """Return estimated time of copying (None if speed is unknown)."""
+    speeds = [speed for speed in (read_speed, max_bandwidth) if speed]
+    if not speeds:
+        return None
+    seconds = plan.bytes / min(speeds)
+    if max_files_per_sec:
+        seconds = max(seconds, plan.files / max_files_per_sec)
+    return seconds
+
+
+def format_duration(seconds: float) -> str:
+    """Return human-readable duration (e.g. 1 h 5 min, 2 min 30 s)."""
+    minutes, secs = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours} h {minutes} min"
+    if minutes:
+        return f"{minutes} min {secs} s"
+    return f"{secs} s"
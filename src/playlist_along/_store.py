@@ -0,0 +1,238 @@
+"""Module with content-addressed store of exported tracks.
+
+Each unique content is stored once under its SHA-256 hash,
+and playlist folders get hard (or symbolic) links to stored files.
+Hashes are cached by path, size and modification time of source,
+so repeated exports read only new or changed tracks.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import os
+from pathlib import Path
+import sqlite3
+import threading
+from typing import Callable, Dict, List, Optional, Union
+
+from ._copying import calculate_file_digest, CopyReport, CopyTask, get_partial_path
+from ._transfer import TransferBackend
+from ._utils import _open_cache_database
+
+
+STORE_OBJECTS_DIR: str = "objects"
+HASH_CACHE_FILE_NAME: str = "hashes.sqlite3"
+
+
+class HashCache(object):
+    """SQLite cache of content hashes of files.
+
+    Records are keyed by absolute path and are valid only for the same
+    size and modification time of file.
+    """
+
+    def __init__(self, file: Path) -> None:
+        """Initialization of class instance."""
+        self.file: Path = file
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def __enter__(self) -> "HashCache":
+        """Open cache database."""
+        self.open()
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """Save and close cache database."""
+        self.close()
+
+    def open(self) -> None:
+        """Open (or create) cache database."""
+        self._connection = _open_cache_database(
+            self.file,
+            "CREATE TABLE IF NOT EXISTS hashes ("
+            "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, digest TEXT)",
+        )
+
+    def close(self) -> None:
+        """Save records and close database."""
+        if self._connection is None:
+            return
+        self._connection.commit()
+        self._connection.close()
+        self._connection = None
+
+    def get(self, path: str, size: int, mtime_ns: int) -> Optional[str]:
+        """Return hash of unchanged file (None, if it's absent or stale)."""
+        if self._connection is None:
+            return None
+        row = self._connection.execute(
+            "SELECT digest FROM hashes WHERE path = ? AND size = ? AND mtime_ns = ?",
+            (path, size, mtime_ns),
+        ).fetchone()
+        return None if row is None else str(row[0])
+
+    def put(self, path: str, size: int, mtime_ns: int, digest: str) -> None:
+        """Save hash of file (replacing stale one)."""
+        if self._connection is None:
+            return
+        self._connection.execute(
+            "INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?)",
+            (path, size, mtime_ns, digest),
+        )
+
+
+class TrackStore(object):
+    """Content-addressed store, which tracks are exported through.
+
+    Stored files are shared by all links to them,
+    so they must not be edited in playlist folders.
+    If hard link can't be made (e.g. on another drive),
+    stored file is copied into playlist folder.
+    """
+
+    def __init__(
+        self,
+        folder: Path,
+        symlink: bool = False,
+        backend: Optional[TransferBackend] = None,
+    ) -> None:
+        """Initialization of class instance."""
+        self.folder: Path = folder.absolute()
+        self.symlink: bool = symlink
+        self.backend: TransferBackend = backend or TransferBackend()
+        self.hashes: HashCache = HashCache(self.folder / HASH_CACHE_FILE_NAME)
+        self.added: int = 0
+        self.reused: int = 0
+        self._locks: Dict[Path, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get_object_path(self, task: CopyTask) -> Path:
+        """Return path of stored file for hashed task."""
+        digest = str(task.digest)
+        name = f"{digest}{task.source.suffix.lower()}"
+        return self.folder / STORE_OBJECTS_DIR / digest[:2] / name
+
+    def run_copy_tasks(
+        self,
+        tasks: List[CopyTask],
+        report: CopyReport,
+        jobs: int = 1,
+        on_progress: Optional[Callable[[int], None]] = None,
+        on_copied: Optional[Callable[[CopyTask], None]] = None,
+        backend: Optional[TransferBackend] = None,
+    ) -> CopyReport:
+        """Export tracks through store (like 'run_copy_tasks' copies them).
+
+        Each track is hashed (if its hash isn't cached), stored (if its
+        content is absent in store) and linked into its folder
+        by pool of 'jobs' workers.
+
+        Args:
+            tasks: Planned copy tasks
+            report: Report for registering copied and failed tracks
+            jobs: Number of tracks exported simultaneously
+            on_progress: Called with number of bytes after each exported track
+            on_copied: Called with task of each exported track
+            backend: Transfer of files into store
+
+        Returns:
+            The same report, filled with results.
+        """
+        if backend is not None:
+            self.backend = backend
+        with self.hashes, ThreadPoolExecutor(max_workers=jobs) as executor:
+            cached = [self._get_cached_digest(task) for task in tasks]
+            try:
+                for task, result in zip(tasks, executor.map(self.export_track, cached)):
+                    self._register_result(task, result, report, on_copied)
+                    if on_progress is not None:
+                        on_progress(task.size)
+            finally:
+                # Not started tracks are cancelled on interruption (e.g. Ctrl+C)
+                executor.shutdown(cancel_futures=True)
+        return report
+
+    def _register_result(
+        self,
+        task: CopyTask,
+        result: Union[str, OSError],
+        report: CopyReport,
+        on_copied: Optional[Callable[[CopyTask], None]] = None,
+    ) -> None:
+        """Register exported track (and cache its hash) or its error."""
+        if isinstance(result, OSError):
+            report.errors[str(task.source)] = str(result)
+            return
+        self.hashes.put(str(task.source), task.size, task.mtime_ns, result)
+        report.copied.append(str(task.source))
+        if on_copied is not None:
+            on_copied(task)
+
+    def _get_cached_digest(self, task: CopyTask) -> CopyTask:
+        """Return task with cached content hash (if it's known)."""
+        digest = self.hashes.get(str(task.source), task.size, task.mtime_ns)
+        return task if digest is None else task._replace(digest=digest)
+
+    def export_track(self, task: CopyTask) -> Union[str, OSError]:
+        """Return content hash of exported track (or error)."""
+        try:
+            if task.digest is None:
+                task = task._replace(digest=calculate_file_digest(task.source))
+            path = self.get_object_path(task)
+            with self._lock_object(path):
+                self.store_file(task.source, path)
+            self.link_track(path, task.target)
+        except OSError as error:
+            return error
+        return str(task.digest)
+
+    def _lock_object(self, path: Path) -> threading.Lock:
+        """Return lock of stored file (the same content is stored once)."""
+        with self._lock:
+            return self._locks.setdefault(path, threading.Lock())
+
+    def store_file(self, source: Path, path: Path) -> None:
+        """Store file, if it's absent in store (via temporary file).
+
+        Args:
+            source: Track to be stored
+            path: Stored file
+
+        Raises:
+            OSError: File can't be stored (temporary file is deleted)
+        """
+        if path.exists():
+            with self._lock:
+                self.reused += 1
+            return
+        temp = get_partial_path(path)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self.backend.transfer(source, temp)
+            os.replace(temp, path)
+        except OSError:
+            temp.unlink(missing_ok=True)
+            raise
+        with self._lock:
+            self.added += 1
+
+    def link_track(self, path: Path, target: Path) -> None:
+        """Link stored file into playlist folder (via temporary link).
+
+        Args:
+            path: Stored file
+            target: Track in playlist folder
+
+        Raises:
+            OSError: Track can't be linked or copied (temporary file is deleted)
+        """
+        temp = get_partial_path(target)
+        try:
+            if self.symlink:
+                os.symlink(path, temp)
+            else:
+                try:
+                    os.link(path, temp)
+                except OSError:
+                    self.backend.transfer(path, temp)
+            os.replace(temp, target)
+        except OSError:
+            temp.unlink(missing_ok=True)
+            raise
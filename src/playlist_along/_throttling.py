@@ -0,0 +1,137 @@
+"""Module with rate limits and throughput of copying."""
+from collections import deque
+import re
+import threading
+import time
+from typing import Deque, Optional, Tuple
+
+
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3}
+SIZE_PATTERN = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([KMG]?)(?:i?B)?\s*$", re.IGNORECASE)
+
+
+def parse_size(value: str) -> int:
+    """Return number of bytes from size like '512K', '10M' or '1.5GB'.
+
+    Args:
+        value: Number with optional unit (K, M or G, powers of 1024)
+
+    Returns:
+        Number of bytes.
+
+    Raises:
+        ValueError: Value is not a size
+    """
+    match = SIZE_PATTERN.match(value)
+    if match is None:
+        raise ValueError(f"'{value}' is not a size (e.g. 512K, 10M, 1G).")
+    number, unit = match.groups()
+    size = int(float(number) * SIZE_UNITS[unit.upper()])
+    if size < 1:
+        raise ValueError(f"'{value}' is too small.")
+    return size
+
+
+def format_size(size: float) -> str:
+    """Return human-readable size (e.g. 1.5 MiB)."""
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+class TokenBucket(object):
+    """Token bucket, shared by threads and coroutines.
+
+    Tokens are refilled with 'rate' per second up to 'capacity'
+    (one second of rate by default). Tokens can be borrowed,
+    so a request bigger than capacity waits for its debt to be refilled,
+    and the average rate is kept anyway.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        """Initialization of class instance."""
+        self.rate: float = rate
+        self.capacity: float = capacity if capacity is not None else rate
+        self.tokens: float = self.capacity
+        self.updated: float = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """Take tokens and return seconds to wait before using them."""
+        with self._lock:
+            now = time.monotonic()
+            refilled = self.tokens + (now - self.updated) * self.rate
+            self.tokens = min(self.capacity, refilled) - amount
+            self.updated = now
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def take(self, amount: float) -> None:
+        """Take tokens, waiting for them if they are borrowed."""
+        delay = self.reserve(amount)
+        if delay > 0:
+            time.sleep(delay)
+
+
+class CopyThrottle(object):
+    """Limits of bandwidth and files per second for all copy workers."""
+
+    def __init__(
+        self,
+        max_bandwidth: Optional[int] = None,
+        max_files_per_sec: Optional[float] = None,
+    ) -> None:
+        """Initialization of class instance."""
+        self.bytes: Optional[TokenBucket] = None
+        self.files: Optional[TokenBucket] = None
+        if max_bandwidth:
+            self.bytes = TokenBucket(max_bandwidth)
+        if max_files_per_sec:
+            # Start of one file is allowed at once, not a burst of them
+            self.files = TokenBucket(max_files_per_sec, 1)
+
+    def reserve_file(self) -> float:
+        """Return seconds to wait before starting a file."""
+        return self.files.reserve(1) if self.files is not None else 0.0
+
+    def reserve_bytes(self, size: int) -> float:
+        """Return seconds to wait after (or before) transferring bytes."""
+        return self.bytes.reserve(size) if self.bytes is not None else 0.0
+
+    def wait_file(self) -> None:
+        """Wait until a file can be started."""
+        if self.files is not None:
+            self.files.take(1)
+
+    def wait_bytes(self, size: int) -> None:
+        """Wait until bytes fit into bandwidth."""
+        if self.bytes is not None:
+            self.bytes.take(size)
+
+
+class ThroughputMeter(object):
+    """Current (for the last seconds) and average throughput."""
+
+    def __init__(self, window: float = 3.0) -> None:
+        """Initialization of class instance."""
+        self.window: float = window
+        self.started: float = time.monotonic()
+        self.total: int = 0
+        self._recent: Deque[Tuple[float, int]] = deque()
+        self._recent_bytes: int = 0
+
+    def add(self, size: int) -> str:
+        """Count transferred bytes and return throughput line."""
+        now = time.monotonic()
+        self.total += size
+        self._recent.append((now, size))
+        self._recent_bytes += size
+        while now - self._recent[0][0] > self.window:
+            self._recent_bytes -= self._recent.popleft()[1]
+        elapsed = max(now - self.started, 1e-3)
+        current = self._recent_bytes / min(self.window, elapsed)
+        average = self.total / elapsed
+        return f"{format_size(current)}/s (avg {format_size(average)}/s)"
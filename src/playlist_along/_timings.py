@@ -0,0 +1,164 @@
+"""Module with timings of processing stages."""
+from contextlib import contextmanager
+import json
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TypeVar
+
+
+T = TypeVar("T")
+
+
+class StageStats(object):
+    """Accumulated wall time, bytes and items of one stage."""
+
+    __slots__ = ("seconds", "bytes", "items")
+
+    def __init__(self) -> None:
+        """Initialization of class instance."""
+        self.seconds: float = 0.0
+        self.bytes: int = 0
+        self.items: int = 0
+
+
+class StageTimings(object):
+    """Recorder of processing stages (disabled by default).
+
+    Time of a stage excludes time of stages nested into it,
+    e.g. time of writing doesn't include reading of lines being written.
+    Stages from several threads are summed up.
+    """
+
+    def __init__(self) -> None:
+        """Initialization of class instance."""
+        self.enabled: bool = False
+        self.stages: Dict[str, StageStats] = {}
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def start(self) -> None:
+        """Enable recording and forget previous stages."""
+        with self._lock:
+            self.stages = {}
+        self.enabled = True
+        self.started_at = time.perf_counter()
+        self.finished_at = None
+
+    def stop(self) -> None:
+        """Disable recording (recorded stages are kept)."""
+        self.enabled = False
+        self.finished_at = time.perf_counter()
+
+    def add(
+        self, name: str, seconds: float = 0.0, bytes_: int = 0, items: int = 0
+    ) -> None:
+        """Add time and counters to stage."""
+        if not self.enabled:
+            return
+        with self._lock:
+            stats = self.stages.setdefault(name, StageStats())
+            stats.seconds += seconds
+            stats.bytes += bytes_
+            stats.items += items
+
+    @contextmanager
+    def measure(self, name: str) -> Iterator[StageStats]:
+        """Measure time of code block as a stage.
+
+        Counters of yielded stats can be increased inside the block.
+
+        Args:
+            name: Name of stage
+
+        Yields:
+            Counters of this run of the stage.
+        """
+        counters = StageStats()
+        if not self.enabled:
+            yield counters
+            return
+        self._enter()
+        start = time.perf_counter()
+        try:
+            yield counters
+        finally:
+            seconds = self._exit(time.perf_counter() - start)
+            self.add(name, seconds, counters.bytes, counters.items)
+
+    def iter_stage(self, name: str, iterable: Iterable[T]) -> Iterable[T]:
+        """Return iterable, which counts its items and time of producing them."""
+        if not self.enabled:
+            return iterable
+        return self._iter_timed(name, iterable)
+
+    def _iter_timed(self, name: str, iterable: Iterable[T]) -> Iterator[T]:
+        """Yield items, measuring time spent in the underlying iterator."""
+        iterator = iter(iterable)
+        while True:
+            self._enter()
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add(name, self._exit(time.perf_counter() - start))
+                return
+            except BaseException:
+                self.add(name, self._exit(time.perf_counter() - start))
+                raise
+            self.add(name, self._exit(time.perf_counter() - start), items=1)
+            yield item
+
+    def _enter(self) -> None:
+        """Start accounting of nested stages for current thread."""
+        if not hasattr(self._local, "nested"):
+            self._local.nested = []
+        self._local.nested.append(0.0)
+
+    def _exit(self, elapsed: float) -> float:
+        """Return own time of finished stage and pass its time to outer one."""
+        nested: List[float] = self._local.nested
+        own_seconds = elapsed - nested.pop()
+        if nested:
+            nested[-1] += elapsed
+        return own_seconds
+
+    def total_seconds(self) -> float:
+        """Return wall time since start of recording."""
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.perf_counter()) - self.started_at
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return recorded stages as a JSON-serializable dict."""
+        with self._lock:
+            stages = [
+                {
+                    "stage": name,
+                    "seconds": round(stats.seconds, 6),
+                    "bytes": stats.bytes,
+                    "items": stats.items,
+                }
+                for name, stats in self.stages.items()
+            ]
+        return {"total_seconds": round(self.total_seconds(), 6), "stages": stages}
+
+    def format_json(self) -> str:
+        """Return recorded stages as JSON text."""
+        return json.dumps(self.as_dict())
+
+    def format_table(self) -> str:
+        """Return recorded stages as a text table."""
+        data = self.as_dict()
+        rows = [f"{'Stage':<20} {'Seconds':>10} {'Bytes':>14} {'Items':>10}"]
+        for stage in data["stages"]:
+            rows.append(
+                f"{stage['stage']:<20} {stage['seconds']:>10.4f} "
+                f"{stage['bytes']:>14} {stage['items']:>10}"
+            )
+        rows.append(f"{'Total (wall time)':<20} {data['total_seconds']:>10.4f}")
+        return "\n".join(rows)
+
+
+stage_timings = StageTimings()
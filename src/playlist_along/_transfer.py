@@ -0,0 +1,297 @@
+"""Module with transfer backend for copying of tracks.
+
+The cheapest method is tried first: hard link (only if it's allowed),
+reflink clone on copy-on-write file systems (btrfs, XFS),
+in-kernel copy with 'copy_file_range' or 'sendfile' (Linux only)
+and 'shutil.copy2' as the last resort. Only the last one passes
+content of file through user space buffers.
+"""
+import errno
+import os
+from pathlib import Path
+import shutil
+import sys
+from typing import Callable, List, Optional, Tuple
+
+from ._throttling import CopyThrottle
+
+
+METHOD_HARDLINK: str = "hardlink"
+METHOD_CLONE: str = "clone"
+METHOD_COPY_FILE_RANGE: str = "copy_file_range"
+METHOD_SENDFILE: str = "sendfile"
+METHOD_COPY: str = "copy"
+
+# Request code of 'ioctl' for cloning of whole file (from linux/fs.h)
+FICLONE: int = 0x40049409
+# Maximum size of one in-kernel copy call (Linux limit is ~2 GiB)
+KERNEL_COPY_SIZE: int = 1024 * 1024 * 1024
+# Size of one copy call with limited bandwidth (at most a tenth of second of it)
+THROTTLED_CHUNK_SIZE: int = 1024 * 1024
+MIN_THROTTLED_CHUNK_SIZE: int = 64 * 1024
+
+IS_LINUX: bool = sys.platform.startswith("linux")
+
+# Called with number of bytes before each transferred chunk (waits for them)
+ChunkCallback = Callable[[int], None]
+
+# Errors meaning that method is not supported for these files
+UNSUPPORTED_ERRORS = {
+    errno.EBADF,
+    errno.EINVAL,
+    errno.ENOSYS,
+    errno.ENOTSUP,
+    errno.ENOTTY,
+    errno.EOPNOTSUPP,
+    errno.EXDEV,
+}
+
+
+class ChunkPacer(object):
+    """Reservation of bandwidth for chunks of one transferred file.
+
+    Bytes of each chunk are reserved before it's transferred,
+    so even the first chunk doesn't go over the limit. Bytes beyond
+    the expected size of file are reserved after their transfer.
+    """
+
+    def __init__(self, on_chunk: ChunkCallback, size: int, chunk_size: int) -> None:
+        """Initialization of class instance."""
+        self.on_chunk: ChunkCallback = on_chunk
+        self.remaining: int = size
+        self.chunk_size: int = chunk_size
+        # Reserved bytes, which are not transferred yet
+        self.reserved: int = 0
+
+    def reserve(self) -> None:
+        """Wait for bandwidth of the next chunk."""
+        wanted = min(self.chunk_size, max(self.remaining, 0))
+        if wanted > self.reserved:
+            self.on_chunk(wanted - self.reserved)
+            self.reserved = wanted
+
+    def settle(self, size: int) -> None:
+        """Register transferred bytes of chunk."""
+        self.remaining -= size
+        if size > self.reserved:
+            self.on_chunk(size - self.reserved)
+        self.reserved = max(self.reserved - size, 0)
+
+
+# Transfers content from one descriptor to another, False if unsupported
+KernelMethod = Callable[[int, int, Optional[ChunkPacer]], bool]
+
+
+def get_throttled_chunk_size(rate: float) -> int:
+    """Return size of chunk, which takes a tenth of second of bandwidth."""
+    return int(min(THROTTLED_CHUNK_SIZE, max(MIN_THROTTLED_CHUNK_SIZE, rate / 10)))
+
+
+def is_unsupported(error: OSError) -> bool:
+    """Return True, if error means that method can't be used for files."""
+    return error.errno in UNSUPPORTED_ERRORS
+
+
+def try_hardlink(source: Path, target: Path) -> bool:
+    """Return True, if target is created as hard link to source.
+
+    It's possible only on the same file system (drive).
+    """
+    try:
+        os.link(source, target)
+    except OSError:
+        return False
+    return True
+
+
+def try_clone(in_fd: int, out_fd: int, pacer: Optional[ChunkPacer] = None) -> bool:
+    """Return True, if content of file is cloned (copy-on-write).
+
+    Content isn't transferred, so bandwidth isn't reserved by 'pacer'.
+    """
+    import fcntl
+
+    try:
+        fcntl.ioctl(out_fd, FICLONE, in_fd)
+    except OSError as error:
+        if is_unsupported(error):
+            return False
+        raise
+    return True
+
+
+def _kernel_copy(
+    in_fd: int,
+    out_fd: int,
+    copy_range: Callable[[int], int],
+    pacer: Optional[ChunkPacer] = None,
+) -> bool:
+    """Return True, if whole file is copied by in-kernel calls.
+
+    Args:
+        in_fd: Descriptor of source file
+        out_fd: Descriptor of target file
+        copy_range: Copies up to given number of bytes and returns copied ones
+        pacer: Reserves bandwidth before each call (by small chunks)
+
+    Returns:
+        False, if method is not supported (and nothing is copied).
+        Some file systems report end of file at once, it's unsupported too.
+
+    Raises:
+        OSError: File is copied partially
+    """
+    chunk_size = KERNEL_COPY_SIZE if pacer is None else pacer.chunk_size
+    expected = os.fstat(in_fd).st_size
+    copied = 0
+    while True:
+        if pacer is not None:
+            pacer.reserve()
+        try:
+            size = copy_range(chunk_size)
+        except OSError as error:
+            if copied == 0 and is_unsupported(error):
+                return False
+            raise
+        if size == 0:
+            if copied < expected:
+                return _fail_short_copy(copied, expected)
+            break
+        copied += size
+        if pacer is not None:
+            pacer.settle(size)
+    if IS_LINUX:
+        # Source file is read once, so don't evict other files from page cache
+        os.posix_fadvise(in_fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    return True
+
+
+def _fail_short_copy(copied: int, expected: int) -> bool:
+    """Return False, if nothing is copied (method is unsupported).
+
+    Args:
+        copied: Number of copied bytes
+        expected: Size of source file
+
+    Returns:
+        False, if end of file is reported at once.
+
+    Raises:
+        OSError: File is copied partially
+    """
+    if copied == 0:
+        return False
+    raise OSError(errno.EIO, f"Copied {copied} of {expected} bytes of file")
+
+
+def try_copy_file_range(
+    in_fd: int, out_fd: int, pacer: Optional[ChunkPacer] = None
+) -> bool:
+    """Return True, if file is copied with 'copy_file_range'.
+
+    Some file systems clone file or copy it on server side (NFS 4.2, SMB).
+    """
+    return _kernel_copy(
+        in_fd, out_fd, lambda count: os.copy_file_range(in_fd, out_fd, count), pacer
+    )
+
+
+def try_sendfile(in_fd: int, out_fd: int, pacer: Optional[ChunkPacer] = None) -> bool:
+    """Return True, if file is copied with 'sendfile'."""
+    return _kernel_copy(
+        in_fd, out_fd, lambda count: os.sendfile(out_fd, in_fd, None, count), pacer
+    )
+
+
+def copy_by_chunks(source: Path, target: Path, pacer: ChunkPacer) -> None:
+    """Copy file with its metadata by small chunks (in user space)."""
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        while True:
+            pacer.reserve()
+            chunk = src.read(pacer.chunk_size)
+            if not chunk:
+                break
+            dst.write(chunk)
+            pacer.settle(len(chunk))
+    shutil.copystat(source, target)
+
+
+# In-kernel methods in order of their cost
+KERNEL_METHODS: List[Tuple[str, KernelMethod]] = [
+    (METHOD_CLONE, try_clone),
+    (METHOD_COPY_FILE_RANGE, try_copy_file_range),
+    (METHOD_SENDFILE, try_sendfile),
+]
+
+
+class TransferBackend(object):
+    """Transfer of tracks by the cheapest supported method.
+
+    Hard links share content with original files,
+    so they are made only when 'hardlink' is allowed.
+    With 'throttle' each transfer waits for its turn,
+    and content is copied by small chunks within bandwidth limit.
+    """
+
+    def __init__(
+        self, hardlink: bool = False, throttle: Optional[CopyThrottle] = None
+    ) -> None:
+        """Initialization of class instance."""
+        self.hardlink: bool = hardlink
+        self.kernel_copy: bool = IS_LINUX
+        self.throttle: Optional[CopyThrottle] = throttle
+        self.on_chunk: Optional[ChunkCallback] = None
+        self.chunk_size: int = THROTTLED_CHUNK_SIZE
+        if throttle is not None and throttle.bytes is not None:
+            self.on_chunk = throttle.wait_bytes
+            self.chunk_size = get_throttled_chunk_size(throttle.bytes.rate)
+
+    def get_pacer(self, source: Path) -> Optional[ChunkPacer]:
+        """Return pacer of file transfer (None, if bandwidth isn't limited)."""
+        if self.on_chunk is None:
+            return None
+        return ChunkPacer(self.on_chunk, source.stat().st_size, self.chunk_size)
+
+    def link_or_clone(self, source: Path, target: Path) -> Optional[str]:
+        """Return method, if file is transferred without copying its content."""
+        if self.hardlink and try_hardlink(source, target):
+            return METHOD_HARDLINK
+        return self.transfer_in_kernel(source, target, KERNEL_METHODS[:1])
+
+    def transfer(self, source: Path, target: Path) -> str:
+        """Transfer file with its metadata and return used method."""
+        if self.throttle is not None:
+            self.throttle.wait_file()
+        if self.hardlink and try_hardlink(source, target):
+            return METHOD_HARDLINK
+        pacer = self.get_pacer(source)
+        method = self.transfer_in_kernel(source, target, KERNEL_METHODS, pacer)
+        if method is not None:
+            return method
+        if pacer is not None:
+            copy_by_chunks(source, target, pacer)
+        else:
+            shutil.copy2(source, target)
+        return METHOD_COPY
+
+    def transfer_in_kernel(
+        self,
+        source: Path,
+        target: Path,
+        methods: List[Tuple[str, KernelMethod]],
+        pacer: Optional[ChunkPacer] = None,
+    ) -> Optional[str]:
+        """Return the first supported method, which transferred file content.
+
+        Metadata is copied as well, None is returned if no methods fit.
+        """
+        if not self.kernel_copy:
+            return None
+        with open(source, "rb") as src, open(target, "wb") as dst:
+            for method, try_method in methods:
+                if try_method(src.fileno(), dst.fileno(), pacer):
+                    break
+            else:
+                return None
+        shutil.copystat(source, target)
+        return method
@@ -1,17 +1,129 @@
 """Module with utilities (helpers)."""
+import codecs
+from collections import OrderedDict
+import json
+import os
 from pathlib import Path
+import threading
+from typing import Optional, Tuple, TYPE_CHECKING
 
-from charset_normalizer import from_path
 from click import ClickException
 
+from ._timings import stage_timings
 
-def _detect_file_encoding(path: Path) -> str:
+if TYPE_CHECKING:  # pragma: no cover
+    import sqlite3
+
+
+ENCODING_CACHE_FILE_NAME: str = "encodings.json"
+ENCODING_CACHE_MAX_SIZE: int = 1024
+# Bytes from the beginning of file for fast encoding detection
+ENCODING_SAMPLE_SIZE: int = 64 * 1024
+
+# Absolute path, size and modification time (in nanoseconds) of file
+FileIdentity = Tuple[str, int, int]
+
+
+class EncodingCache(object):
+    """Bounded LRU cache of detected encodings.
+
+    Entries are keyed by file identity (path, size and mtime),
+    so changed file is detected again.
+    Cache lives in memory and can be saved to a file and loaded back.
+    """
+
+    def __init__(self, max_size: int = ENCODING_CACHE_MAX_SIZE) -> None:
+        """Initialization of class instance."""
+        self.max_size: int = max_size
+        self.file: Optional[Path] = None
+        self._entries: "OrderedDict[FileIdentity, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return number of cached encodings."""
+        return len(self._entries)
+
+    def get(self, key: FileIdentity) -> Optional[str]:
+        """Return cached encoding and mark it as recently used."""
+        with self._lock:
+            encoding = self._entries.get(key)
+            if encoding is not None:
+                self._entries.move_to_end(key)
+            return encoding
+
+    def put(self, key: FileIdentity, encoding: str) -> None:
+        """Cache encoding and evict least recently used ones."""
+        with self._lock:
+            self._entries[key] = encoding
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all cached encodings."""
+        with self._lock:
+            self._entries.clear()
+
+    def load(self, file: Path) -> None:
+        """Load cached encodings from file and remember it for saving.
+
+        Absent or broken cache file is ignored.
+        """
+        self.file = file
+        try:
+            data = json.loads(file.read_text(encoding="utf-8"))
+            entries = [
+                ((str(path), int(size), int(mtime_ns)), str(encoding))
+                for path, size, mtime_ns, encoding in data["entries"]
+            ]
+        except (OSError, ValueError, KeyError, TypeError):
+            return
+        for key, encoding in entries:
+            self.put(key, encoding)
+
+    def save(self) -> None:
+        """Save cached encodings into loaded file (if any)."""
+        if self.file is None:
+            return
+        with self._lock:
+            entries = [[*key, encoding] for key, encoding in self._entries.items()]
+        try:
+            self.file.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = self.file.with_name(self.file.name + ".tmp")
+            temp_file.write_text(
+                json.dumps({"version": 1, "entries": entries}), encoding="utf-8"
+            )
+            os.replace(temp_file, self.file)
+        except OSError:
+            # Cache is optional, it must not break the main action
+            pass
+
+
+encoding_cache = EncodingCache()
+
+
+def _get_file_identity(path: Path) -> FileIdentity:
+    """Return absolute path, size and mtime of file."""
+    stat = path.stat()
+    return str(path.resolve()), stat.st_size, stat.st_mtime_ns
+
+
+def _detect_file_encoding(
+    path: Path,
+    sample_size: Optional[int] = None,
+    cache: Optional[EncodingCache] = None,
+) -> str:
     """Return an approximate encoding of text file.
 
-    Performs an encoding detection and BOM check.
+    Performs a BOM check and strict UTF-8 decoding of file sample first.
+    Only if it's not enough, a statistical encoding detection is performed.
+    Detected encoding is cached for unchanged file.
 
     Args:
         path: The path to playlist file
+        sample_size: Number of bytes for fast detection
+            ('ENCODING_SAMPLE_SIZE' by default)
+        cache: Cache of detected encodings ('encoding_cache' by default)
 
     Returns:
         A string with "best" encoding from following:
@@ -21,6 +133,99 @@ def _detect_file_encoding(path: Path) -> str:
         ClickException: The file was no found or
             the encoding was not retrieved from 'charset_normalizer'
     """
+    try:
+        identity = _get_file_identity(path)
+    except OSError as error:
+        message = str(error)
+        raise ClickException(message)
+    if cache is None:
+        cache = encoding_cache
+    with stage_timings.measure("detect encoding") as stage:
+        encoding = cache.get(identity)
+        if encoding is None:
+            encoding = _sniff_file_encoding(path, identity[1], sample_size)
+            if encoding is None:
+                encoding = _detect_file_encoding_statistically(path)
+            cache.put(identity, encoding)
+        stage.bytes = identity[1]
+        stage.items = 1
+    return encoding
+
+
+def _sniff_file_encoding(
+    path: Path, file_size: int, sample_size: Optional[int] = None
+) -> Optional[str]:
+    """Return encoding, which is obvious from the beginning of file.
+
+    Args:
+        path: The path to playlist file
+        file_size: Size of file in bytes
+        sample_size: Number of bytes to read
+
+    Returns:
+        Encoding from BOM or 'utf-8' (if sample is valid UTF-8 text).
+        None, if statistical detection is required.
+    """
+    if path.suffix == ".aimppl4":
+        return "utf-16-le"
+    if sample_size is None:
+        sample_size = ENCODING_SAMPLE_SIZE
+    sample = _read_file_sample(path, max(sample_size, len(codecs.BOM_UTF8)))
+    if sample.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    if sample.startswith(codecs.BOM_UTF16_LE):
+        return "utf_16_le"
+    if b"\x00" in sample:
+        # Looks like UTF-16 without BOM
+        return None
+    is_whole_file = len(sample) >= file_size
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=is_whole_file)
+    except UnicodeDecodeError:
+        return None
+    if is_whole_file or not sample.isascii():
+        return "utf-8"
+    # Only ASCII characters in sample, the rest of file is unknown
+    return None
+
+
+def _read_file_sample(path: Path, size: int) -> bytes:
+    """Return first bytes of file.
+
+    Args:
+        path: The path to file
+        size: Number of bytes to read
+
+    Returns:
+        Bytes from the beginning of file.
+
+    Raises:
+        ClickException: The file can't be read
+    """
+    try:
+        with open(path, "rb") as f:
+            return f.read(size)
+    except OSError as error:
+        message = str(error)
+        raise ClickException(message)
+
+
+def _detect_file_encoding_statistically(path: Path) -> str:
+    """Return an approximate encoding of text file with charset_normalizer.
+
+    Args:
+        path: The path to playlist file
+
+    Returns:
+        A string with "best" encoding.
+
+    Raises:
+        ClickException: The file was no found or
+            the encoding was not retrieved from 'charset_normalizer'
+    """
+    # Detection machinery is heavy, import it only when it's really needed
+    from charset_normalizer import from_path
+
     try:
         detection_results = from_path(
             path, cp_isolation=["utf_8", "cp1252", "cp1251", "utf_16_le"]
@@ -42,3 +247,31 @@ def _detect_file_encoding(path: Path) -> str:
     except (OSError, AttributeError) as error:
         message = str(error)
         raise ClickException(message)
+
+
+def _open_cache_database(file: Path, schema: str) -> "sqlite3.Connection":
+    """Return connection to SQLite cache with created table.
+
+    Cache is optional, so broken database is recreated.
+    """
+    import sqlite3
+
+    file.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        return _connect_cache_database(file, schema)
+    except sqlite3.DatabaseError:
+        file.unlink(missing_ok=True)
+        return _connect_cache_database(file, schema)
+
+
+def _connect_cache_database(file: Path, schema: str) -> "sqlite3.Connection":
+    """Return connection to database, which table is created by 'schema'."""
+    import sqlite3
+
+    connection = sqlite3.connect(file)
+    try:
+        connection.execute(schema)
+    except sqlite3.DatabaseError:
+        connection.close()
+        raise
+    return connection
@@ -0,0 +1,129 @@
+"""Module with polling watcher of playlist files."""
+import os
+from pathlib import Path
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+# Size and modification time (in nanoseconds) of file
+FileState = Tuple[int, int]
+
+# Delay before retrying of failed playlist (doubled after each failure)
+RETRY_DELAY: float = 5.0
+MAX_RETRY_DELAY: float = 300.0
+
+
+def get_watch_key(path: Path) -> Path:
+    """Return absolute path to file (without resolving symlinks)."""
+    return Path(os.path.abspath(path))
+
+
+def get_file_state(path: Path) -> Optional[FileState]:
+    """Return size and mtime of file (None, if it's absent)."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class PlaylistWatcher(object):
+    """Poller of playlist files, which reports only settled changes.
+
+    Each poll stats all collected files. A changed file is reported
+    only when its size and mtime stay the same for 'debounce' seconds,
+    so a burst of edits results in one report. A failed file is reported
+    again after it's changed or after retry delay (exponential backoff).
+    """
+
+    def __init__(
+        self,
+        collect: Callable[[], List[Path]],
+        debounce: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialization of class instance."""
+        self.collect: Callable[[], List[Path]] = collect
+        self.debounce: float = debounce
+        self.clock: Callable[[], float] = clock
+        # States of files, which have been processed already
+        self.seen: Dict[Path, FileState] = {}
+        # Last observed states of changed files and times of observation
+        self.pending: Dict[Path, Tuple[FileState, float]] = {}
+        # Failed states of files, numbers of failures and times of retries
+        self.failed: Dict[Path, Tuple[FileState, int, float]] = {}
+
+    def scan(self) -> Dict[Path, FileState]:
+        """Return states of existing playlists."""
+        try:
+            paths = self.collect()
+        except OSError:
+            # Watched folder can be temporarily unavailable
+            return {}
+        states: Dict[Path, FileState] = {}
+        for path in paths:
+            state = get_file_state(path)
+            if state is not None:
+                states[get_watch_key(path)] = state
+        return states
+
+    def prime(self) -> None:
+        """Treat current playlists as already processed."""
+        self.seen.update(self.scan())
+
+    def poll(self) -> List[Path]:
+        """Return changed playlists, which haven't been changed recently.
+
+        Returns:
+            Absolute paths to playlists.
+        """
+        now = self.clock()
+        ready: List[Path] = []
+        for path, state in self.scan().items():
+            if self.seen.get(path) == state:
+                self.pending.pop(path, None)
+                continue
+            if self.is_waiting_for_retry(path, state, now):
+                continue
+            observed = self.pending.get(path)
+            if observed is None or observed[0] != state:
+                observed = (state, now)
+                self.pending[path] = observed
+            if now - observed[1] >= self.debounce:
+                ready.append(path)
+        return ready
+
+    def is_waiting_for_retry(self, path: Path, state: FileState, now: float) -> bool:
+        """Return True, if failed playlist is unchanged and its retry isn't due."""
+        failure = self.failed.get(path)
+        if failure is None:
+            return False
+        if failure[0] != state:
+            # Changed playlist is tried again as a new one
+            del self.failed[path]
+            return False
+        return now < failure[2]
+
+    def mark_processed(self, path: Path) -> None:
+        """Remember the reported state of playlist as processed."""
+        self.failed.pop(path, None)
+        observed = self.pending.pop(path, None)
+        if observed is not None:
+            self.seen[path] = observed[0]
+
+    def mark_failed(self, path: Path) -> None:
+        """Postpone retry of the reported state of playlist."""
+        observed = self.pending.get(path)
+        if observed is None:
+            return
+        failure = self.failed.get(path)
+        count = failure[1] + 1 if failure and failure[0] == observed[0] else 1
+        delay = min(RETRY_DELAY * 2 ** (count - 1), MAX_RETRY_DELAY)
+        self.failed[path] = (observed[0], count, self.clock() + delay)
+
+    def ignore_current_state(self, path: Path) -> None:
+        """Remember current state of file (e.g. written by ourselves)."""
+        state = get_file_state(path)
+        if state is not None:
+            self.seen[get_watch_key(path)] = state
+            self.pending.pop(get_watch_key(path), None)
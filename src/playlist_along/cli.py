@@ -1,16 +1,93 @@
 """CLI main click group."""
+import functools
+import importlib
+from pathlib import Path
+from typing import Dict, List, Optional, TYPE_CHECKING
+
 import click
+from click import Context, Option
+
+from ._timings import stage_timings
+from ._utils import ENCODING_CACHE_FILE_NAME, EncodingCache
+from .playlist import Playlist, validate_encoding_callback, validate_file_callback
+
+if TYPE_CHECKING:  # pragma: no cover
+    import cProfile
+
+
+# Commands are imported only when they are invoked (or listed in help)
+LAZY_SUBCOMMANDS: Dict[str, str] = {
+    "batch": "playlist_along.commands.batch.batch_cmd",
+    "check": "playlist_along.commands.check.check_cmd",
+    "display": "playlist_along.commands.display.display_cmd",
+    "convert": "playlist_along.commands.convert.convert_cmd",
+    "inject": "playlist_along.commands.inject.inject_cmd",
+    "create": "playlist_along.commands.create.create_cmd",
+    "watch": "playlist_along.commands.watch.watch_cmd",
+    "dedupe": "playlist_along.commands.dedupe.dedupe_cmd",
+}
+# These commands don't need '--file' option
+SUBCOMMANDS_WITHOUT_FILE: List[str] = ["batch", "watch"]
+
+
+class LazyGroup(click.Group):
+    """Click group, which imports its subcommands on demand."""
+
+    def __init__(
+        self,
+        *args: object,
+        lazy_subcommands: Optional[Dict[str, str]] = None,
+        **kwargs: object,
+    ) -> None:
+        """Initialization of class instance."""
+        super().__init__(*args, **kwargs)  # type: ignore
+        # Loaded commands are removed, so mapping passed by caller isn't changed
+        self.lazy_subcommands: Dict[str, str] = dict(lazy_subcommands or {})
+
+    def list_commands(self, ctx: Context) -> List[str]:
+        """Return sorted names of regular and lazy subcommands."""
+        return sorted([*super().list_commands(ctx), *self.lazy_subcommands])
 
-from playlist_along import __version__
-from .commands import convert, create, display, inject
-from .playlist import Playlist, validate_file_callback
+    def get_command(self, ctx: Context, cmd_name: str) -> Optional[click.Command]:
+        """Return subcommand, importing it at first access."""
+        if cmd_name in self.lazy_subcommands:
+            self.add_command(self._load_command(cmd_name), cmd_name)
+            del self.lazy_subcommands[cmd_name]
+        return super().get_command(ctx, cmd_name)
+
+    def _load_command(self, cmd_name: str) -> click.Command:
+        """Import subcommand object by its dotted path."""
+        module_name, attr_name = self.lazy_subcommands[cmd_name].rsplit(".", 1)
+        command = getattr(importlib.import_module(module_name), attr_name)
+        if not isinstance(command, click.Command):
+            raise ValueError(f"Lazy loading of '{cmd_name}' failed")
+        return command
+
+
+def print_version_callback(ctx: Context, param: Option, value: bool) -> None:
+    """Print version of the package (retrieved only on demand)."""
+    if not value or ctx.resilient_parsing:
+        return
+    from playlist_along import __version__
+
+    click.echo(f"{ctx.find_root().info_name}, version {__version__}")
+    ctx.exit()
 
 
 @click.group(
+    cls=LazyGroup,
+    lazy_subcommands=LAZY_SUBCOMMANDS,
     invoke_without_command=True,
     no_args_is_help=True,
 )
-@click.version_option(version=__version__)
+@click.option(
+    "--version",
+    is_flag=True,
+    expose_value=False,
+    is_eager=True,
+    callback=print_version_callback,
+    help="Show the version and exit.",
+)
 @click.option(
     "--file",
     "-f",
@@ -20,23 +97,104 @@ from .playlist import Playlist, validate_file_callback
     help="Full path to playlist file.",
     metavar="<string>",
 )
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False),
+    envvar="PLAYLIST_ALONG_CACHE_DIR",
+    help="Folder for keeping caches between runs (e.g. detected encodings).",
+    metavar="<string>",
+)
+@click.option(
+    "--encoding",
+    "-e",
+    type=str,
+    callback=validate_encoding_callback,
+    help="Encoding of playlist file (skips encoding detection).",
+    metavar="<string>",
+)
+@click.option(
+    "--sample-size",
+    type=click.IntRange(min=1),
+    help="Number of bytes of playlist beginning for fast encoding detection.",
+    metavar="<int>",
+)
+@click.option(
+    "--timings",
+    type=click.Choice(["table", "json"]),
+    help="Print time, bytes and items of each processing stage (to stderr).",
+)
+@click.option(
+    "--profile",
+    "profile_file",
+    type=click.Path(dir_okay=False),
+    help="Save cProfile statistics of main thread into file.",
+    metavar="<string>",
+)
 @click.pass_context
-def cli_main(ctx: click.Context, file: str) -> None:
+def cli_main(
+    ctx: click.Context,
+    file: str,
+    cache_dir: str,
+    encoding: str,
+    sample_size: int,
+    timings: str,
+    profile_file: str,
+) -> None:
     """Playlist Along - a CLI for playlist processing."""
+    if timings:
+        stage_timings.start()
+        ctx.call_on_close(functools.partial(echo_stage_timings, timings))
+    if profile_file:
+        start_profiling(ctx, Path(profile_file))
     ctx.obj = Playlist(file)
+    ctx.obj.encoding = encoding
+    ctx.obj.sample_size = sample_size
+    if cache_dir:
+        ctx.obj.cache_dir = Path(cache_dir)
+        # Saved encodings are used only by this invocation
+        ctx.obj.encoding_cache = EncodingCache()
+        ctx.obj.encoding_cache.load(ctx.obj.cache_dir / ENCODING_CACHE_FILE_NAME)
+        ctx.call_on_close(ctx.obj.encoding_cache.save)
 
     if file is None:
+        if ctx.invoked_subcommand in SUBCOMMANDS_WITHOUT_FILE:
+            return
         click.echo("No file for script. Try 'playlist-along --help' for help.")
         ctx.exit()
     else:
         if ctx.invoked_subcommand is None:
-            ctx.invoke(display.display_cmd)
+            display_cmd = cli_main.get_command(ctx, "display")
+            if display_cmd is not None:
+                ctx.invoke(display_cmd)
+
+
+def echo_stage_timings(output_format: str) -> None:
+    """Stop recording of stages and print them as a table or JSON."""
+    stage_timings.stop()
+    if output_format == "json":
+        click.echo(stage_timings.format_json(), err=True)
+    else:
+        click.echo(stage_timings.format_table(), err=True)
+
+
+def start_profiling(ctx: Context, file: Path) -> None:
+    """Run cProfile until the end of command and save statistics into file."""
+    import cProfile
+
+    profiler = cProfile.Profile()
+    ctx.call_on_close(functools.partial(stop_profiling, profiler, file))
+    profiler.enable()
 
 
-cli_main.add_command(display.display_cmd)
-cli_main.add_command(convert.convert_cmd)
-cli_main.add_command(inject.inject_cmd)
-cli_main.add_command(create.create_cmd)
+def stop_profiling(profiler: "cProfile.Profile", file: Path) -> None:
+    """Stop profiler and dump its statistics (for 'pstats' or 'snakeviz')."""
+    profiler.disable()
+    try:
+        profiler.dump_stats(file)
+    except (OSError) as error:
+        message = str(error)
+        raise click.ClickException(message)
+    click.echo(f"Profile was saved into '{file}'.", err=True)
 
 
 if __name__ == "__main__":
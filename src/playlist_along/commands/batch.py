@@ -0,0 +1,297 @@
+"""Batch command."""
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import glob
+import io
+import os
+from pathlib import Path
+import sys
+import threading
+import time
+from typing import Iterator, List, NamedTuple, Optional, Sequence, TextIO
+
+import click
+
+from ..playlist import Playlist, SUPPORTED_PLS_FILES
+
+
+BATCH_COMMANDS: List[str] = ["check", "convert", "dedupe", "display", "inject"]
+
+
+class BatchResult(NamedTuple):
+    """Outcome of running a command for one playlist."""
+
+    path: Path
+    output: str
+    seconds: float
+    error: Optional[str] = None
+
+
+class ThreadLocalOutput(io.TextIOBase):
+    """Text stream, which collects output of each worker thread separately.
+
+    Output of threads without a started capture goes to the original stream.
+    """
+
+    def __init__(self, stream: TextIO) -> None:
+        """Initialization of class instance."""
+        self.stream: TextIO = stream
+        self._local = threading.local()
+
+    @property
+    def encoding(self) -> str:  # type: ignore[override]
+        """Return encoding of the original stream."""
+        return self.stream.encoding or "utf-8"
+
+    def writable(self) -> bool:
+        """Return True, stream is always writable."""
+        return True
+
+    def write(self, text: str) -> int:
+        """Write text into buffer of current thread (or original stream)."""
+        buffer: Optional[io.StringIO] = getattr(self._local, "buffer", None)
+        if buffer is None:
+            return self.stream.write(text)
+        return buffer.write(text)
+
+    def flush(self) -> None:
+        """Flush the original stream (buffers need no flushing)."""
+        if getattr(self._local, "buffer", None) is None:
+            self.stream.flush()
+
+    def start_capture(self) -> None:
+        """Start collecting output of current thread."""
+        self._local.buffer = io.StringIO()
+
+    def stop_capture(self) -> str:
+        """Stop collecting output of current thread and return it."""
+        buffer: io.StringIO = self._local.buffer
+        self._local.buffer = None
+        return buffer.getvalue()
+
+
+@contextmanager
+def capture_threads_output() -> Iterator[ThreadLocalOutput]:
+    """Replace stdout with per-thread output collector temporarily."""
+    original = sys.stdout
+    output = ThreadLocalOutput(original)
+    sys.stdout = output
+    try:
+        yield output
+    finally:
+        sys.stdout = original
+
+
+@click.command(
+    name="batch",
+    context_settings={"ignore_unknown_options": True, "allow_interspersed_args": False},
+)
+@click.option(
+    "--glob",
+    "-g",
+    "patterns",
+    type=str,
+    multiple=True,
+    help="Glob pattern of playlists ('**' matches nested folders).",
+    metavar="<string>",
+)
+@click.option(
+    "--dir",
+    "folders",
+    type=click.Path(exists=True, file_okay=False),
+    multiple=True,
+    help="Folder with playlists.",
+    metavar="<string>",
+)
+@click.option(
+    "--manifest",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Text file with paths to playlists (one per line).",
+    metavar="<string>",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of playlists processed simultaneously.",
+    metavar="<int>",
+)
+@click.argument("command_name", type=click.Choice(BATCH_COMMANDS))
+@click.argument("command_args", nargs=-1, type=click.UNPROCESSED)
+@click.pass_context
+def batch_cmd(
+    ctx: click.Context,
+    patterns: Sequence[str],
+    folders: Sequence[str],
+    manifest: Optional[str],
+    jobs: int,
+    command_name: str,
+    command_args: Sequence[str],
+) -> None:
+    """Runs command for many playlists.
+
+    Options after COMMAND_NAME are passed to the command itself.
+    """
+    paths = collect_playlists(patterns, folders, manifest)
+    if not paths:
+        raise click.ClickException("No playlists were found for batch.")
+    command = get_sibling_command(ctx, command_name)
+    # Options of command are checked only once
+    params = command.make_context(
+        command_name, list(command_args), parent=ctx.find_root()
+    ).params
+    if params.get("delete") and len(paths) > 1:
+        # Each playlist would delete tracks of other ones from shared folder
+        raise click.UsageError(
+            "Option '--delete' can't be used for several playlists "
+            "(they share '--dest' folder)."
+        )
+
+    start = time.perf_counter()
+    with capture_threads_output() as output:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            results = executor.map(
+                lambda path: run_command_for_playlist(
+                    ctx, command, command_args, path, output
+                ),
+                paths,
+            )
+            failed = echo_batch_results(results, output.stream)
+    elapsed = time.perf_counter() - start
+
+    click.echo(
+        f"Processed {len(paths)} playlists: {len(paths) - failed} succeeded, "
+        f"{failed} failed in {elapsed:.3f} s."
+    )
+    if failed:
+        raise click.ClickException(f"{failed} playlists were NOT processed.")
+
+
+def get_sibling_command(ctx: click.Context, command_name: str) -> click.Command:
+    """Return another command of the main group.
+
+    Args:
+        ctx: Context of current command
+        command_name: Name of needed command
+
+    Returns:
+        Command object.
+
+    Raises:
+        ClickException: Command was not found
+    """
+    group = ctx.find_root().command
+    command = None
+    if isinstance(group, click.Group):
+        command = group.get_command(ctx, command_name)
+    if command is None:
+        raise click.ClickException(f"Command '{command_name}' is not available.")
+    return command
+
+
+def collect_playlists(
+    patterns: Sequence[str], folders: Sequence[str], manifest: Optional[str]
+) -> List[Path]:
+    """Return unique paths to playlists from globs, folders and manifest.
+
+    Args:
+        patterns: Glob patterns of playlist files
+        folders: Folders with playlists (only supported formats are taken)
+        manifest: Text file with paths to playlists (relative to its folder).
+            Empty lines and lines started with '#' are ignored
+
+    Returns:
+        Paths in order of arguments (the first occurrence is kept).
+    """
+    paths: List[Path] = []
+    for pattern in patterns:
+        paths.extend(
+            Path(found) for found in sorted(glob.glob(pattern, recursive=True))
+        )
+    for folder in folders:
+        with os.scandir(folder) as entries:
+            paths.extend(
+                sorted(
+                    Path(entry.path)
+                    for entry in entries
+                    if entry.is_file()
+                    and Path(entry.name).suffix in SUPPORTED_PLS_FILES
+                )
+            )
+    if manifest:
+        paths.extend(read_manifest(Path(manifest)))
+    return list({path: None for path in paths if not path.is_dir()})
+
+
+def read_manifest(manifest: Path) -> List[Path]:
+    """Return paths to playlists listed in manifest file."""
+    paths: List[Path] = []
+    for line in manifest.read_text(encoding="utf-8-sig").splitlines():
+        line = line.strip()
+        if line and not line.startswith("#"):
+            paths.append(manifest.parent / line)
+    return paths
+
+
+def run_command_for_playlist(
+    ctx: click.Context,
+    command: click.Command,
+    command_args: Sequence[str],
+    path: Path,
+    output: ThreadLocalOutput,
+) -> BatchResult:
+    """Run command for one playlist and collect its output.
+
+    Errors are caught, so they do not stop processing of other playlists.
+
+    Args:
+        ctx: Context of batch command
+        command: Command to run
+        command_args: Options of command
+        path: The path to playlist
+        output: Collector of commands output
+
+    Returns:
+        Result with output, time and error message (if any).
+    """
+    error: Optional[str] = None
+    if path.suffix not in SUPPORTED_PLS_FILES:
+        error = "currently we are supporting only these formats: %s" % (
+            SUPPORTED_PLS_FILES
+        )
+        return BatchResult(path, "", 0.0, error)
+    output.start_capture()
+    start = time.perf_counter()
+    try:
+        pls_obj: Playlist = ctx.obj.with_path(str(path))
+        pls_obj.encoding = ctx.obj.encoding
+        with command.make_context(
+            command.name, list(command_args), parent=ctx.find_root()
+        ) as sub_ctx:
+            sub_ctx.obj = pls_obj
+            command.invoke(sub_ctx)
+    except click.exceptions.Exit as exit_error:
+        if exit_error.exit_code:
+            error = f"exited with code {exit_error.exit_code}"
+    except click.ClickException as click_error:
+        error = click_error.format_message()
+    except Exception as unexpected_error:
+        # One broken playlist must not stop the whole batch
+        error = f"{type(unexpected_error).__name__}: {unexpected_error}"
+    seconds = time.perf_counter() - start
+    return BatchResult(path, output.stop_capture(), seconds, error)
+
+
+def echo_batch_results(results: Iterator[BatchResult], stream: TextIO) -> int:
+    """Echo output and status of each playlist and return number of failures."""
+    failed = 0
+    for result in results:
+        click.echo(result.output, nl=False, file=stream)
+        if result.error is None:
+            click.echo(f"[OK] {result.path} ({result.seconds:.3f} s)", file=stream)
+        else:
+            failed += 1
+            click.echo(f"[FAILED] {result.path}: {result.error}", file=stream)
+    return failed
@@ -0,0 +1,65 @@
+"""Check command."""
+from pathlib import Path
+from typing import List, Tuple
+
+import click
+
+from .. import playlist
+from .._checking import check_tracks, CheckReport
+from .._timings import stage_timings
+from ..playlist import pass_playlist, Playlist
+
+
+@click.command(name="check")
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    help="Number of folders checked simultaneously.",
+    metavar="<int>",
+)
+@click.option(
+    "--readable",
+    is_flag=True,
+    help="Check read permission of each track (slower on network drives).",
+)
+@pass_playlist
+def check_cmd(pls_obj: Playlist, jobs: int, readable: bool) -> None:
+    """Checks that tracks from playlist are available.
+
+    Relative paths of tracks are relative to the playlist folder.
+    """
+    file: Path = pls_obj.path
+    if playlist.is_file_too_small(file):
+        click.echo("Warning: Playlist is too small to check. Exit.")
+        click.get_current_context().exit()
+
+    with stage_timings.measure("check") as stage:
+        report = check_tracks(
+            pls_obj.iter_local_tracks(), file.parent, jobs, readable
+        )
+        stage.items = report.checked
+    echo_check_report(report)
+    failed = len(report.missing) + len(report.unreadable)
+    if failed:
+        raise click.ClickException(f"{failed} tracks are NOT available.")
+
+
+def echo_check_report(report: CheckReport) -> None:
+    """Echo problem tracks and totals."""
+    problems: List[Tuple[str, List[str]]] = [
+        ("Missing tracks:", report.missing),
+        ("Unreadable tracks:", report.unreadable),
+        ("Duplicate tracks:", report.duplicates),
+    ]
+    for title, tracks in problems:
+        if tracks:
+            click.echo(title)
+            click.echo("\n".join(tracks))
+    click.echo(
+        f"Checked {report.checked} tracks in {report.folders} folders: "
+        f"{len(report.missing)} missing, {len(report.unreadable)} unreadable, "
+        f"{len(report.duplicates)} duplicates."
+    )
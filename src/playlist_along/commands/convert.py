@@ -1,11 +1,12 @@
 """Convert command."""
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
 import click
 
 from .. import playlist
-from ..playlist import pass_playlist, Playlist
+from .._timings import stage_timings
+from ..playlist import pass_playlist, Playlist, validate_size_callback
 
 
 @click.command(name="convert")
@@ -27,27 +28,186 @@ from ..playlist import pass_playlist, Playlist
     is_flag=True,
     help="Tells script that destination is a dir, not a file (for directory name with '.' dot).",
 )
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of files copied simultaneously (with '--copy').",
+    metavar="<int>",
+)
+@click.option(
+    "--sync",
+    is_flag=True,
+    help="Copy only new or changed files (by size and modification time).",
+)
+@click.option(
+    "--checksum",
+    is_flag=True,
+    help="Compare content hashes of changed files (with '--sync').",
+)
+@click.option(
+    "--delete",
+    is_flag=True,
+    help="Delete synced files, which are no longer in playlist (with '--sync').",
+)
+@click.option(
+    "--async-io",
+    is_flag=True,
+    help=(
+        "Copy files with asyncio engine (for network drives), "
+        "'--jobs' is a number of files per source drive."
+    ),
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    help="Continue interrupted copying, skipping files copied before (with '--copy').",
+)
+@click.option(
+    "--hardlink",
+    is_flag=True,
+    help=(
+        "Hard link files instead of copying, "
+        "if destination is on the same drive (with '--copy')."
+    ),
+)
+@click.option(
+    "--max-bandwidth",
+    callback=validate_size_callback,
+    help="Limit of copying speed per second for all jobs, e.g. 512K, 10M.",
+    metavar="<size>",
+)
+@click.option(
+    "--max-files-per-sec",
+    type=click.FloatRange(min=0, min_open=True),
+    help="Limit of files copied per second for all jobs.",
+    metavar="<float>",
+)
+@click.option(
+    "--dry-run",
+    is_flag=True,
+    help=(
+        "Show plan of copying (number of files, size and estimated time) "
+        "without converting and copying."
+    ),
+)
+@click.option(
+    "--store",
+    type=click.Path(file_okay=False),
+    help=(
+        "Keep each unique file once in this folder "
+        "and hard link it into destination (instead of '--copy')."
+    ),
+    metavar="<string>",
+)
+@click.option(
+    "--symlink",
+    is_flag=True,
+    help="Make symbolic links to files in store (with '--store').",
+)
 @pass_playlist
-def convert_cmd(pls_obj: Playlist, dest: str, yes_dir: bool, copy: bool) -> None:
+def convert_cmd(
+    pls_obj: Playlist,
+    dest: str,
+    yes_dir: bool,
+    copy: bool,
+    jobs: int,
+    sync: bool,
+    checksum: bool,
+    delete: bool,
+    async_io: bool,
+    resume: bool,
+    hardlink: bool,
+    max_bandwidth: Optional[int],
+    max_files_per_sec: Optional[float],
+    dry_run: bool,
+    store: Optional[str],
+    symlink: bool,
+) -> None:
     """Converts playlist from one player to another."""
+    if store and sync:
+        raise click.UsageError("Option '--store' can't be used with '--sync'.")
+    if resume and sync:
+        raise click.UsageError("Option '--resume' can't be used with '--sync'.")
+    for name, value in (("--delete", delete), ("--checksum", checksum)):
+        if value and not sync:
+            raise click.UsageError(f"Option '{name}' requires '--sync'.")
+    if symlink and not store:
+        raise click.UsageError("Option '--symlink' requires '--store'.")
     file: Path = pls_obj.path
     if playlist.is_file_too_small(file):
         click.echo("Warning: Playlist is too small to convert. Exit.")
         click.get_current_context().exit()
     else:
-        convert_from_aimp_to_vlc_android(file, dest, yes_dir)
-        if copy:
-            copy_files_from_playlist_to_destination_folder(file, dest)
+        is_copying = copy or sync or resume or dry_run or bool(store)
+        if is_copying:
+            # Playlist is used twice, so parse it only once
+            pls_obj.load()
+        if not dry_run:
+            convert_from_aimp_to_vlc_android(pls_obj, dest, yes_dir)
+        if is_copying:
+            copy_files_from_playlist_to_destination_folder(
+                pls_obj,
+                dest,
+                jobs,
+                sync,
+                checksum,
+                delete,
+                async_io,
+                resume,
+                hardlink,
+                max_bandwidth,
+                max_files_per_sec,
+                dry_run,
+                store,
+                symlink,
+            )
 
 
-def convert_from_aimp_to_vlc_android(file: Path, dest: str, yes_dir: bool) -> None:
+def convert_from_aimp_to_vlc_android(pls: Playlist, dest: str, yes_dir: bool) -> None:
     """Converts AIMP playlist to VLC for Android."""
-    converted_pls, encoding = playlist.get_playlist_for_vlc_android(file)
-    playlist.save_playlist_content(converted_pls, Path(dest), encoding, file, yes_dir)
+    encoding = pls.get_encoding()
+    converted_lines = stage_timings.iter_stage(
+        "convert", playlist.convert_lines_for_vlc_android(pls.iter_lines())
+    )
+    playlist.write_playlist_lines(
+        converted_lines, Path(dest), encoding, pls.path, yes_dir
+    )
 
 
-def copy_files_from_playlist_to_destination_folder(file: Path, dest: str) -> None:
+def copy_files_from_playlist_to_destination_folder(
+    pls: Playlist,
+    dest: str,
+    jobs: int = 1,
+    sync: bool = False,
+    checksum: bool = False,
+    delete: bool = False,
+    async_io: bool = False,
+    resume: bool = False,
+    hardlink: bool = False,
+    max_bandwidth: Optional[int] = None,
+    max_files_per_sec: Optional[float] = None,
+    dry_run: bool = False,
+    store: Optional[str] = None,
+    symlink: bool = False,
+) -> None:
     """Copy tracks from playlist to folder with converted playlist."""
-    content, encoding = playlist.get_full_content_of_playlist(file)
-    only_tracks: List[str] = playlist.get_local_tracks_without_comment_lines(content)
-    playlist.copy_local_tracks_to_folder(only_tracks, dest)
+    only_tracks: List[str] = list(pls.iter_local_tracks())
+    playlist.copy_local_tracks_to_folder(
+        only_tracks,
+        dest,
+        jobs,
+        sync,
+        checksum,
+        delete,
+        async_io,
+        resume,
+        hardlink,
+        max_bandwidth,
+        max_files_per_sec,
+        dry_run,
+        store,
+        symlink,
+    )
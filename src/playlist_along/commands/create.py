@@ -1,12 +1,17 @@
 """Create command."""
+from concurrent.futures import ThreadPoolExecutor
+import contextlib
+from fnmatch import fnmatch
+import os
 from pathlib import Path
-from typing import Any, Iterator, List, Tuple
+from typing import Any, ContextManager, Iterator, List, Optional, Sequence
+from typing import Set, Tuple
 
 import click
-from mutagen._file import File as MutagenFile
-from natsort import os_sorted
 
 from .. import playlist
+from .._metadata_cache import METADATA_CACHE_FILE_NAME, MetadataCache
+from .._timings import stage_timings
 from ..playlist import pass_playlist
 from ..playlist import Playlist
 from ..playlist import SONG_FORMATS
@@ -60,6 +65,58 @@ from ..playlist import SONG_FORMATS
     is_flag=True,
     help="Reverse the order of playlist.",
 )
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of audio files read simultaneously (with '--ext-m3u').",
+    metavar="<int>",
+)
+@click.option(
+    "--recursive",
+    "-r",
+    "is_recursive",
+    is_flag=True,
+    help="Pick up audio files from sub-folders as well.",
+)
+@click.option(
+    "--max-depth",
+    type=click.IntRange(min=0),
+    help="Maximum depth of sub-folders (with '--recursive').",
+    metavar="<int>",
+)
+@click.option(
+    "--follow-symlinks",
+    is_flag=True,
+    help="Explore symlinked sub-folders (with '--recursive').",
+)
+@click.option(
+    "--include",
+    multiple=True,
+    help="Pick up only files matching this pattern (e.g. '*.flac').",
+    metavar="<pattern>",
+)
+@click.option(
+    "--exclude",
+    multiple=True,
+    help="Skip files and sub-folders matching this pattern.",
+    metavar="<pattern>",
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Do not use cache of audio lengths (from main '--cache-dir' option).",
+)
+@click.option(
+    "--async-io",
+    is_flag=True,
+    help=(
+        "Read audio files with asyncio engine (for network drives), "
+        "'--jobs' is a number of files per drive."
+    ),
+)
 @pass_playlist
 def create_cmd(
     pls_obj: Playlist,
@@ -70,6 +127,14 @@ def create_cmd(
     is_here: bool,
     is_empty: bool,
     is_reversed: bool,
+    jobs: int,
+    is_recursive: bool,
+    max_depth: Optional[int],
+    follow_symlinks: bool,
+    include: Tuple[str, ...],
+    exclude: Tuple[str, ...],
+    no_cache: bool,
+    async_io: bool,
 ) -> None:
     """Creates playlist from folder or from scratch."""
     pls_path: Path = pls_obj.path
@@ -84,32 +149,41 @@ def create_cmd(
 
     try:
         if dir.is_dir():
-            valid_files: List[Path] = []
-            valid_files = get_supported_audios_in_folder(dir)
+            rel_paths: List[str] = []
+            with stage_timings.measure("scan folder") as stage:
+                rel_paths = list(
+                    iter_supported_audios(
+                        dir, is_recursive, max_depth, follow_symlinks, include, exclude
+                    )
+                )
+                stage.items = len(rel_paths)
 
-            if not valid_files:
+            if not rel_paths:
                 click.echo(f"Warning: No supported audio files in folder '{str(dir)}'.")
                 click.get_current_context().exit()
 
             sorted_rel: List[Any] = []
-            sorted_abs: List[Any] = []
-            rel_paths = [f.name for f in valid_files]
-            abs_paths = [str(f.resolve()) for f in valid_files]
-
             if nat_sort:
-                sorted_rel, sorted_abs = os_sorted(rel_paths), os_sorted(abs_paths)
+                from natsort import os_sorted
+
+                sorted_rel = os_sorted(rel_paths)
             else:
-                sorted_rel, sorted_abs = sorted(rel_paths), sorted(abs_paths)
+                sorted_rel = sorted(rel_paths)
 
             if is_reversed:
                 sorted_rel.reverse()
-                sorted_abs.reverse()
+
+            abs_dir = str(dir.resolve())
+            sorted_abs = [os.path.join(abs_dir, rel_p) for rel_p in sorted_rel]
 
             zipped_paths = zip(sorted_rel, sorted_abs)
 
-            playlist_as_text = generate_playlist_content_from_zipped(
-                zipped_paths, extended, rel
-            )
+            with open_metadata_cache(pls_obj, extended and not no_cache) as cache:
+                playlist_as_text = generate_playlist_content_from_zipped(
+                    zipped_paths, extended, rel, jobs, cache, async_io
+                )
+            if cache is not None:
+                click.echo(cache.stats(), err=True)
 
             target_file: Path = Path()
             if is_here:
@@ -130,42 +204,213 @@ def create_cmd(
 def get_supported_audios_in_folder(dir: Path) -> List[Path]:
     """Explore folder and pick up supported audios."""
     valid_files_in_dir: List[Path] = []
-    valid_files_in_dir = [
-        p.resolve() for p in dir.glob("*") if p.suffix.lower() in set(SONG_FORMATS)
-    ]
+    abs_dir = dir.resolve()
+    valid_files_in_dir = [abs_dir / rel_p for rel_p in iter_supported_audios(dir)]
     return valid_files_in_dir
 
 
+def iter_supported_audios(
+    dir: Path,
+    recursive: bool = False,
+    max_depth: Optional[int] = None,
+    follow_symlinks: bool = False,
+    include: Sequence[str] = (),
+    exclude: Sequence[str] = (),
+) -> Iterator[str]:
+    """Yield paths of supported audios relative to folder (lazily).
+
+    Folders are explored with 'os.scandir', so file types are taken
+    from directory entries without extra system calls.
+
+    Args:
+        dir: Folder with audio files
+        recursive: Explore sub-folders as well
+        max_depth: Maximum depth of sub-folders (unlimited by default)
+        follow_symlinks: Explore symlinked sub-folders
+        include: Patterns for names or relative paths of picked up files
+        exclude: Patterns for names or relative paths of skipped files and folders
+
+    Yields:
+        Relative path of each audio file.
+    """
+    song_formats = set(SONG_FORMATS)
+    folders: List[Tuple[str, int]] = [("", 0)]
+    visited: Set[Tuple[int, int]] = set()
+    while folders:
+        rel_dir, depth = folders.pop()
+        for entry in _scan_folder(dir, rel_dir):
+            rel_path = os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+            if _matches_any(entry.name, rel_path, exclude):
+                continue
+            if _is_dir(entry, follow_symlinks):
+                can_go_deeper = max_depth is None or depth < max_depth
+                if recursive and can_go_deeper and _is_new_folder(entry, visited):
+                    folders.append((rel_path, depth + 1))
+                continue
+            suffix = playlist.get_filename_suffix(entry.name).lower()
+            if suffix in song_formats and (
+                not include or _matches_any(entry.name, rel_path, include)
+            ):
+                yield rel_path
+
+
+def _scan_folder(dir: Path, rel_dir: str) -> List[os.DirEntry[str]]:
+    """Return entries of folder (sub-folder errors are ignored)."""
+    try:
+        with os.scandir(dir / rel_dir) as entries:
+            return list(entries)
+    except OSError:
+        if not rel_dir:
+            raise
+        return []
+
+
+def _is_dir(entry: os.DirEntry[str], follow_symlinks: bool) -> bool:
+    """Return True if entry is a folder (False on errors)."""
+    try:
+        return entry.is_dir(follow_symlinks=follow_symlinks)
+    except OSError:
+        return False
+
+
+def _is_new_folder(entry: os.DirEntry[str], visited: Set[Tuple[int, int]]) -> bool:
+    """Return True if folder was not visited yet (protects from symlink loops)."""
+    if not entry.is_symlink():
+        return True
+    try:
+        stat = entry.stat()
+    except OSError:
+        return False
+    folder_id = (stat.st_dev, stat.st_ino)
+    if folder_id in visited:
+        return False
+    visited.add(folder_id)
+    return True
+
+
+def _matches_any(name: str, rel_path: str, patterns: Sequence[str]) -> bool:
+    """Return True if name or relative path matches any pattern."""
+    rel_posix = rel_path.replace(os.sep, "/")
+    return any(fnmatch(name, p) or fnmatch(rel_posix, p) for p in patterns)
+
+
 def generate_playlist_content_from_zipped(
     zip_rel_abs: Iterator[Tuple[str, str]],
     extended: bool,
     rel: bool,
+    jobs: int = 1,
+    cache: Optional[MetadataCache] = None,
+    async_io: bool = False,
 ) -> str:
     """Return string content for playlist.
 
     From zip(relative, absolute).
+    Audio lengths are read by pool of 'jobs' workers
+    (only for files absent in cache, if it's passed).
+    With 'async_io' they are read by asyncio engine ('jobs' files per drive).
     """
-    content: str = ""
-    for i, (rel_p, abs_p) in enumerate(zip_rel_abs, start=1):
+    rel_abs_pairs = list(zip_rel_abs)
+    lengths: List[int] = []
+    if extended:
+        abs_paths = [abs_p for rel_p, abs_p in rel_abs_pairs]
+        with stage_timings.measure("read lengths") as stage:
+            if cache is None:
+                lengths = get_seconds_from_files(abs_paths, jobs, async_io)
+            else:
+                lengths = get_seconds_from_files_with_cache(
+                    abs_paths, cache, jobs, async_io
+                )
+            stage.items = len(lengths)
+    lines: List[str] = []
+    for i, (rel_p, abs_p) in enumerate(rel_abs_pairs):
         if extended:
             # Add header tag at the beginning
-            if i == 1:
-                content += "#EXTM3U" + "\n"
-            length_sec: int = 0
-            try:
-                length_sec = get_seconds_from_file_info(abs_p)
-            except Exception:
-                length_sec = 0
-            content += "#EXTINF:" + str(length_sec) + "," + Path(abs_p).stem + "\n"
+            if i == 0:
+                lines.append("#EXTM3U")
+            lines.append("#EXTINF:" + str(lengths[i]) + "," + Path(abs_p).stem)
         if rel:
-            content += rel_p + "\n"
+            lines.append(rel_p)
         else:
-            content += abs_p + "\n"
+            lines.append(abs_p)
+    content = "".join(line + "\n" for line in lines)
     return content
 
 
+def get_seconds_from_files(
+    paths: Sequence[str], jobs: int = 1, async_io: bool = False
+) -> List[int]:
+    """Return audio lengths in seconds (in the same order as paths).
+
+    Files are read by pool of 'jobs' worker threads
+    (or by asyncio engine with 'jobs' files per drive).
+    Length of unreadable file is 0.
+    """
+    return [length or 0 for length in read_seconds_of_files(paths, jobs, async_io)]
+
+
+def read_seconds_of_files(
+    paths: Sequence[str], jobs: int = 1, async_io: bool = False
+) -> List[Optional[int]]:
+    """Return audio lengths in seconds (None for unreadable files)."""
+    if async_io:
+        from .._async_io import map_files_async
+
+        return map_files_async(get_seconds_or_none, paths, jobs)
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+        return list(executor.map(get_seconds_or_none, paths))
+
+
+def get_seconds_from_files_with_cache(
+    paths: List[str], cache: MetadataCache, jobs: int = 1, async_io: bool = False
+) -> List[int]:
+    """Return audio lengths in seconds, reading only changed or new files.
+
+    Unreadable files aren't cached, so they are read again next time.
+    """
+    identities = [get_file_identity(path) for path in paths]
+    lengths: List[Optional[int]] = []
+    for path, identity in zip(paths, identities):
+        lengths.append(cache.get(path, *identity) if identity else None)
+    unknown = [i for i, length in enumerate(lengths) if length is None]
+    read_lengths = read_seconds_of_files([paths[i] for i in unknown], jobs, async_io)
+    for i, length in zip(unknown, read_lengths):
+        lengths[i] = length
+        identity = identities[i]
+        if identity and length is not None:
+            cache.put(paths[i], *identity, length)
+    return [length or 0 for length in lengths]
+
+
+def get_file_identity(path: str) -> Optional[Tuple[int, int]]:
+    """Return size and modification time of file (None, if it's unavailable)."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def open_metadata_cache(
+    pls_obj: Playlist, is_used: bool
+) -> ContextManager[Optional[MetadataCache]]:
+    """Return cache of audio metadata in cache folder (if it's set and used)."""
+    if is_used and pls_obj.cache_dir is not None:
+        return MetadataCache(pls_obj.cache_dir / METADATA_CACHE_FILE_NAME)
+    return contextlib.nullcontext()
+
+
+def get_seconds_or_none(path: str) -> Optional[int]:
+    """Get audio length in seconds (or None on any error)."""
+    try:
+        return get_seconds_from_file_info(path)
+    except Exception:
+        return None
+
+
 def get_seconds_from_file_info(path: str) -> int:
     """Get audio length in seconds (rounded)."""
+    from mutagen._file import File as MutagenFile
+
     audio = MutagenFile(path)
     length = audio.info.length
     seconds = int(round(length))
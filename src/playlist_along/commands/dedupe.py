@@ -0,0 +1,80 @@
+"""Dedupe command."""
+from pathlib import Path
+from typing import Optional, Union
+
+import click
+
+from .. import playlist
+from .._dedupe import DiskLocationIndex, DuplicateFilter, LocationIndex
+from .._timings import stage_timings
+from ..playlist import pass_playlist, Playlist
+
+
+@click.command(name="dedupe")
+@click.option(
+    "--dest",
+    "-d",
+    type=str,
+    help="Directory or full path to playlist destination (origin by default).",
+    metavar="<string>",
+)
+@click.option(
+    "--ignore-case",
+    "-i",
+    is_flag=True,
+    help="Compare locations of tracks case-insensitively.",
+)
+@click.option(
+    "--any-separator",
+    is_flag=True,
+    help="Treat '\\' and '/' in locations as the same separator.",
+)
+@click.option(
+    "--disk-index",
+    is_flag=True,
+    help="Keep seen locations in temporary file (for huge playlists).",
+)
+@pass_playlist
+def dedupe_cmd(
+    pls_obj: Playlist,
+    dest: Optional[str],
+    ignore_case: bool,
+    any_separator: bool,
+    disk_index: bool,
+) -> None:
+    """Removes duplicate tracks from playlist.
+
+    The first occurrence of each track is kept with its #EXTINF line.
+    """
+    file: Path = pls_obj.path
+    if playlist.is_file_too_small(file):
+        click.echo("Warning: Playlist is too small to dedupe. Exit.")
+        click.get_current_context().exit()
+
+    index: Union[LocationIndex, DiskLocationIndex]
+    if disk_index:
+        index = DiskLocationIndex(pls_obj.cache_dir)
+    else:
+        index = LocationIndex()
+    encoding = pls_obj.get_encoding()
+    with index:
+        keep = DuplicateFilter(index, ignore_case, any_separator)
+        lines = stage_timings.iter_stage("dedupe", pls_obj.iter_lines(keep))
+        playlist.write_playlist_lines(lines, get_dedupe_target(file, dest), encoding)
+    click.echo(f"Removed {keep.duplicates} duplicate tracks.")
+
+
+def get_dedupe_target(origin: Path, dest: Optional[str]) -> Path:
+    """Return path for saving deduplicated playlist.
+
+    Unlike converting, the origin playlist is rewritten in place,
+    when destination resolves to it.
+    """
+    if not dest:
+        return origin
+    target = Path(dest)
+    if not target.suffix:
+        target = target / origin.name
+    if target.resolve() == origin.resolve():
+        return origin
+    return target
@@ -1,10 +1,10 @@
 """Display command."""
 from pathlib import Path
-from typing import Optional
 
 import click
 
 from .. import playlist
+from .._timings import stage_timings
 from ..playlist import pass_playlist, Playlist
 
 
@@ -24,14 +24,21 @@ def display_cmd(pls_obj: Playlist, is_full: bool) -> None:
         click.echo("Warning: Playlist is too small to display. Exit.")
         click.get_current_context().exit()
     elif is_full:
-        full_content, encoding = playlist.get_full_content_of_playlist(file)
-        click.echo(full_content)
+        for raw_line in playlist.read_playlist_raw_lines(file, pls_obj.get_encoding()):
+            click.echo(raw_line, nl=False)
+        click.echo()
         click.get_current_context().exit()
     else:
-        echo_tracks_with_click(file)
+        echo_tracks_with_click(pls_obj)
 
 
-def echo_tracks_with_click(file: Path, encoding: Optional[str] = None) -> None:
+def echo_tracks_with_click(pls: Playlist) -> None:
     """Display only tracks from playlist file via click.echo()."""
-    only_paths = playlist.get_only_track_paths_from_m3u(file, encoding)
-    click.echo("\n".join(only_paths))
+    is_echoed = False
+    with stage_timings.measure("display") as stage:
+        for track in pls.iter_local_tracks():
+            click.echo(track)
+            stage.items += 1
+            is_echoed = True
+    if not is_echoed:
+        click.echo("")
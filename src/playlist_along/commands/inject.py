@@ -1,20 +1,34 @@
 """Inject command."""
+import codecs
+import itertools
+import os
 from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Sequence
 
 import click
 
 from .. import playlist
+from .._timings import stage_timings
 from ..playlist import pass_playlist, Playlist, validate_file_callback
 
 
+# Codecs, which write BOM at the beginning of each encoded text
+BOM_WRITING_CODECS: List[str] = ["utf-16", "utf-32"]
+# Bytes read from each end of origin file for checking its form
+PROBE_SIZE: int = 64
+
+
 @click.command(name="inject")
 @click.option(
     "--file",
     "-f",
+    "files",
     type=str,
+    multiple=True,
+    required=True,
     callback=validate_file_callback,
     is_eager=True,
-    help="Full path to injected playlist file.",
+    help="Full path to injected playlist file (can be repeated).",
     metavar="<string>",
 )
 @click.option(
@@ -26,37 +40,221 @@ from ..playlist import pass_playlist, Playlist, validate_file_callback
     ),
 )
 @pass_playlist
-def inject_cmd(pls_obj: Playlist, file: str, top: bool) -> None:
-    """Injects one playlist into another."""
+def inject_cmd(pls_obj: Playlist, files: Sequence[str], top: bool) -> None:
+    """Injects one or several playlists into another."""
     origin_file: Path = pls_obj.path
-    inj_file: Path = Path(file)
+    inj_files: List[Path] = [Path(file) for file in files]
 
-    if playlist.is_file_too_small(inj_file):
+    if any(playlist.is_file_too_small(inj_file) for inj_file in inj_files):
         click.echo("Warning: Injected file is too small for playlist. Exit.")
         click.get_current_context().exit()
-    else:
-        inj_content, inj_enc = playlist.get_full_content_of_playlist(inj_file)
 
+    origin_lines: Iterable[str] = []
     if playlist.is_file_too_small(origin_file):
-        origin_content = ""
         origin_enc = "utf-8"
     else:
-        origin_content, origin_enc = playlist.get_full_content_of_playlist(origin_file)
+        origin_enc = pls_obj.get_encoding()
+        if not top and append_injections(origin_file, origin_enc, inj_files, pls_obj):
+            return
+        origin_lines = pls_obj.iter_lines()
 
-    inj_result = inject_content(origin_content, inj_content, top)
-    playlist.save_playlist_content(inj_result, origin_file, origin_enc)
+    injections = get_injections_lines(inj_files, pls_obj)
+    inj_result = stage_timings.iter_stage(
+        "inject", iter_injected_lines(origin_lines, injections, top)
+    )
+    playlist.write_playlist_lines(inj_result, origin_file, origin_enc)
 
 
-def inject_content(origin: str, injection: str, top: bool) -> str:
-    """Concatenates incoming contents."""
-    origin_clean: str = playlist.clean_m3u_from_extended_tag(origin)
-    inj_clean: str = playlist.clean_m3u_from_extended_tag(injection)
-    concatenation: str = "#EXTM3U\n"
+def iter_injected_lines(
+    origin_lines: Iterable[str],
+    injections: Sequence[Iterable[str]],
+    top: bool,
+) -> Iterator[str]:
+    """Yield lines of concatenated playlists (like 'inject_content' does).
+
+    Several injections are pasted in the given order.
+    """
+    origin_iter = iter(origin_lines)
+    first_origin_line = next(origin_iter, None)
+    origin_clean: Iterable[str] = []
+    if first_origin_line is not None:
+        origin_clean = _or_blank_line(
+            playlist.iter_lines_without_extended_tag(
+                itertools.chain([first_origin_line], origin_iter)
+            )
+        )
+    inj_clean = iter_cleaned_injections(injections)
+    yield "#EXTM3U"
     if top:
-        paste_origin_after = "\n" + origin_clean
-        concatenation += f"{inj_clean + paste_origin_after if origin else inj_clean}"
+        yield from inj_clean
+        yield from origin_clean
     else:
-        paste_origin_before = origin_clean + "\n"
-        concatenation += f"{paste_origin_before + inj_clean if origin else inj_clean}"
-    concatenation += "\n"
-    return concatenation
+        yield from origin_clean
+        yield from inj_clean
+
+
+def get_injections_lines(
+    inj_files: Sequence[Path], origin: Optional[Playlist] = None
+) -> List[Iterator[str]]:
+    """Return lines of injected playlists (their encodings are detected lazily).
+
+    Encodings are detected like for origin playlist (with its cache).
+    """
+    origin = origin or Playlist()
+    return [origin.with_path(str(inj_file)).iter_lines() for inj_file in inj_files]
+
+
+def inject_content(origin: str, injection: str, top: bool) -> str:
+    """Concatenates incoming contents."""
+    lines = iter_injected_lines(origin.splitlines(), [injection.splitlines()], top)
+    return "\n".join(lines) + "\n"
+
+
+def iter_cleaned_injections(injections: Sequence[Iterable[str]]) -> Iterator[str]:
+    """Yield lines of injected playlists without #EXTM3U and blank ends."""
+    for injection_lines in injections:
+        yield from _or_blank_line(
+            playlist.iter_lines_without_extended_tag(injection_lines)
+        )
+
+
+def _or_blank_line(lines: Iterable[str]) -> Iterator[str]:
+    """Yield lines or one blank line, if there are no lines."""
+    is_empty = True
+    for line in lines:
+        is_empty = False
+        yield line
+    if is_empty:
+        yield ""
+
+
+def append_injections(
+    origin_file: Path,
+    origin_enc: str,
+    inj_files: Sequence[Path],
+    origin: Optional[Playlist] = None,
+) -> bool:
+    """Append injected playlists to the end of origin file without rewriting it.
+
+    It's possible only if origin file is already in the form, which
+    rewriting produces (see 'get_append_newline'). Injected lines are
+    encoded into the encoding of origin file and written with its line end.
+    If some line can't be encoded, the appended part is truncated.
+
+    Args:
+        origin_file: The path to origin playlist
+        origin_enc: Encoding of origin playlist
+        inj_files: Paths to injected playlists
+        origin: Origin playlist (its detection settings are used for injected)
+
+    Returns:
+        True if injected playlists were appended, otherwise nothing is changed.
+
+    Raises:
+        ClickException: Origin file can't be read or written
+    """
+    append_enc = get_append_encoding(origin_enc)
+    if append_enc is None:
+        return False
+    try:
+        newline = get_append_newline(origin_file, origin_enc, append_enc)
+        if newline is None:
+            return False
+        with open(origin_file, "ab") as f:
+            origin_size = f.tell()
+            try:
+                write_appended_lines(f, inj_files, append_enc, newline, origin)
+            except UnicodeEncodeError:
+                f.truncate(origin_size)
+                return False
+    except (OSError) as error:
+        message = str(error)
+        raise click.ClickException(message)
+    return True
+
+
+def get_append_encoding(encoding: str) -> Optional[str]:
+    """Return encoding for appended text (None, if appending is impossible)."""
+    name = codecs.lookup(encoding).name
+    if name in BOM_WRITING_CODECS:
+        return None
+    if name == "utf-8-sig":
+        # BOM is only at the beginning of file
+        return "utf-8"
+    return name
+
+
+def get_append_newline(
+    origin_file: Path, origin_enc: str, append_enc: str
+) -> Optional[str]:
+    """Return line end of origin file, if lines can be appended to it.
+
+    Origin file must start with #EXTM3U line followed by a non-blank line
+    (without leading spaces) and end with one line end after non-blank line
+    (without trailing spaces). These ends of file are probed first.
+    Then the whole file is scanned: all lines must be non-blank and end
+    with the line end, which rewriting writes (native for OS),
+    otherwise the file would have mixed line ends.
+
+    Args:
+        origin_file: The path to origin playlist
+        origin_enc: Encoding of origin playlist
+        append_enc: Encoding for appended text
+
+    Returns:
+        Line end or None, if file is not in the needed form.
+    """
+    with open(origin_file, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        head = f.read(PROBE_SIZE)
+        f.seek(max(0, size - PROBE_SIZE))
+        tail = f.read()
+    newline = os.linesep
+    header = f"#EXTM3U{newline}".encode(origin_enc)
+    end = newline.encode(append_enc)
+    if not head.startswith(header) or not tail.endswith(end):
+        return None
+    first_char = head[len(header) :].decode(append_enc, errors="ignore")[:1]
+    last_char = tail[: -len(end)].decode(append_enc, errors="ignore")[-1:]
+    if size <= len(header) + len(end) or not first_char or not last_char:
+        return None
+    if first_char.isspace() or last_char.isspace():
+        return None
+    if not has_only_native_line_ends(origin_file, origin_enc, newline):
+        return None
+    return newline
+
+
+def has_only_native_line_ends(path: Path, encoding: str, newline: str) -> bool:
+    """Return True, if each line of file is non-blank and ends with 'newline'.
+
+    Lines are split by any line end (including lone CR),
+    so the file is in the same form as rewriting writes it.
+    """
+    try:
+        with open(path, "r", encoding=encoding, newline="") as f:
+            for line in f:
+                if not line.endswith(newline):
+                    return False
+                text = line[: -len(newline)]
+                if not text.strip() or text.splitlines() != [text]:
+                    return False
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def write_appended_lines(
+    f: BinaryIO,
+    inj_files: Sequence[Path],
+    encoding: str,
+    newline: str,
+    origin: Optional[Playlist] = None,
+) -> None:
+    """Write cleaned lines of injected playlists into binary file."""
+    injections = get_injections_lines(inj_files, origin)
+    lines = stage_timings.iter_stage("inject", iter_cleaned_injections(injections))
+    with stage_timings.measure("write") as stage:
+        for line in lines:
+            stage.bytes += f.write(f"{line}{newline}".encode(encoding))
+            stage.items += 1
@@ -0,0 +1,160 @@
+"""Watch command."""
+import glob
+from pathlib import Path
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import click
+
+from .batch import BatchResult, capture_threads_output, collect_playlists
+from .batch import echo_batch_results, get_sibling_command, run_command_for_playlist
+from .batch import ThreadLocalOutput
+from .. import playlist
+from .._watching import PlaylistWatcher
+
+
+@click.command(
+    name="watch",
+    context_settings={"ignore_unknown_options": True, "allow_interspersed_args": False},
+)
+@click.option(
+    "--glob",
+    "-g",
+    "patterns",
+    type=str,
+    multiple=True,
+    help="Glob pattern of playlists ('**' matches nested folders).",
+    metavar="<string>",
+)
+@click.option(
+    "--dir",
+    "folders",
+    type=click.Path(exists=True, file_okay=False),
+    multiple=True,
+    help="Folder with playlists.",
+    metavar="<string>",
+)
+@click.option(
+    "--manifest",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Text file with paths to playlists (one per line).",
+    metavar="<string>",
+)
+@click.option(
+    "--interval",
+    type=click.FloatRange(min=0.1),
+    default=1.0,
+    show_default=True,
+    help="Seconds between checks of playlists.",
+    metavar="<float>",
+)
+@click.option(
+    "--debounce",
+    type=click.FloatRange(min=0),
+    default=2.0,
+    show_default=True,
+    help="Seconds without changes before playlist is converted.",
+    metavar="<float>",
+)
+@click.option(
+    "--skip-initial",
+    is_flag=True,
+    help="Don't convert existing playlists at start, wait for changes.",
+)
+@click.argument("command_name", type=click.Choice(["convert"]))
+@click.argument("command_args", nargs=-1, type=click.UNPROCESSED)
+@click.pass_context
+def watch_cmd(
+    ctx: click.Context,
+    patterns: Sequence[str],
+    folders: Sequence[str],
+    manifest: Optional[str],
+    interval: float,
+    debounce: float,
+    skip_initial: bool,
+    command_name: str,
+    command_args: Sequence[str],
+) -> None:
+    """Converts playlists again each time they are changed.
+
+    Options after COMMAND_NAME are passed to the command itself
+    (e.g. '--sync' for copying only new or changed tracks).
+    """
+    command = get_sibling_command(ctx, command_name)
+    params = command.make_context(
+        command_name, list(command_args), parent=ctx.find_root()
+    ).params
+    if not params.get("dest"):
+        raise click.ClickException("Destination is required ('convert --dest').")
+
+    main_file = ctx.find_root().params.get("file")
+    if main_file:
+        patterns = [*patterns, glob.escape(main_file)]
+    watcher = PlaylistWatcher(
+        lambda: collect_playlists(patterns, folders, manifest), debounce
+    )
+    if skip_initial:
+        watcher.prime()
+    click.echo(f"Watching {len(watcher.scan())} playlists. Press Ctrl+C to stop.")
+    try:
+        while True:
+            changed = watcher.poll()
+            if changed:
+                succeeded = convert_changed_playlists(
+                    ctx, command, command_args, changed
+                )
+                mark_converted_playlists(watcher, changed, succeeded, params)
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        click.echo("Watching is stopped.")
+
+
+def mark_converted_playlists(
+    watcher: PlaylistWatcher,
+    changed: List[Path],
+    succeeded: List[Path],
+    params: Dict[str, Any],
+) -> None:
+    """Remember results of conversion for the next polls of watcher."""
+    for path in changed:
+        if path not in succeeded:
+            # Failed playlist is converted again after delay or its change
+            watcher.mark_failed(path)
+    for path in succeeded:
+        watcher.mark_processed(path)
+        target = playlist.get_target_playlist_path(
+            Path(params["dest"]), path, params.get("yes_dir")
+        )
+        # Converted playlist can be in watched folder as well
+        watcher.ignore_current_state(target)
+
+
+def convert_changed_playlists(
+    ctx: click.Context,
+    command: click.Command,
+    command_args: Sequence[str],
+    paths: List[Path],
+) -> List[Path]:
+    """Run command for changed playlists one by one and echo results.
+
+    Args:
+        ctx: Context of watch command
+        command: Command to run
+        command_args: Options of command
+        paths: Changed playlists
+
+    Returns:
+        Playlists, which were converted successfully.
+    """
+    succeeded: List[Path] = []
+
+    def run_for_playlist(path: Path, output: ThreadLocalOutput) -> BatchResult:
+        result = run_command_for_playlist(ctx, command, command_args, path, output)
+        if result.error is None:
+            succeeded.append(path)
+        return result
+
+    with capture_threads_output() as output:
+        results = (run_for_playlist(path, output) for path in paths)
+        echo_batch_results(results, output.stream)
+    return succeeded
@@ -1,31 +1,220 @@
 """Playlist module."""
+import codecs
+import os
 from pathlib import Path
-import re
-import shutil
-from typing import Any, List, Optional, Tuple, Union
+from types import TracebackType
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO
+from typing import Tuple, Type, TYPE_CHECKING, Union
 
 import click
 from click import ClickException, Context, Option, Parameter
 
-from ._utils import _detect_file_encoding
+from ._timings import stage_timings
+from ._utils import _detect_file_encoding, EncodingCache
+
+if TYPE_CHECKING:  # pragma: no cover
+    from ._copying import CopyJournal, CopyReport, CopyTask, SyncManifest
+    from ._planning import CopyPlan
+    from ._store import TrackStore
+    from ._transfer import TransferBackend
 
 
 SUPPORTED_PLS_FILES: List[str] = [".m3u", ".m3u8"]
 SONG_FORMATS: List[str] = [".mp3", ".flac"]
+SONG_SUFFIXES: Tuple[str, ...] = tuple(SONG_FORMATS)
+# VLC for Android player does NOT understand square brackets [] and # in filenames
+VLC_INVALID_CHARACTERS: Dict[int, str] = str.maketrans(
+    {"[": "%5B", "]": "%5D", "#": "%23"}
+)
+
+
+EXTENDED_HEADER: str = "#EXTM3U"
+EXTENDED_INFO_TAG: str = "#EXTINF:"
+
+
+class PlaylistEntry(object):
+    """Location (track) of playlist with its preceding comment lines.
+
+    Comment lines (including #EXTINF and blank ones) are kept 'as-is',
+    and duration with title are parsed from the last #EXTINF line.
+    """
+
+    __slots__ = ("location", "duration", "title", "comments")
+
+    def __init__(
+        self,
+        location: str,
+        comments: Tuple[str, ...] = (),
+    ) -> None:
+        """Initialization of class instance."""
+        self.location: str = location
+        self.comments: Tuple[str, ...] = comments
+        self.duration: Optional[int] = None
+        self.title: Optional[str] = None
+        for comment in comments:
+            if comment.startswith(EXTENDED_INFO_TAG):
+                self.duration, self.title = parse_extended_info(comment)
+
+    @property
+    def is_local_track(self) -> bool:
+        """Return True if location is a local audio file (not a link)."""
+        return is_local_track(self.location)
+
+    def iter_lines(self) -> Iterator[str]:
+        """Yield comment lines and location line."""
+        yield from self.comments
+        yield self.location
+
+
+def parse_extended_info(line: str) -> Tuple[Optional[int], Optional[str]]:
+    """Return duration (in seconds) and title from #EXTINF line."""
+    info = line[len(EXTENDED_INFO_TAG) :]
+    length, comma, title = info.partition(",")
+    duration: Optional[int]
+    try:
+        duration = int(float(length.split()[0]))
+    except (ValueError, IndexError):
+        duration = None
+    return duration, (title.strip() if comma else None)
+
+
+class PlaylistParser(object):
+    """Parser of playlist lines into entries (lazy).
+
+    Header and trailing comment lines (after last location)
+    are available after iteration.
+    """
+
+    def __init__(self, lines: Iterable[str]) -> None:
+        """Initialization of class instance."""
+        self.lines: Iterable[str] = lines
+        self.header: Optional[str] = None
+        self.trailing_comments: Tuple[str, ...] = ()
+
+    def __iter__(self) -> Iterator[PlaylistEntry]:
+        """Yield entries one by one."""
+        comments: List[str] = []
+        for index, line in enumerate(self.lines):
+            if index == 0 and line.strip() == EXTENDED_HEADER:
+                self.header = line
+            elif line.startswith("#") or not line.strip():
+                comments.append(line)
+            else:
+                yield PlaylistEntry(line, tuple(comments))
+                comments.clear()
+        self.trailing_comments = tuple(comments)
 
 
 class Playlist(object):
-    """Playlist object class."""
+    """Playlist object class.
+
+    Content of playlist can be parsed once with 'load()' and kept in memory.
+    Otherwise, it is parsed lazily on each iteration.
+    """
 
     def __init__(self, path: Optional[str] = None) -> None:
         """Initialization of class instance."""
         self.path: Path = Path(path or ".")
+        self.cache_dir: Optional[Path] = None
+        # Known encoding of playlist file (detection is skipped)
+        self.encoding: Optional[str] = None
+        # Bytes for fast encoding detection (None for default size)
+        self.sample_size: Optional[int] = None
+        # Cache of detected encodings (None for in-memory one of process)
+        self.encoding_cache: Optional[EncodingCache] = None
+        self.header: Optional[str] = None
+        self.trailing_comments: Tuple[str, ...] = ()
+        self.entries: Optional[List[PlaylistEntry]] = None
+
+    def get_encoding(self) -> str:
+        """Return encoding of playlist file (detect it only once)."""
+        self.encoding = get_playlist_encoding(
+            self.path, self.encoding, self.sample_size, self.encoding_cache
+        )
+        return self.encoding
+
+    def with_path(self, path: str) -> "Playlist":
+        """Return playlist of another file with the same caches and detection.
+
+        Known encoding is not passed, it's detected for another file.
+        """
+        pls = Playlist(path)
+        pls.cache_dir = self.cache_dir
+        pls.sample_size = self.sample_size
+        pls.encoding_cache = self.encoding_cache
+        return pls
+
+    def load(self) -> "Playlist":
+        """Parse playlist file into entries (only once)."""
+        if self.entries is None:
+            with stage_timings.measure("parse") as stage:
+                self.entries = list(self.iter_entries())
+                stage.items = len(self.entries)
+        return self
+
+    def iter_entries(self) -> Iterator[PlaylistEntry]:
+        """Yield entries of loaded playlist or parse file lazily."""
+        if self.entries is not None:
+            yield from self.entries
+            return
+        parser = PlaylistParser(read_playlist_lines(self.path, self.get_encoding()))
+        for entry in parser:
+            self.header = parser.header
+            yield entry
+        self.header = parser.header
+        self.trailing_comments = parser.trailing_comments
+
+    def iter_lines(
+        self, keep: Optional[Callable[[PlaylistEntry], bool]] = None
+    ) -> Iterator[str]:
+        """Yield all lines of playlist (the same as in file).
+
+        If 'keep' is passed, lines of entries, for which it returns False,
+        are skipped (including their comment lines).
+        """
+        entries = self.iter_entries()
+        if keep is not None:
+            entries = filter(keep, entries)
+        first_entry = next(entries, None)
+        if self.header is not None:
+            yield self.header
+        if first_entry is not None:
+            yield from first_entry.iter_lines()
+        for entry in entries:
+            yield from entry.iter_lines()
+        yield from self.trailing_comments
+
+    def iter_local_tracks(self) -> Iterator[str]:
+        """Yield paths of local audio files.
+
+        Like 'iter_local_tracks' function, any line ending with audio
+        extension is a track (even a comment one, e.g. '#EXTINF:1,t.mp3').
+        Not loaded playlist is not parsed into entries, its lines are filtered.
+        """
+        if self.entries is None:
+            lines = read_playlist_lines(self.path, self.get_encoding())
+            yield from iter_local_tracks(lines)
+            return
+        yield from iter_local_tracks(self.iter_lines())
 
 
 # Decorator for passing path to playlist file
 pass_playlist = click.make_pass_decorator(Playlist, ensure=True)
 
 
+def validate_encoding_callback(
+    ctx: Context, param: Union[Option, Parameter], value: Any = None
+) -> Any:
+    """Validate that encoding is known by Python."""
+    if not value or ctx.resilient_parsing:
+        return
+    try:
+        codecs.lookup(value)
+    except LookupError:
+        raise click.BadParameter(f"unknown encoding '{value}'")
+    return value
+
+
 def validate_file_callback(
     ctx: Context, param: Union[Option, Parameter], value: Any = None
 ) -> Any:
@@ -34,7 +223,9 @@ def validate_file_callback(
     if not value or ctx.resilient_parsing:
         return
     supported_formats = SUPPORTED_PLS_FILES
-    if Path(value).suffix in supported_formats:
+    # Option with multiple values passes a tuple
+    files = value if isinstance(value, tuple) else (value,)
+    if all(Path(file).suffix in supported_formats for file in files):
         return value
     else:
         raise click.BadParameter(
@@ -42,24 +233,102 @@ def validate_file_callback(
         )
 
 
+def validate_size_callback(
+    ctx: Context, param: Union[Option, Parameter], value: Any = None
+) -> Any:
+    """Validate size (e.g. 10M) and return number of bytes."""
+    if value is None or ctx.resilient_parsing:
+        return value
+    from ._throttling import parse_size
+
+    try:
+        return parse_size(value)
+    except ValueError as error:
+        raise click.BadParameter(str(error))
+
+
 def get_only_track_paths_from_m3u(
     path: Path, encoding: Optional[str] = None
 ) -> List[str]:
     """Return list of paths (without #M3U tags)."""
-    if encoding is None:
-        encoding = _detect_file_encoding(path)
-    playlist_content = path.read_text(encoding=encoding)
-    only_paths = get_local_tracks_without_comment_lines(playlist_content)
+    only_paths = list(iter_local_tracks(read_playlist_lines(path, encoding)))
     return only_paths
 
 
+def get_playlist_encoding(
+    path: Path,
+    encoding: Optional[str] = None,
+    sample_size: Optional[int] = None,
+    cache: Optional[EncodingCache] = None,
+) -> str:
+    """Return passed encoding or detect it (by sample of 'sample_size' bytes)."""
+    if encoding is None:
+        encoding = _detect_file_encoding(path, sample_size, cache)
+    return encoding
+
+
+def open_playlist(path: Path, encoding: str) -> TextIO:
+    """Open playlist file for reading as text (with universal newlines)."""
+    try:
+        return open(path, "r", encoding=encoding)
+    except (OSError) as error:
+        message = str(error)
+        raise ClickException(message)
+
+
+def read_playlist_raw_lines(
+    path: Path, encoding: Optional[str] = None
+) -> Iterator[str]:
+    """Yield lines of playlist file lazily (with line ends)."""
+    encoding = get_playlist_encoding(path, encoding)
+    with open_playlist(path, encoding) as f:
+        if stage_timings.enabled:
+            stage_timings.add("read", bytes_=os.fstat(f.fileno()).st_size)
+        try:
+            yield from stage_timings.iter_stage("read", f)
+        except (OSError, UnicodeDecodeError) as error:
+            message = str(error)
+            raise ClickException(message)
+
+
+def read_playlist_lines(path: Path, encoding: Optional[str] = None) -> Iterator[str]:
+    """Yield lines of playlist file lazily (without line ends).
+
+    Lines are the same as 'splitlines()' returns for a full content,
+    but a file is never loaded into memory entirely.
+    """
+    for raw_line in read_playlist_raw_lines(path, encoding):
+        yield from raw_line.splitlines()
+
+
+def iter_local_tracks(lines: Iterable[str]) -> Iterator[str]:
+    """Yield only local tracks from playlist lines."""
+    for line in lines:
+        if is_local_track(line):
+            yield line.strip()
+
+
+def is_local_track(line: str) -> bool:
+    """Return True if line is a path to supported audio file (not a link).
+
+    Usual lines are checked by their endings,
+    Path object is created only for unusual ones (with trailing slashes etc.).
+    """
+    if "://" in line:
+        return False
+    if line.endswith(SONG_SUFFIXES):
+        dot = line.rfind(".")
+        is_unc = line[:1] in ("/", "\\") and line[1:2] in ("/", "\\")
+        if dot > 0 and line[dot - 1] not in "/\\:" and not is_unc:
+            return True
+    elif not line.endswith(("/", "\\", ".")):
+        return False
+    return Path(line).suffix in SONG_FORMATS
+
+
 def get_local_tracks_without_comment_lines(playlist_content: str) -> List[str]:
     """Return list of tracks."""
-    only_tracks: List[str] = [
-        line.strip()
-        for line in playlist_content.splitlines()
-        if Path(line).suffix in SONG_FORMATS and "://" not in line
-    ]
+    only_tracks: List[str] = list(iter_local_tracks(playlist_content.splitlines()))
     return only_tracks
 
 
@@ -77,16 +346,55 @@ def get_full_content_of_playlist(
     return playlist_content, encoding
 
 
-def get_playlist_for_vlc_android(path: Path) -> Tuple[str, str]:
+def get_playlist_for_vlc_android(
+    path: Path, encoding: Optional[str] = None
+) -> Tuple[str, str]:
     """Return converted playlist and its encoding."""
-    playlist_content, encoding = get_full_content_of_playlist(path)
-    playlist_content = clean_m3u_from_links(playlist_content)
-    relative_playlist = make_relatives_paths_in_playlist(playlist_content)
-    # VLC for Android player does NOT understand square brackets [] and # in filenames
-    adapted_content = substitute_vlc_invalid_characters(relative_playlist)
+    playlist_content, encoding = get_full_content_of_playlist(path, encoding)
+    converted_lines = convert_lines_for_vlc_android(playlist_content.splitlines())
+    adapted_content = "".join(line + "\n" for line in converted_lines)
     return adapted_content, encoding
 
 
+def convert_lines_for_vlc_android(lines: Iterable[str]) -> Iterator[str]:
+    """Yield converted lines (without line breaks) in a single pass.
+
+    The same as consecutive 'clean_m3u_from_links',
+    'make_relatives_paths_in_playlist' and 'substitute_vlc_invalid_characters',
+    but each line is processed only once.
+    """
+    previous_line: Optional[str] = None
+    for line in lines:
+        if "://" in line:
+            continue
+        line = get_filename_from_path(line.strip()).strip()
+        if get_filename_suffix(line) in SONG_FORMATS:
+            line = line.translate(VLC_INVALID_CHARACTERS)
+        if previous_line is not None:
+            yield previous_line
+        previous_line = line
+    # Trailing empty line is not preserved (like with joined lines)
+    if previous_line:
+        yield previous_line
+
+
+def get_filename_from_path(line: str) -> str:
+    """Return text after last backward or forward slash (or a pipe)."""
+    last_separator = max(line.rfind("\\"), line.rfind("|"), line.rfind("/"))
+    return line[last_separator + 1 :]
+
+
+def get_filename_suffix(filename: str) -> str:
+    """Return suffix of filename (like 'Path.suffix', but faster).
+
+    Filename must not contain path separators.
+    """
+    dot_index = filename.rfind(".")
+    if 0 < dot_index < len(filename) - 1:
+        return filename[dot_index:]
+    return ""
+
+
 def clean_m3u_from_links(content: str) -> str:
     """Delete lines with any links."""
     lines_without_links = [
@@ -104,27 +412,52 @@ def clean_m3u_from_extended_tag(content: str) -> str:
     return clean_content.strip()
 
 
+def iter_lines_without_extended_tag(raw_lines: Iterable[str]) -> Iterator[str]:
+    """Yield lines of content as 'clean_m3u_from_extended_tag' returns them.
+
+    Leading and trailing blank lines are removed, and #EXTM3U line as well.
+    Only blank lines between non-blank ones are held in memory.
+    """
+    lines = (line[:-1] if line.endswith("\n") else line for line in raw_lines)
+    non_blank_lines = (line for line in lines if line.strip())
+    current = next(non_blank_lines, None)
+    if current is None:
+        return
+    current = current.lstrip()
+    if current == "#EXTM3U":
+        next_line = next(non_blank_lines, None)
+        if next_line is None:
+            yield current
+            return
+        current = next_line.lstrip()
+    blank_lines: List[str] = []
+    for line in lines:
+        if line.strip():
+            yield current
+            yield from blank_lines
+            blank_lines.clear()
+            current = line
+        else:
+            blank_lines.append(line)
+    yield current.rstrip()
+
+
 def make_relatives_paths_in_playlist(content: str) -> str:
     """Remain only filenames from absolute paths."""
-    # Pattern for matching line into two groups:
-    # group 1 - all text before last backward or forward slash (including it)
-    # group 2 - filename (with extension)
-    regex_pattern = r"(.*[\\|\/])(.*)"
-    relative_playlist = re.sub(regex_pattern, r"\2", content)
+    relative_lines = [get_filename_from_path(line) for line in content.split("\n")]
+    relative_playlist = "\n".join(relative_lines)
     return relative_playlist
 
 
 def substitute_vlc_invalid_characters(content: str) -> str:
     """Substitute [ and ] and # in filenames."""
-    adapted_content: str = ""
+    adapted_lines: List[str] = []
     for line in content.splitlines():
         # Replace characters only in filenames (not in comments)
         if Path(line).suffix in SONG_FORMATS:
-            line = re.sub(r"[\[]", "%5B", line)
-            line = re.sub(r"[\]]", "%5D", line)
-            line = re.sub(r"[#]", "%23", line)
-        adapted_content += line.strip() + "\n"
-
+            line = line.translate(VLC_INVALID_CHARACTERS)
+        adapted_lines.append(line.strip() + "\n")
+    adapted_content = "".join(adapted_lines)
     return adapted_content
 
 
@@ -136,53 +469,371 @@ def save_playlist_content(
     yes_dir: Optional[bool] = None,
 ) -> None:
     """Save playlist content to new destination."""
-    target_pls: Path
     if encoding is None:
         encoding = "utf-8"
     try:
-        if (not dest.suffix or yes_dir) and origin:
-            target_pls = dest / origin.name
-        else:
-            target_pls = dest
-        if origin:
-            if target_pls.resolve() == origin.resolve():
-                suffix = target_pls.suffix
-                new_name = str(target_pls.resolve().with_suffix("")) + "_vlc" + suffix
-                target_pls = Path(new_name)
-
+        target_pls = get_target_playlist_path(dest, origin, yes_dir)
         target_pls.parent.mkdir(parents=True, exist_ok=True)
-        target_pls.write_text(content, encoding)
+        with stage_timings.measure("write") as stage:
+            target_pls.write_text(content, encoding)
+            if stage_timings.enabled:
+                stage.bytes = target_pls.stat().st_size
+    except (OSError) as error:
+        message = str(error)
+        raise ClickException(message)
+
+
+def write_playlist_lines(
+    lines: Iterable[str],
+    dest: Path,
+    encoding: Optional[str] = None,
+    origin: Optional[Path] = None,
+    yes_dir: Optional[bool] = None,
+) -> None:
+    """Save playlist lines to new destination incrementally."""
+    try:
+        target_pls = get_target_playlist_path(dest, origin, yes_dir)
     except (OSError) as error:
         message = str(error)
         raise ClickException(message)
+    with PlaylistWriter(target_pls, encoding) as writer:
+        writer.write_lines(lines)
 
 
-def copy_local_tracks_to_folder(tracklist: List[str], dest: str) -> None:
-    """Copy local files from list to a new destination."""
+def get_target_playlist_path(
+    dest: Path,
+    origin: Optional[Path] = None,
+    yes_dir: Optional[bool] = None,
+) -> Path:
+    """Return path for saving playlist (never the same as origin one)."""
+    target_pls: Path
+    if (not dest.suffix or yes_dir) and origin:
+        target_pls = dest / origin.name
+    else:
+        target_pls = dest
+    if origin:
+        if target_pls.resolve() == origin.resolve():
+            suffix = target_pls.suffix
+            new_name = str(target_pls.resolve().with_suffix("")) + "_vlc" + suffix
+            target_pls = Path(new_name)
+    return target_pls
+
+
+class PlaylistWriter(object):
+    """Incremental writer of playlist lines.
+
+    Lines are written into a temporary file next to the target one.
+    Only after successful writing, the target file is replaced with it,
+    so the target file can be read while it's being rewritten.
+    """
+
+    def __init__(self, target: Path, encoding: Optional[str] = None) -> None:
+        """Initialization of class instance."""
+        self.target: Path = target
+        self.encoding: str = encoding or "utf-8"
+        self.temp_path: Path = target.with_name(f".{target.name}.tmp")
+        self._file: Optional[TextIO] = None
+
+    def __enter__(self) -> "PlaylistWriter":
+        """Open temporary file for writing."""
+        try:
+            self.target.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.temp_path, "w", encoding=self.encoding)
+        except (OSError) as error:
+            message = str(error)
+            raise ClickException(message)
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        """Replace target file with written one (or clean up on error)."""
+        if self._file is None:
+            return
+        try:
+            self._file.close()
+            if exc_type is None:
+                os.replace(self.temp_path, self.target)
+                if stage_timings.enabled:
+                    stage_timings.add("write", bytes_=self.target.stat().st_size)
+        except (OSError) as error:
+            message = str(error)
+            raise ClickException(message)
+        finally:
+            self._file = None
+            if self.temp_path.exists():
+                self.temp_path.unlink()
+
+    def write_line(self, line: str) -> None:
+        """Write one line (line end is added)."""
+        self.write_lines((line,))
+
+    def write_lines(self, lines: Iterable[str]) -> None:
+        """Write lines (line ends are added)."""
+        if self._file is None:
+            raise ClickException("Playlist writer is not opened.")
+        try:
+            with stage_timings.measure("write") as stage:
+                for line in lines:
+                    self._file.write(line)
+                    self._file.write("\n")
+                    stage.items += 1
+        except (OSError, UnicodeEncodeError) as error:
+            message = str(error)
+            raise ClickException(message)
+
+
+def copy_local_tracks_to_folder(
+    tracklist: List[str],
+    dest: str,
+    jobs: int = 1,
+    sync: bool = False,
+    checksum: bool = False,
+    delete: bool = False,
+    async_io: bool = False,
+    resume: bool = False,
+    hardlink: bool = False,
+    max_bandwidth: Optional[int] = None,
+    max_files_per_sec: Optional[float] = None,
+    dry_run: bool = False,
+    store: Optional[str] = None,
+    symlink: bool = False,
+) -> None:
+    """Copy local files from list to a new destination.
+
+    Copying is planned first: tracks are stat in bulk, free space
+    in destination is checked, and large and small files take turns.
+    With 'dry_run' only the plan is shown (nothing is copied).
+    Tracks are copied by pool of 'jobs' workers simultaneously
+    (or by asyncio engine with 'jobs' copies per source drive).
+    The cheapest transfer is used: hard link (if 'hardlink' is allowed),
+    clone or in-kernel copy, and ordinary copy as the last resort.
+    All workers share limits of bandwidth (bytes) and files per second.
+    By default, existing files in destination are NOT overridden.
+    Copied tracks are recorded in journal, so with 'resume'
+    an interrupted copying continues without checking them again.
+    In 'sync' mode only new or changed tracks are copied
+    (and files from previous syncs, absent in playlist, can be deleted).
+    With 'store' each unique track is kept once in content-addressed
+    store folder and is linked into destination (or 'symlink' is made).
+    Jobs of one process copy into the same folder one by one.
+    """
+    from . import _copying
+
     destination: Path = Path(dest)
-    missing_files: List[str] = []
-    file_destination: Path
     if not destination.is_dir():
         destination = destination.parent
-    with click.progressbar(
-        tracklist,
+    # Manifest and journal of folder can be shared by simultaneous jobs
+    with _copying.lock_folder(destination):
+        report = _copying.CopyReport()
+        journal = _copying.CopyJournal(destination)
+        manifest = None
+        if sync:
+            manifest = _copying.SyncManifest.load(destination)
+        elif resume:
+            journal = _copying.CopyJournal.load(destination)
+        plan = plan_copy_job(
+            tracklist, destination, report, jobs, journal, manifest, checksum
+        )
+        # Space of hard links (and of stored tracks) is unknown before copying
+        if not hardlink and store is None:
+            plan.check_space(destination, replaces=sync)
+        if dry_run:
+            plan.estimate(max_bandwidth, max_files_per_sec)
+            echo_copy_plan(plan, report)
+        check_free_space(plan)
+        if dry_run:
+            return
+        if resume and journal.copied:
+            click.echo(
+                f"Resuming copying: {len(journal.copied)} files were copied before."
+            )
+        backend = get_transfer_backend(hardlink, max_bandwidth, max_files_per_sec)
+        track_store = open_track_store(store, symlink)
+        run_copy_tasks_with_journal(
+            plan.tasks,
+            report,
+            jobs,
+            async_io,
+            journal,
+            backend,
+            sync,
+            resume,
+            track_store,
+        )
+        if track_store is not None:
+            click.echo(
+                f"Store: {track_store.added} new files, {track_store.reused} reused."
+            )
+        if manifest is not None:
+            _copying.finish_sync(
+                plan.tasks, tracklist, destination, report, manifest, delete
+            )
+        echo_copy_report(report)
+
+
+def plan_copy_job(
+    tracklist: List[str],
+    destination: Path,
+    report: "CopyReport",
+    jobs: int,
+    journal: "CopyJournal",
+    manifest: Optional["SyncManifest"] = None,
+    checksum: bool = False,
+) -> "CopyPlan":
+    """Return plan of copying with copy tasks (sync tasks with manifest).
+
+    Tracks are stat folder by folder (each folder is listed once,
+    and several folders are stat simultaneously even for one copy job),
+    tracks from journal of resumed job are not checked.
+    Tasks of several jobs are balanced by size.
+    """
+    from . import _copying
+    from ._planning import balance_tasks, CopyPlan, STAT_JOBS, stat_tracks
+
+    with stage_timings.measure("plan copy") as stage:
+        pending = [track for track in tracklist if track not in journal.copied]
+        stats = stat_tracks(pending, max(jobs, STAT_JOBS))
+        if manifest is not None:
+            tasks = _copying.plan_sync_tasks(
+                tracklist, destination, report, manifest, checksum, stats
+            )
+        else:
+            tasks = _copying.plan_copy_tasks(
+                tracklist, destination, report, journal, stats
+            )
+        stage.items = len(tracklist)
+    return CopyPlan(balance_tasks(tasks) if jobs > 1 else tasks)
+
+
+def get_transfer_backend(
+    hardlink: bool = False,
+    max_bandwidth: Optional[int] = None,
+    max_files_per_sec: Optional[float] = None,
+) -> "TransferBackend":
+    """Return transfer backend (with shared throttle, if limits are set)."""
+    from ._throttling import CopyThrottle
+    from ._transfer import TransferBackend
+
+    throttle = None
+    if max_bandwidth or max_files_per_sec:
+        throttle = CopyThrottle(max_bandwidth, max_files_per_sec)
+    return TransferBackend(hardlink, throttle)
+
+
+def open_track_store(
+    store: Optional[str], symlink: bool = False
+) -> Optional["TrackStore"]:
+    """Return content-addressed store of tracks (None, if it isn't set)."""
+    if store is None:
+        return None
+    from ._store import TrackStore
+
+    return TrackStore(Path(store), symlink)
+
+
+def check_free_space(plan: "CopyPlan") -> None:
+    """Fail, if destination has not enough space for planned copying.
+
+    Args:
+        plan: Plan of copying with checked space
+
+    Raises:
+        ClickException: Destination has not enough free space
+    """
+    if not plan.has_enough_space:
+        raise ClickException(
+            f"Not enough free space in destination: {plan.required_space} bytes "
+            f"are required, but only {plan.free_space} bytes are free."
+        )
+
+
+def echo_copy_plan(plan: "CopyPlan", report: "CopyReport") -> None:
+    """Echo totals of planned copying."""
+    from ._planning import format_duration
+    from ._throttling import format_size
+
+    click.echo(
+        f"Copy plan: {plan.files} files, {format_size(plan.bytes)} "
+        f"({len(report.skipped)} skipped, {len(report.missing)} missing)."
+    )
+    if plan.free_space is not None:
+        click.echo(f"Free space in destination: {format_size(plan.free_space)}.")
+    if plan.seconds is not None:
+        click.echo(f"Estimated time: {format_duration(plan.seconds)}.")
+
+
+def echo_copy_report(report: "CopyReport") -> None:
+    """Echo deleted and missing tracks, fail on copy errors.
+
+    Args:
+        report: Report of copying
+
+    Raises:
+        ClickException: Some tracks are not copied
+    """
+    if report.deleted:
+        click.echo("Deleted files which are no longer in playlist:")
+        click.echo("\n".join(report.deleted))
+    if report.missing:
+        click.echo("Missing files from playlist were NOT copied:")
+        click.echo("\n".join(report.missing))
+    if report.errors:
+        failed = [f"{path}: {error}" for path, error in report.errors.items()]
+        message = "Some files were NOT copied:\n" + "\n".join(failed)
+        raise ClickException(message)
+
+
+def run_copy_tasks_with_journal(
+    tasks: List["CopyTask"],
+    report: "CopyReport",
+    jobs: int,
+    async_io: bool,
+    journal: "CopyJournal",
+    backend: "TransferBackend",
+    sync: bool = False,
+    resume: bool = False,
+    track_store: Optional["TrackStore"] = None,
+) -> None:
+    """Copy tracks with progress bar, recording them in journal (not for sync).
+
+    With 'track_store' tracks are exported through the store.
+
+    Progress bar shows current and average throughput.
+    Journal is kept only if copying is interrupted or failed.
+    """
+    from . import _copying
+    from ._throttling import ThroughputMeter
+
+    run_copy_tasks = _copying.run_copy_tasks
+    if track_store is not None:
+        run_copy_tasks = track_store.run_copy_tasks
+    elif async_io:
+        from ._async_io import run_copy_tasks_async as run_copy_tasks
+    total_bytes = sum(task.size for task in tasks)
+    meter = ThroughputMeter()
+    with stage_timings.measure("copy") as stage, click.progressbar(
+        length=total_bytes,
         label="Copying from playlist:",
+        item_show_func=lambda throughput: throughput,
     ) as bar:  # pragma: no cover
-        for abs_path in bar:
-            if not Path(abs_path).exists():
-                missing_files.append(abs_path)
-            else:
-                name_only = Path(abs_path).name
-                file_destination = destination / name_only
-                if not file_destination.exists():
-                    try:
-                        shutil.copy2(Path(abs_path), destination)
-                    except (OSError) as error:
-                        message = str(error)
-                        raise ClickException(message)
-    if missing_files:
-        click.echo("Missing files from playlist were NOT copied:")
-        click.echo("\n".join(missing_files))
+
+        def show_progress(size: int) -> None:
+            bar.update(size, meter.add(size))
+
+        if not sync:
+            journal.open(resume)
+        is_finished = False
+        try:
+            run_copy_tasks(tasks, report, jobs, show_progress, journal.record, backend)
+            is_finished = not sync and not report.errors
+        finally:
+            journal.close(is_finished)
+        stage.items = len(report.copied)
+        stage.bytes = total_bytes
 
 
 def is_file_too_small(file: Path) -> bool:
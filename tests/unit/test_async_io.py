@@ -0,0 +1,82 @@
+"""Unit-tests for the _async_io module."""
+import os
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+from pytest_mock import MockFixture
+
+from playlist_along import _async_io
+from playlist_along import _copying
+
+
+@pytest.fixture
+def small_chunks(mocker: MockFixture) -> None:
+    """Copy files by chunks of 4 bytes."""
+    mocker.patch.object(_async_io, "CHUNK_SIZE", 4)
+
+
+def test_async_copy_keeps_content_and_metadata(
+    tmp_path: Path, small_chunks: None
+) -> None:
+    """It copies files by chunks and reports missing ones."""
+    source = tmp_path / "Track 01.mp3"
+    source.write_bytes(b"Here are music bytes")
+    os.utime(source, ns=(1_000_000_000, 1_000_000_000))
+    target = tmp_path / "sub" / "Track 01.mp3"
+    target.parent.mkdir()
+    missing = _copying.CopyTask(tmp_path / "Absent.mp3", tmp_path / "sub" / "A", 5)
+    tasks = [_copying.CopyTask(source, target, 20), missing]
+    progress: List[int] = []
+
+    report = _async_io.run_copy_tasks_async(
+        tasks, _copying.CopyReport(), 2, progress.append
+    )
+
+    assert report.copied == [str(source)]
+    assert list(report.errors) == [str(missing.source)]
+    assert target.read_bytes() == b"Here are music bytes"
+    assert target.stat().st_mtime_ns == 1_000_000_000
+    assert sum(progress) == 25
+    assert sorted(child.name for child in target.parent.iterdir()) == [target.name]
+
+
+def test_async_copy_leaves_no_partial_files_on_interrupt(
+    tmp_path: Path, small_chunks: None
+) -> None:
+    """It deletes unfinished copies after Ctrl+C."""
+    source = tmp_path / "Track 01.mp3"
+    source.write_bytes(b"Here are music bytes")
+    target = tmp_path / "sub" / "Track 01.mp3"
+    target.parent.mkdir()
+
+    def interrupt(size: int) -> None:
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        _async_io.run_copy_tasks_async(
+            [_copying.CopyTask(source, target, 20)],
+            _copying.CopyReport(),
+            on_progress=interrupt,
+        )
+
+    assert list(target.parent.iterdir()) == []
+
+
+def test_async_map_keeps_order_of_files(tmp_path: Path) -> None:
+    """It returns results in the same order as paths."""
+    paths = [str(tmp_path / f"{size}.mp3") for size in (30, 10, 20)]
+    for path in paths:
+        Path(path).write_bytes(b"0" * int(Path(path).stem))
+
+    assert _async_io.map_files_async(os.path.getsize, paths, 2) == [30, 10, 20]
+
+
+def test_mount_point_is_cached_by_folder(tmp_path: Path) -> None:
+    """It finds the nearest mount point once for each folder."""
+    cache: Dict[str, str] = {}
+    mount = _async_io.get_mount_point(str(tmp_path / "Track 01.mp3"), cache)
+
+    assert os.path.ismount(mount)
+    assert str(tmp_path).startswith(mount)
+    assert cache == {str(tmp_path): mount}
@@ -0,0 +1,64 @@
+"""Unit-tests for the _checking module."""
+import os
+from pathlib import Path
+import platform
+
+import pytest
+from pytest_mock import MockFixture
+
+from playlist_along import _checking
+
+
+def test_check_lists_each_folder_once(tmp_path: Path, mocker: MockFixture) -> None:
+    """It lists folder of tracks once and doesn't probe listed tracks."""
+    album = tmp_path / "Album"
+    album.mkdir()
+    for name in ("Track 01.mp3", "Track 02.mp3", "Track 03.mp3"):
+        (album / name).write_text("Here are music bytes")
+    scandir = mocker.spy(os, "scandir")
+    exists = mocker.spy(os.path, "exists")
+    access = mocker.spy(os, "access")
+
+    tracks = [str(album / "Track 01.mp3"), "Album/Track 02.mp3", "Album/Track 03.mp3"]
+    report = _checking.check_tracks(tracks, tmp_path, jobs=2)
+
+    assert scandir.call_count == 1
+    assert exists.call_count == access.call_count == 0
+    assert (report.checked, report.folders) == (3, 1)
+    assert report.missing == report.unreadable == report.duplicates == []
+
+
+def test_check_reports_problem_tracks_in_order(tmp_path: Path) -> None:
+    """It reports missing tracks and duplicates in playlist order."""
+    (tmp_path / "Track 01.mp3").write_text("Here are music bytes")
+    (tmp_path / "Folder.mp3").mkdir()
+    tracks = [
+        "No folder/Track 02.mp3",
+        "Track 01.mp3",
+        "Track 03.mp3",
+        "./Track 01.mp3",
+        "Folder.mp3",
+    ]
+
+    report = _checking.check_tracks(tracks, tmp_path, jobs=4)
+
+    assert report.missing == ["No folder/Track 02.mp3", "Track 03.mp3"]
+    assert report.unreadable == ["Folder.mp3"]
+    assert report.duplicates == ["./Track 01.mp3"]
+    assert (report.checked, report.folders) == (5, 2)
+
+
+@pytest.mark.skipif(
+    platform.system() == "Windows" or os.geteuid() == 0,
+    reason="permissions are not applied",
+)
+def test_check_reports_unreadable_tracks(tmp_path: Path) -> None:
+    """It reports tracks without read permission."""
+    track = tmp_path / "Track 01.mp3"
+    track.write_text("Here are music bytes")
+    track.chmod(0o200)
+
+    report = _checking.check_tracks(["Track 01.mp3"], tmp_path, readable=True)
+
+    assert report.unreadable == ["Track 01.mp3"]
+    assert _checking.check_tracks(["Track 01.mp3"], tmp_path).unreadable == []
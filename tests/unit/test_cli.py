@@ -1,7 +1,15 @@
 """Unit-tests for the console module."""
+import json
+import os
 from pathlib import Path
 import platform
+import pstats
+import shutil
+import subprocess
+import sys
 from textwrap import dedent
+import time
+from typing import Any, List
 from unittest.mock import Mock
 
 from click.testing import CliRunner, Result
@@ -19,6 +27,35 @@ def test_cli_prints_version(runner: CliRunner) -> None:
     assert "playlist-along, version 20" in result.output
 
 
+def test_cli_lists_all_commands_in_help(runner: CliRunner) -> None:
+    """It lists lazily loaded commands in help."""
+    result = runner.invoke(cli, ["--help"])
+    assert result.exit_code == 0
+    assert "convert" in result.output and "create" in result.output
+    assert "display" in result.output and "inject" in result.output
+
+
+def test_cli_imports_heavy_modules_lazily() -> None:
+    """It doesn't import commands and heavy dependencies at startup."""
+    code = (
+        "import sys, playlist_along.cli; "
+        "print(*[m for m in ('charset_normalizer', 'mutagen', 'natsort', "
+        "'playlist_along.commands.create', 'cProfile') if m in sys.modules])"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    )
+    assert result.stdout.strip() == ""
+
+
+def test_cli_keeps_mapping_of_lazy_commands(runner: CliRunner) -> None:
+    """It doesn't remove loaded commands from passed mapping."""
+    from playlist_along.cli import LAZY_SUBCOMMANDS
+
+    runner.invoke(cli, ["display", "--help"])
+    assert "display" in LAZY_SUBCOMMANDS
+
+
 def test_cli_fails_for_unsupported_format(runner: CliRunner) -> None:
     """It warns if format validation is failed."""
     result: Result
@@ -54,6 +91,68 @@ def test_cli_prints_tracklist_itself(runner: CliRunner) -> None:
         assert result.output == "First track!.mp3\nSecond Track!.flac\n"
 
 
+def test_cli_saves_encodings_into_cache_dir(runner: CliRunner) -> None:
+    """It keeps detected encodings in '--cache-dir' folder."""
+    with runner.isolated_filesystem():
+        Path("temp.m3u").write_text("Track 01.mp3\n", encoding="utf-8")
+        result = runner.invoke(cli, ["--cache-dir", "cache", "-f", "temp.m3u"])
+        assert result.exit_code == 0
+        assert Path("cache", "encodings.json").exists()
+
+
+def test_cli_uses_cache_dir_only_within_invocation(runner: CliRunner) -> None:
+    """It doesn't save encodings into '--cache-dir' of previous invocation."""
+    from playlist_along._utils import encoding_cache
+
+    with runner.isolated_filesystem():
+        Path("temp.m3u").write_text("Track 01.mp3\n", encoding="utf-8")
+        runner.invoke(cli, ["--cache-dir", "cache", "-f", "temp.m3u"])
+        shutil.rmtree("cache")
+        result = runner.invoke(cli, ["-f", "temp.m3u"])
+        assert result.exit_code == 0
+        assert not Path("cache").exists()
+        assert encoding_cache.file is None
+
+
+def test_cli_reads_playlist_with_passed_encoding(
+    runner: CliRunner,
+    mocker: MockFixture,
+) -> None:
+    """It skips encoding detection with '--encoding' option."""
+    detect = mocker.patch("playlist_along.playlist._detect_file_encoding")
+    with runner.isolated_filesystem():
+        Path("temp.m3u").write_text("Кирилл - Track_01!.mp3\n", encoding="cp1251")
+        result = runner.invoke(cli, ["-f", "temp.m3u", "-e", "cp1251", "display"])
+        assert result.output == "Кирилл - Track_01!.mp3\n"
+        detect.assert_not_called()
+
+
+@pytest.mark.parametrize("extra_args", [[], ["display", "--full"]])
+def test_cli_passes_sample_size_to_encoding_detection(
+    runner: CliRunner,
+    mocker: MockFixture,
+    extra_args: Any,
+) -> None:
+    """It detects encoding by '--sample-size' bytes without changing default."""
+    from playlist_along import _utils
+
+    sniff = mocker.spy(_utils, "_sniff_file_encoding")
+    with runner.isolated_filesystem():
+        Path("temp.m3u").write_text("Track 01.mp3\n", encoding="utf-8")
+        args = ["--sample-size", "8", "-f", "temp.m3u", *extra_args]
+        result = runner.invoke(cli, args)
+        assert result.exit_code == 0
+        assert sniff.call_args.args[2] == 8
+        assert _utils.ENCODING_SAMPLE_SIZE == 64 * 1024
+
+
+def test_cli_fails_for_unknown_encoding(runner: CliRunner) -> None:
+    """It exits with a non-zero status code for unknown encoding."""
+    result = runner.invoke(cli, ["-f", "temp.m3u", "-e", "klingon", "display"])
+    assert result.exit_code == 2
+    assert "unknown encoding 'klingon'" in result.output
+
+
 def test_cli_fails_unknown_command(runner: CliRunner) -> None:
     """It fails with incorrect command."""
     result = runner.invoke(cli, ["command.m3u"])
@@ -74,6 +173,16 @@ def test_cli_prints_tracklist_with_display(runner: CliRunner) -> None:
         assert result.output == "First track!.flac\nSecond Track!.mp3\n"
 
 
+def test_cli_displays_comment_line_ending_with_audio_extension(
+    runner: CliRunner,
+) -> None:
+    """It prints #EXTINF line with audio extension, like a track."""
+    with runner.isolated_filesystem():
+        Path("tiny.m3u").write_text("#EXTM3U\n#EXTINF:2,x.mp3\nFirst track.flac\n")
+        result = runner.invoke(cli, ["--file", "tiny.m3u", "display"])
+        assert result.output == "#EXTINF:2,x.mp3\nFirst track.flac\n"
+
+
 def test_cli_displays_full_content_and_exits(runner: CliRunner) -> None:
     """It displays a full content of playlist and then exits."""
     with runner.isolated_filesystem():
@@ -277,7 +386,13 @@ def test_cli_dest_with_dot_is_file_by_default(runner: CliRunner) -> None:
 
 
 @pytest.fixture
-def mock_shutil_copy2(mocker: MockFixture) -> Mock:
+def no_kernel_copy(mocker: MockFixture) -> None:
+    """Fixture for copying files only by shutil.copy2."""
+    mocker.patch("playlist_along._transfer.IS_LINUX", False)
+
+
+@pytest.fixture
+def mock_shutil_copy2(mocker: MockFixture, no_kernel_copy: None) -> Mock:
     """Fixture for mocking shutil.copy2."""
     shutil_copy2: Mock = mocker.patch("shutil.copy2")
     return shutil_copy2
@@ -347,6 +462,296 @@ def test_cli_copies_files_into_folder_with_dot(runner: CliRunner) -> None:
         assert origin_dir == converted_dir
 
 
+@pytest.mark.parametrize("extra_args", [[], ["--async-io"]])
+def test_cli_copies_files_with_several_jobs(
+    runner: CliRunner, extra_args: Any
+) -> None:
+    """It copies files by several workers simultaneously."""
+    with runner.isolated_filesystem():
+        tracks = [f"Track {i:02}.mp3" for i in range(1, 11)]
+        Path("temp.m3u").write_text("\n".join(tracks))
+        temp_folder = Path("temp.m3u").resolve().parent
+        for track in tracks:
+            Path(temp_folder / track).write_text(f"Here are music bytes of {track}")
+        target_dest = temp_folder / "sub"
+        result = runner.invoke(
+            cli,
+            [
+                "--file",
+                "temp.m3u",
+                "convert",
+                "--dest",
+                str(target_dest),
+                "--copy",
+                "--jobs",
+                "4",
+                *extra_args,
+            ],
+        )
+        assert result.exit_code == 0
+        for track in tracks:
+            copied = Path(target_dest / track).read_text()
+            assert copied == f"Here are music bytes of {track}"
+
+
+@pytest.mark.parametrize("extra_args", [[], ["--async-io"]])
+def test_cli_copies_files_as_hardlinks(runner: CliRunner, extra_args: Any) -> None:
+    """It hard links files on the same drive with '--hardlink'."""
+    with runner.isolated_filesystem():
+        Path("temp.m3u").write_text("Track 01.mp3\nTrack 02.mp3\n")
+        temp_folder = Path("temp.m3u").resolve().parent
+        for name in ["Track 01.mp3", "Track 02.mp3"]:
+            Path(temp_folder / name).write_text("Here are music bytes")
+        target_dest = temp_folder / "sub"
+        args = ["-f", "temp.m3u", "convert", "-d", str(target_dest), "--copy"]
+        result = runner.invoke(cli, [*args, "--hardlink", *extra_args])
+        assert result.exit_code == 0
+        for name in ["Track 01.mp3", "Track 02.mp3"]:
+            assert os.path.samefile(temp_folder / name, target_dest / name)
+
+
+@pytest.mark.parametrize("extra_args", [[], ["--async-io"]])
+def test_cli_copies_files_with_rate_limits(
+    runner: CliRunner, extra_args: Any
+) -> None:
+    """It copies files with '--max-bandwidth' and '--max-files-per-sec'."""
+    with runner.isolated_filesystem():
+        tracks = [f"Track {i:02}.mp3" for i in range(1, 6)]
+        Path("temp.m3u").write_text("\n".join(tracks))
+        temp_folder = Path("temp.m3u").resolve().parent
+        for track in tracks:
+            Path(temp_folder / track).write_text(f"Here are music bytes of {track}")
+        target_dest = temp_folder / "sub"
+        args = ["-f", "temp.m3u", "convert", "-d", str(target_dest), "--copy"]
+        limits = ["--max-bandwidth", "10M", "--max-files-per-sec", "1000"]
+        result = runner.invoke(cli, [*args, "-j", "2", *limits, *extra_args])
+        assert result.exit_code == 0
+        for track in tracks:
+            copied = Path(target_dest / track).read_text()
+            assert copied == f"Here are music bytes of {track}"
+
+
+def test_cli_fails_on_wrong_bandwidth(runner: CliRunner) -> None:
+    """It exits with usage error for not a size of bandwidth."""
+    with runner.isolated_filesystem():
+        Path("temp.m3u").write_text("Track 01.mp3\n")
+        args = ["-f", "temp.m3u", "convert", "-d", "sub", "--copy"]
+        result = runner.invoke(cli, [*args, "--max-bandwidth", "fast"])
+        assert result.exit_code == 2
+        assert "'fast' is not a size" in result.output
+
+
+def test_cli_shows_copy_plan_with_dry_run(runner: CliRunner) -> None:
+    """It shows plan of copying and doesn't convert and copy with '--dry-run'."""
+    with runner.isolated_filesystem():
+        Path("temp.m3u").write_text("Track 01.mp3\nTrack 02.mp3\nAbsent.mp3\n")
+        temp_folder = Path("temp.m3u").resolve().parent
+        for name in ["Track 01.mp3", "Track 02.mp3"]:
+            Path(temp_folder / name).write_bytes(b"0" * 1024)
+        target_dest = temp_folder / "sub"
+        target_pls = str(target_dest / "temp.m3u")
+        args = ["-f", "temp.m3u", "convert", "-d", target_pls, "--dry-run"]
+        result = runner.invoke(cli, [*args, "--max-bandwidth", "1K"])
+        assert result.exit_code == 0
+        assert "Copy plan: 2 files, 2.0 KiB (0 skipped, 1 missing)." in result.output
+        assert "Free space in destination:" in result.output
+        assert "Estimated time: 2 s." in result.output
+        assert not target_dest.exists()
+
+
+def test_cli_fails_before_copying_without_free_space(
+    runner: CliRunner, mocker: MockFixture
+) -> None:
+    """It doesn't start copying, if destination has not enough space."""
+    with runner.isolated_filesystem():
+        Path("temp.m3u").write_text("Track 01.mp3\n")
+        temp_folder = Path("temp.m3u").resolve().parent
+        Path(temp_folder / "Track 01.mp3").write_bytes(b"0" * 1024)
+        target_dest = temp_folder / "sub"
+        mocker.patch("shutil.disk_usage", return_value=mocker.Mock(free=100))
+        args = ["-f", "temp.m3u", "convert", "-d", str(target_dest), "--copy"]
+        result = runner.invoke(cli, args)
+        assert result.exit_code == 1
+        assert "Not enough free space in destination" in result.output
+        assert not Path(target_dest / "Track 01.mp3").exists()
+
+
+def test_cli_exports_files_through_store(runner: CliRunner) -> None:
+    """It hard links files from store into destination with '--store'."""
+    with runner.isolated_filesystem():
+        Path("temp.m3u").write_text("Track 01.mp3\nTrack 02.mp3\n")
+        temp_folder = Path("temp.m3u").resolve().parent
+        for name in ["Track 01.mp3", "Track 02.mp3"]:
+            Path(temp_folder / name).write_text("Here are music bytes")
+        target_dest = temp_folder / "sub"
+        args = ["-f", "temp.m3u", "convert", "-d", str(target_dest)]
+        result = runner.invoke(cli, [*args, "--store", "store"])
+        assert result.exit_code == 0
+        assert "Store: 1 new files, 1 reused." in result.output
+        assert os.path.samefile(
+            target_dest / "Track 01.mp3", target_dest / "Track 02.mp3"
+        )
+
+
+@pytest.mark.parametrize("extra_args", [["--store", "store"], ["--resume"]])
+def test_cli_fails_on_option_with_sync(runner: CliRunner, extra_args: Any) -> None:
+    """It exits with usage error for '--store' or '--resume' with '--sync'."""
+    with runner.isolated_filesystem():
+        Path("temp.m3u").write_text("Track 01.mp3\n")
+        args = ["-f", "temp.m3u", "convert", "-d", "sub", "--sync"]
+        result = runner.invoke(cli, [*args, *extra_args])
+        assert result.exit_code == 2
+        assert f"'{extra_args[0]}' can't be used with '--sync'" in result.output
+
+
+@pytest.mark.parametrize(
+    "extra_args, required",
+    [
+        (["--delete"], "--sync"),
+        (["--checksum"], "--sync"),
+        (["--copy", "--symlink"], "--store"),
+    ],
+)
+def test_cli_fails_on_option_without_required_one(
+    runner: CliRunner, extra_args: Any, required: str
+) -> None:
+    """It exits with usage error instead of ignoring option."""
+    with runner.isolated_filesystem():
+        Path("temp.m3u").write_text("Track 01.mp3\n")
+        args = ["-f", "temp.m3u", "convert", "-d", "sub"]
+        result = runner.invoke(cli, [*args, *extra_args])
+        assert result.exit_code == 2
+        assert f"'{extra_args[-1]}' requires '{required}'" in result.output
+        assert not Path("sub").exists()
+
+
+def test_cli_copies_other_files_after_copy_error(
+    runner: CliRunner,
+    mocker: MockFixture,
+    no_kernel_copy: None,
+) -> None:
+    """It copies the rest of files and reports failed ones."""
+    with runner.isolated_filesystem():
+        Path("temp.m3u").write_text("Track 01.mp3\nTrack 02.mp3\nTrack 03.flac\n")
+        temp_folder = Path("temp.m3u").resolve().parent
+        for name in ["Track 01.mp3", "Track 02.mp3", "Track 03.flac"]:
+            Path(temp_folder / name).write_text("Here are music bytes")
+        target_dest = temp_folder / "sub"
+        real_copy2 = shutil.copy2
+
+        def fail_on_second_track(src: Path, dst: Path) -> Any:
+            if Path(src).name == "Track 02.mp3":
+                raise OSError("Disk is on fire")
+            return real_copy2(src, dst)
+
+        mocker.patch("shutil.copy2", side_effect=fail_on_second_track)
+        result = runner.invoke(
+            cli,
+            ["-f", "temp.m3u", "convert", "-d", str(target_dest), "--copy", "-j", "2"],
+        )
+        assert result.exit_code == 1
+        assert "Track 02.mp3: Disk is on fire" in result.output
+        assert Path(target_dest / "Track 01.mp3").exists()
+        assert Path(target_dest / "Track 03.flac").exists()
+        assert not Path(target_dest / "Track 02.mp3").exists()
+
+
+def test_cli_resumes_copying_after_error(
+    runner: CliRunner,
+    mocker: MockFixture,
+    no_kernel_copy: None,
+) -> None:
+    """It copies only not copied files with '--resume' and deletes journal."""
+    with runner.isolated_filesystem():
+        Path("temp.m3u").write_text("Track 01.mp3\nTrack 02.mp3\n")
+        temp_folder = Path("temp.m3u").resolve().parent
+        for name in ["Track 01.mp3", "Track 02.mp3"]:
+            Path(temp_folder / name).write_text("Here are music bytes")
+        target_dest = temp_folder / "sub"
+        journal = target_dest / ".playlist-along-copy.journal"
+        real_copy2 = shutil.copy2
+
+        def fail_on_second_track(src: Path, dst: Path) -> Any:
+            if Path(src).name == "Track 02.mp3":
+                raise OSError("Disk is on fire")
+            return real_copy2(src, dst)
+
+        mocker.patch("shutil.copy2", side_effect=fail_on_second_track)
+        args = ["-f", "temp.m3u", "convert", "-d", str(target_dest), "--copy"]
+        result = runner.invoke(cli, args)
+        assert result.exit_code == 1
+        assert journal.exists()
+        assert not list(target_dest.glob(".*.part"))
+
+        copy_mock = mocker.patch("shutil.copy2", side_effect=real_copy2)
+        result = runner.invoke(cli, [*args, "--resume"])
+        assert result.exit_code == 0
+        assert "1 files were copied before" in result.output
+        assert copy_mock.call_count == 1
+        assert Path(target_dest / "Track 02.mp3").exists()
+        assert not journal.exists()
+
+
+def test_cli_syncs_only_changed_files(runner: CliRunner) -> None:
+    """It updates changed files in destination with '--sync'."""
+    with runner.isolated_filesystem():
+        Path("temp.m3u").write_text("Track 01.mp3\nTrack 02.mp3\n")
+        temp_folder = Path("temp.m3u").resolve().parent
+        Path(temp_folder / "Track 01.mp3").write_text("Here are NEW music bytes")
+        Path(temp_folder / "Track 02.mp3").write_text("Here are music bytes")
+        target_dest = temp_folder / "sub"
+        target_dest.mkdir()
+        Path(target_dest / "Track 01.mp3").write_text("Here are OLD music bytes")
+        result = runner.invoke(
+            cli, ["-f", "temp.m3u", "convert", "-d", str(target_dest), "--sync"]
+        )
+        assert result.exit_code == 0
+        updated = Path(target_dest / "Track 01.mp3").read_text()
+        assert updated == "Here are NEW music bytes"
+        assert Path(target_dest / "Track 02.mp3").exists()
+        assert Path(target_dest / ".playlist-along-sync.json").exists()
+
+
+def test_cli_skips_synced_files_on_next_run(
+    runner: CliRunner,
+    mocker: MockFixture,
+) -> None:
+    """It does not copy unchanged files again with '--sync'."""
+    with runner.isolated_filesystem():
+        Path("temp.m3u").write_text("Track 01.mp3\nTrack 02.mp3\n")
+        temp_folder = Path("temp.m3u").resolve().parent
+        Path(temp_folder / "Track 01.mp3").write_text("Here are music bytes")
+        Path(temp_folder / "Track 02.mp3").write_text("Here are music bytes")
+        target_dest = temp_folder / "sub"
+        args = ["-f", "temp.m3u", "convert", "-d", str(target_dest), "--sync"]
+        runner.invoke(cli, args)
+        copy2 = mocker.patch("shutil.copy2")
+        result = runner.invoke(cli, args)
+        assert result.exit_code == 0
+        copy2.assert_not_called()
+
+
+def test_cli_deletes_synced_files_absent_in_playlist(runner: CliRunner) -> None:
+    """It deletes only previously synced files with '--sync --delete'."""
+    with runner.isolated_filesystem():
+        Path("temp.m3u").write_text("Track 01.mp3\nTrack 02.mp3\n")
+        temp_folder = Path("temp.m3u").resolve().parent
+        Path(temp_folder / "Track 01.mp3").write_text("Here are music bytes")
+        Path(temp_folder / "Track 02.mp3").write_text("Here are music bytes")
+        target_dest = temp_folder / "sub"
+        target_dest.mkdir()
+        Path(target_dest / "Not synced.mp3").write_text("Here are music bytes")
+        args = ["-f", "temp.m3u", "convert", "-d", str(target_dest), "--sync"]
+        runner.invoke(cli, args)
+        Path("temp.m3u").write_text("Track 01.mp3\n")
+        result = runner.invoke(cli, args + ["--delete"])
+        assert result.exit_code == 0
+        assert "Track 02.mp3" in result.output
+        assert Path(target_dest / "Track 01.mp3").exists()
+        assert not Path(target_dest / "Track 02.mp3").exists()
+        assert Path(target_dest / "Not synced.mp3").exists()
+
+
 def test_cli_injects_file_top_by_default(runner: CliRunner) -> None:
     """It injects file at the beginning of origin file by default."""
     with runner.isolated_filesystem():
@@ -401,6 +806,187 @@ def test_cli_injects_file_at_the_bottom(runner: CliRunner) -> None:
         assert expected == injected
 
 
+def test_cli_injects_several_files_in_given_order(runner: CliRunner) -> None:
+    """It injects several files at the top in order of options."""
+    with runner.isolated_filesystem():
+        Path("temp.m3u").write_text("#EXTM3U\nTrack 01.mp3\n")
+        Path("inj1.m3u").write_text("#EXTM3U\nTrack 02.mp3\n")
+        Path("inj2.m3u8").write_text("Track 03.mp3\nTrack 04.mp3")
+
+        result = runner.invoke(
+            cli, ["-f", "temp.m3u", "inject", "-f", "inj1.m3u", "-f", "inj2.m3u8"]
+        )
+
+        injected = Path("temp.m3u").read_text()
+        expected = "#EXTM3U\nTrack 02.mp3\nTrack 03.mp3\nTrack 04.mp3\nTrack 01.mp3\n"
+        assert result.exit_code == 0
+        assert expected == injected
+
+
+def test_cli_appends_injected_files_without_rewriting(runner: CliRunner) -> None:
+    """It appends files to the end of origin file, which is not rewritten."""
+    with runner.isolated_filesystem():
+        Path("temp.m3u").write_text("#EXTM3U\nTrack 01.mp3\n", encoding="utf-8")
+        Path("inj1.m3u").write_text("\n#EXTM3U\n\nTrack 02.mp3 \n\n")
+        Path("inj2.m3u").write_text("Track 03.mp3\nTrack 04.mp3")
+        inode = os.stat("temp.m3u").st_ino
+
+        result = runner.invoke(
+            cli,
+            ["-f", "temp.m3u", "inject", "-f", "inj1.m3u", "-f", "inj2.m3u", "--bottom"],
+        )
+
+        injected = Path("temp.m3u").read_text()
+        expected = "#EXTM3U\nTrack 01.mp3\nTrack 02.mp3\nTrack 03.mp3\nTrack 04.mp3\n"
+        assert result.exit_code == 0
+        assert expected == injected
+        assert os.stat("temp.m3u").st_ino == inode
+
+
+def test_cli_appends_with_the_same_line_ends_as_rewriting(
+    runner: CliRunner,
+) -> None:
+    """It doesn't append to file with line ends, which rewriting changes."""
+    with runner.isolated_filesystem():
+        Path("temp.m3u").write_bytes(b"#EXTM3U\r\nTrack 01.mp3\r\n")
+        Path("inj.m3u").write_text("Track 02.mp3\n")
+
+        result = runner.invoke(
+            cli, ["-f", "temp.m3u", "inject", "-f", "inj.m3u", "--bottom"]
+        )
+
+        expected = "#EXTM3U\nTrack 01.mp3\nTrack 02.mp3\n".replace("\n", os.linesep)
+        assert result.exit_code == 0
+        assert Path("temp.m3u").read_bytes() == expected.encode()
+
+
+@pytest.mark.parametrize(
+    "origin",
+    [
+        b"#EXTM3U\nA.mp3\r\nB.mp3\n",
+        b"#EXTM3U\r\nA.mp3\nB.mp3\r\n",
+        b"#EXTM3U\nA.mp3\rB.mp3\n",
+        b"#EXTM3U\r\nA.mp3\rB.mp3\r\n",
+    ],
+)
+def test_cli_injects_with_the_same_result_for_mixed_line_ends(
+    runner: CliRunner, origin: bytes
+) -> None:
+    """It writes the same line ends at the top and at the bottom."""
+    with runner.isolated_filesystem():
+        Path("inj.m3u").write_text("Track C.mp3\n")
+        results = []
+        for position in ("--top", "--bottom"):
+            Path("temp.m3u").write_bytes(origin)
+            args = ["-f", "temp.m3u", "inject", "-f", "inj.m3u", position]
+            assert runner.invoke(cli, args).exit_code == 0
+            results.append(Path("temp.m3u").read_bytes())
+
+        lines = ["#EXTM3U", "Track C.mp3", "A.mp3", "B.mp3"]
+        assert results[0] == "".join(f"{line}{os.linesep}" for line in lines).encode()
+        lines = ["#EXTM3U", "A.mp3", "B.mp3", "Track C.mp3"]
+        assert results[1] == "".join(f"{line}{os.linesep}" for line in lines).encode()
+
+
+@pytest.mark.parametrize("extra_args", [[], ["--disk-index"]])
+def test_cli_removes_duplicate_tracks(runner: CliRunner, extra_args: Any) -> None:
+    """It keeps the first occurrence of each track with its #EXTINF line."""
+    with runner.isolated_filesystem():
+        content = """\
+            #EXTM3U
+            #EXTINF:11,Track 01
+            D:\\Music\\Track 01.mp3
+            #EXTINF:22,Track 02
+            D:\\Music\\Track 02.mp3
+            #EXTINF:11,Track 01
+            d:/music/track 01.mp3
+            #EXTINF:22,Track 02
+            D:\\Music\\Track 02.mp3
+            """
+        Path("temp.m3u8").write_text(dedent(content), encoding="utf-8")
+
+        result = runner.invoke(cli, ["-f", "temp.m3u8", "dedupe", *extra_args])
+
+        deduped = Path("temp.m3u8").read_text(encoding="utf-8")
+        expected = (
+            "#EXTM3U\n"
+            "#EXTINF:11,Track 01\n"
+            "D:\\Music\\Track 01.mp3\n"
+            "#EXTINF:22,Track 02\n"
+            "D:\\Music\\Track 02.mp3\n"
+            "#EXTINF:11,Track 01\n"
+            "d:/music/track 01.mp3\n"
+        )
+        assert result.output == "Removed 1 duplicate tracks.\n"
+        assert expected == deduped
+
+
+def test_cli_removes_duplicates_ignoring_case_and_separators(
+    runner: CliRunner,
+) -> None:
+    """It saves deduplicated playlist into destination."""
+    with runner.isolated_filesystem():
+        content = "D:\\Music\\Track 01.mp3\nd:/music/TRACK 01.mp3\nTrack 02.mp3\n"
+        Path("temp.m3u").write_text(content)
+
+        result = runner.invoke(
+            cli,
+            ["-f", "temp.m3u", "dedupe", "-d", "new.m3u", "-i", "--any-separator"],
+        )
+
+        assert result.output == "Removed 1 duplicate tracks.\n"
+        assert Path("new.m3u").read_text() == "D:\\Music\\Track 01.mp3\nTrack 02.mp3\n"
+        assert Path("temp.m3u").read_text() == content
+
+
+@pytest.mark.parametrize("dest", [".", "temp.m3u", "./temp.m3u"])
+def test_cli_dedupes_in_place_if_dest_is_origin(runner: CliRunner, dest: str) -> None:
+    """It rewrites origin playlist, if destination resolves to it."""
+    with runner.isolated_filesystem():
+        Path("temp.m3u").write_text("Track 01.mp3\nTrack 01.mp3\nTrack 02.mp3\n")
+
+        result = runner.invoke(cli, ["-f", "temp.m3u", "dedupe", "-d", dest])
+
+        assert result.output == "Removed 1 duplicate tracks.\n"
+        assert Path("temp.m3u").read_text() == "Track 01.mp3\nTrack 02.mp3\n"
+        assert not Path("temp_vlc.m3u").exists()
+
+
+def test_cli_checks_tracks_of_playlist(runner: CliRunner) -> None:
+    """It reports problem tracks and exits with error."""
+    with runner.isolated_filesystem():
+        Path("Track 01.mp3").write_text("Here are music bytes")
+        content = "#EXTM3U\nTrack 01.mp3\nTrack 02.mp3\nTrack 01.mp3\nhttp://a.mp3\n"
+        Path("temp.m3u").write_text(content)
+
+        result = runner.invoke(cli, ["-f", "temp.m3u", "check"])
+
+        assert result.output == (
+            "Missing tracks:\n"
+            "Track 02.mp3\n"
+            "Duplicate tracks:\n"
+            "Track 01.mp3\n"
+            "Checked 3 tracks in 1 folders: 1 missing, 0 unreadable, 1 duplicates.\n"
+            "Error: 1 tracks are NOT available.\n"
+        )
+        assert result.exit_code == 1
+
+
+@pytest.mark.parametrize(
+    "top, expected",
+    [
+        (True, "#EXTM3U\nc.mp3\na.mp3\nb.mp3\n"),
+        (False, "#EXTM3U\na.mp3\nb.mp3\nc.mp3\n"),
+    ],
+)
+def test_inject_content_concatenates_contents(top: bool, expected: str) -> None:
+    """It concatenates contents without their #EXTM3U tags."""
+    from playlist_along.commands.inject import inject_content
+
+    origin = "#EXTM3U\na.mp3\nb.mp3\n\n"
+    assert inject_content(origin, "#EXTM3U\nc.mp3\n", top) == expected
+
+
 def test_cli_exits_on_small_injection(runner: CliRunner) -> None:
     """It exits if injected file is too small."""
     with runner.isolated_filesystem():
@@ -805,3 +1391,263 @@ def test_cli_creates_extended_m3u_with_default_length_on_error(
         assert line_3 == lines[2]
         assert line_4
         assert line_5 == lines[4]
+
+
+@pytest.mark.parametrize("extra_args", [[], ["--async-io"]])
+def test_cli_creates_extended_m3u_with_several_jobs(
+    runner: CliRunner,
+    mock_get_seconds: Mock,
+    extra_args: Any,
+) -> None:
+    """It keeps order of tracks while reading lengths simultaneously."""
+    with runner.isolated_filesystem():
+        temp_folder = Path().resolve()
+        names = [f"Track {i:02}.mp3" for i in range(1, 21)]
+        for name in names:
+            Path(temp_folder / name).write_text("")
+
+        def length_from_name(path: str) -> int:
+            number = int(Path(path).stem.split()[-1])
+            if number == 7:
+                raise MutagenError
+            # The first files are read the longest
+            time.sleep((21 - number) / 1000)
+            return number * 10
+
+        mock_get_seconds.side_effect = length_from_name
+        args = ["create", "-f", str(temp_folder), "--ext-m3u", "--jobs", "8"]
+        args += extra_args
+        result = runner.invoke(cli, ["-f", "ext.m3u8"] + args)
+        assert result.exit_code == 0
+        lines = Path(temp_folder / "ext.m3u8").read_text().splitlines()
+        for i, name in enumerate(names, start=1):
+            length = 0 if i == 7 else i * 10
+            assert lines[2 * i - 1] == f"#EXTINF:{length},{Path(name).stem}"
+            assert lines[2 * i] == name
+
+
+def test_cli_creates_extended_m3u_with_cached_lengths(
+    runner: CliRunner,
+    mock_get_seconds: Mock,
+) -> None:
+    """It reads lengths only of new files with main '--cache-dir' option."""
+    with runner.isolated_filesystem():
+        temp_folder = Path().resolve()
+        Path(temp_folder / "Track 01.mp3").write_text("")
+        mock_get_seconds.return_value = 666
+        args = ["create", "-f", str(temp_folder), "--ext-m3u"]
+        main_args = ["--cache-dir", "cache", "-f", "ext.m3u8"]
+        runner.invoke(cli, main_args + args)
+        Path(temp_folder / "Track 02.mp3").write_text("")
+        result = runner.invoke(cli, main_args + args)
+        assert mock_get_seconds.call_count == 2
+        assert "Metadata cache: 1 hits, 1 misses." in result.output
+        content = Path(temp_folder / "ext.m3u8").read_text()
+        assert content.count("#EXTINF:666,") == 2
+
+        runner.invoke(cli, main_args + args + ["--no-cache"])
+        assert mock_get_seconds.call_count == 4
+
+
+def test_cli_doesnt_cache_unreadable_lengths(
+    runner: CliRunner,
+    mock_get_seconds: Mock,
+) -> None:
+    """It reads length of file again, if it wasn't read last time."""
+    with runner.isolated_filesystem():
+        temp_folder = Path().resolve()
+        Path(temp_folder / "Track 01.mp3").write_text("")
+        mock_get_seconds.side_effect = [MutagenError("Can't sync"), 666]
+        args = ["create", "-f", str(temp_folder), "--ext-m3u"]
+        main_args = ["--cache-dir", "cache", "-f", "ext.m3u8"]
+        runner.invoke(cli, main_args + args)
+        assert "#EXTINF:0," in Path(temp_folder / "ext.m3u8").read_text()
+
+        result = runner.invoke(cli, main_args + args)
+        assert mock_get_seconds.call_count == 2
+        assert "Metadata cache: 0 hits, 1 misses." in result.output
+        assert "#EXTINF:666," in Path(temp_folder / "ext.m3u8").read_text()
+
+
+def test_cli_creates_playlist_from_sub_folders(runner: CliRunner) -> None:
+    """It picks up audio files from sub-folders with '--recursive'."""
+    with runner.isolated_filesystem():
+        temp_folder = Path().resolve()
+        Path(temp_folder / "A" / "B" / "C").mkdir(parents=True)
+        Path(temp_folder / "Track 01.mp3").write_text("")
+        Path(temp_folder / "A" / "Track 02.flac").write_text("")
+        Path(temp_folder / "A" / "Cover.jpg").write_text("")
+        Path(temp_folder / "A" / "B" / "Track 03.mp3").write_text("")
+        Path(temp_folder / "A" / "B" / "C" / "Track 04.mp3").write_text("")
+        args = ["-f", "new.m3u8", "create", "-f", str(temp_folder), "-r"]
+
+        result = runner.invoke(cli, args + ["--max-depth", "2"])
+        assert result.exit_code == 0
+        expected = [
+            str(Path("A", "B", "Track 03.mp3")),
+            str(Path("A", "Track 02.flac")),
+            "Track 01.mp3",
+        ]
+        assert Path("new.m3u8").read_text().splitlines() == expected
+
+        runner.invoke(cli, args + ["--exclude", "B", "--include", "*.mp3", "--abs"])
+        expected = [str(temp_folder / "Track 01.mp3")]
+        assert Path("new.m3u8").read_text().splitlines() == expected
+
+
+def test_cli_displays_many_playlists_in_batch(runner: CliRunner) -> None:
+    """It displays playlists from folder keeping output of each one together."""
+    with runner.isolated_filesystem():
+        Path("lists").mkdir()
+        for i in range(1, 7):
+            tracks = [f"List {i} track {n}.mp3" for n in range(1, 4)]
+            Path(f"lists/{i}.m3u8").write_text("\n".join(tracks))
+        Path("lists/notes.txt").write_text("Not a playlist")
+        result = runner.invoke(cli, ["batch", "--dir", "lists", "-j", "3", "display"])
+        assert result.exit_code == 0
+        lines = result.output.splitlines()
+        assert lines[:3] == [f"List 1 track {n}.mp3" for n in range(1, 4)]
+        assert lines[3].startswith(f"[OK] {Path('lists/1.m3u8')} (")
+        assert lines[16:19] == [f"List 5 track {n}.mp3" for n in range(1, 4)]
+        assert lines[-1].startswith("Processed 6 playlists: 6 succeeded, 0 failed")
+
+
+def test_cli_converts_playlists_from_manifest_and_glob(runner: CliRunner) -> None:
+    """It converts playlists listed in manifest and matched by glob only once."""
+    with runner.isolated_filesystem():
+        Path("a.m3u").write_text("D:\\Music\\A [1].mp3")
+        Path("b.m3u").write_text("D:\\Music\\B #2.mp3")
+        Path("list.txt").write_text("# Playlists\nb.m3u\n\na.m3u\n")
+        Path("out").mkdir()
+        result = runner.invoke(
+            cli,
+            ["batch", "-g", "*.m3u", "--manifest", "list.txt"]
+            + ["convert", "--dest", "out"],
+        )
+        assert result.exit_code == 0
+        assert "Processed 2 playlists: 2 succeeded" in result.output
+        assert Path("out/a.m3u").read_text() == "A %5B1%5D.mp3\n"
+        assert Path("out/b.m3u").read_text() == "B %232.mp3\n"
+
+
+def test_cli_syncs_playlists_into_shared_folder_in_batch(runner: CliRunner) -> None:
+    """It keeps synced tracks of all playlists in manifest of shared folder."""
+    with runner.isolated_filesystem():
+        for name in ("a", "b", "c", "d"):
+            Path(f"{name}.mp3").write_text(f"Here are music bytes of {name}")
+            Path(f"{name}.m3u").write_text(f"{Path(name + '.mp3').resolve()}\n")
+        Path("out").mkdir()
+        args = ["batch", "-g", "*.m3u", "-j", "4", "convert", "--dest", "out"]
+        result = runner.invoke(cli, [*args, "--sync"])
+        assert result.exit_code == 0
+        manifest = json.loads(Path("out/.playlist-along-sync.json").read_text())
+        assert sorted(manifest["tracks"]) == ["a.mp3", "b.mp3", "c.mp3", "d.mp3"]
+
+        result = runner.invoke(cli, [*args, "--sync", "--delete"])
+        assert result.exit_code == 2
+        assert "'--delete' can't be used for several playlists" in result.output
+
+
+def test_cli_reports_failed_playlists_in_batch(runner: CliRunner) -> None:
+    """It processes other playlists and fails at the end, if some one is failed."""
+    with runner.isolated_filesystem():
+        Path("good.m3u").write_text("D:\\Music\\Good.mp3")
+        Path("list.txt").write_text("missing.m3u\nfile.txt\ngood.m3u\n")
+        result = runner.invoke(cli, ["batch", "--manifest", "list.txt", "display"])
+        assert result.exit_code == 1
+        assert f"[FAILED] {Path('missing.m3u')}: " in result.output
+        assert f"[FAILED] {Path('file.txt')}: currently we are" in result.output
+        assert f"[OK] {Path('good.m3u')}" in result.output
+        assert "Error: 2 playlists were NOT processed." in result.output
+
+
+def test_cli_fails_on_batch_without_playlists(runner: CliRunner) -> None:
+    """It fails when no playlists were found for batch."""
+    with runner.isolated_filesystem():
+        result = runner.invoke(cli, ["batch", "-g", "*.m3u", "display"])
+        assert result.exit_code == 1
+        assert "No playlists were found for batch." in result.output
+
+
+def test_cli_prints_timings_of_stages(runner: CliRunner) -> None:
+    """It prints time, bytes and items of each stage as JSON."""
+    with runner.isolated_filesystem():
+        Path("temp.m3u").write_text("#EXTM3U\nD:\\Music\\A.mp3\nD:\\Music\\B.mp3\n")
+        result = runner.invoke(
+            cli,
+            ["--timings", "json", "--file", "temp.m3u", "convert", "--dest", "out"],
+        )
+        assert result.exit_code == 0
+        timings = json.loads(result.output.splitlines()[-1])
+        stages = {stage["stage"]: stage for stage in timings["stages"]}
+        assert list(stages) == ["detect encoding", "read", "convert", "write"]
+        assert stages["read"]["bytes"] == Path("temp.m3u").stat().st_size
+        assert stages["write"]["items"] == 3
+
+
+def test_cli_saves_profile_into_file(runner: CliRunner) -> None:
+    """It saves cProfile statistics, which can be read by pstats."""
+    with runner.isolated_filesystem():
+        Path("temp.m3u").write_text("D:\\Music\\A.mp3\n")
+        result = runner.invoke(
+            cli, ["--profile", "run.prof", "--timings", "table", "--file", "temp.m3u"]
+        )
+        assert result.exit_code == 0
+        assert "Total (wall time)" in result.output
+        stats = pstats.Stats("run.prof")
+        assert stats.stats  # type: ignore[attr-defined]
+
+
+def test_cli_watches_and_converts_changed_playlists(
+    runner: CliRunner, mocker: MockFixture
+) -> None:
+    """It converts playlists from folder and stops on Ctrl+C."""
+    mocker.patch("time.sleep", side_effect=KeyboardInterrupt)
+    with runner.isolated_filesystem():
+        Path("lists").mkdir()
+        Path("lists/a.m3u").write_text("D:\\Music\\A [1].mp3\n")
+        args = ["watch", "--dir", "lists", "--debounce", "0"]
+        result = runner.invoke(cli, args + ["convert", "--dest", "lists", "--dir"])
+        assert result.exit_code == 0
+        assert "Watching 1 playlists." in result.output
+        assert "[OK] " in result.output
+        assert "Watching is stopped." in result.output
+        assert Path("lists/a_vlc.m3u").read_text() == "A %5B1%5D.mp3\n"
+
+
+def test_cli_watches_failed_playlist_until_it_is_converted(
+    runner: CliRunner, mocker: MockFixture
+) -> None:
+    """It converts failed playlist again only after it's changed."""
+    from click import ClickException
+
+    def edit_on_second_sleep(interval: float) -> None:
+        sleeps.append(interval)
+        if len(sleeps) == 2:
+            Path("lists/a.m3u").write_text("D:\\Music\\B.mp3\n")
+        elif len(sleeps) == 3:
+            raise KeyboardInterrupt
+
+    sleeps: List[float] = []
+    mocker.patch("time.sleep", side_effect=edit_on_second_sleep)
+    convert = mocker.patch(
+        "playlist_along.commands.convert.convert_from_aimp_to_vlc_android",
+        side_effect=[ClickException("Destination is busy"), None],
+    )
+    with runner.isolated_filesystem():
+        Path("lists").mkdir()
+        Path("lists/a.m3u").write_text("D:\\Music\\A [1].mp3\n")
+        args = ["watch", "--dir", "lists", "--debounce", "0"]
+        result = runner.invoke(cli, args + ["convert", "--dest", "out", "--dir"])
+        assert result.exit_code == 0
+        assert convert.call_count == 2
+        assert "[FAILED] " in result.output and "Destination is busy" in result.output
+        assert result.output.index("[FAILED] ") < result.output.index("[OK] ")
+
+
+def test_cli_fails_on_watching_without_destination(runner: CliRunner) -> None:
+    """It requires destination for converting watched playlists."""
+    with runner.isolated_filesystem():
+        result = runner.invoke(cli, ["watch", "--dir", ".", "convert"])
+        assert result.exit_code == 1
+        assert "Destination is required" in result.output
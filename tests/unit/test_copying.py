@@ -0,0 +1,74 @@
+"""Unit-tests for the _copying module."""
+import os
+from pathlib import Path
+
+from click.testing import CliRunner
+import pytest
+
+from playlist_along import _copying
+
+
+def test_sync_skips_touched_but_same_file_with_checksum(runner: CliRunner) -> None:
+    """It does not copy a file with new mtime, but the same content."""
+    with runner.isolated_filesystem():
+        source = Path("Track 01.mp3").resolve()
+        source.write_text("Here are music bytes")
+        destination = Path("sub").resolve()
+        destination.mkdir()
+        Path(destination / "Track 01.mp3").write_text("Here are music bytes")
+        os.utime(source, ns=(1_000_000_000, 1_000_000_000))
+
+        report = _copying.CopyReport()
+        manifest = _copying.SyncManifest.load(destination)
+        tasks = _copying.plan_sync_tasks(
+            [str(source)], destination, report, manifest, checksum=True
+        )
+        assert tasks == []
+        assert report.skipped == [str(source)]
+        assert manifest.tracks["Track 01.mp3"]["sha256"] is not None
+
+
+def test_sync_manifest_is_empty_when_broken(runner: CliRunner) -> None:
+    """It ignores a broken manifest file."""
+    with runner.isolated_filesystem():
+        Path(_copying.SYNC_MANIFEST_NAME).write_text("{not a json")
+        manifest = _copying.SyncManifest.load(Path())
+        assert manifest.tracks == {}
+
+
+def test_copy_journal_ignores_broken_lines(runner: CliRunner) -> None:
+    """It loads copied tracks and skips a half-written last line."""
+    with runner.isolated_filesystem():
+        Path(_copying.COPY_JOURNAL_NAME).write_text(
+            '{"source": "/music/Track 01.mp3"}\n{"sour'
+        )
+        journal = _copying.CopyJournal.load(Path())
+        assert journal.copied == {"/music/Track 01.mp3"}
+
+
+def test_plan_skips_journaled_tracks(runner: CliRunner) -> None:
+    """It skips tracks from journal without checking them."""
+    with runner.isolated_filesystem():
+        destination = Path("sub").resolve()
+        destination.mkdir()
+        journal = _copying.CopyJournal(destination)
+        journal.copied.add("/not/existing/Track 01.mp3")
+        report = _copying.CopyReport()
+        tasks = _copying.plan_copy_tasks(
+            ["/not/existing/Track 01.mp3"], destination, report, journal
+        )
+        assert tasks == []
+        assert report.skipped == ["/not/existing/Track 01.mp3"]
+        assert report.missing == []
+
+
+def test_copy_one_track_leaves_no_partial_file(runner: CliRunner) -> None:
+    """It deletes temporary file, when track is not copied."""
+    with runner.isolated_filesystem():
+        destination = Path("sub").resolve()
+        destination.mkdir()
+        target = destination / "Track 01.mp3"
+        task = _copying.CopyTask(Path("Absent.mp3").resolve(), target, 0)
+        with pytest.raises(OSError):
+            _copying.copy_one_track(task)
+        assert list(destination.iterdir()) == []
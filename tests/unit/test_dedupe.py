@@ -0,0 +1,54 @@
+"""Unit-tests for the _dedupe module."""
+from pathlib import Path
+
+import pytest
+
+from playlist_along._dedupe import DiskLocationIndex, DuplicateFilter, LocationIndex
+from playlist_along._dedupe import normalize_location
+from playlist_along.playlist import PlaylistEntry
+
+
+@pytest.mark.parametrize(
+    "location, ignore_case, any_separator, expected",
+    [
+        (" D:\\Music\\Track.mp3 ", False, False, "D:\\Music\\Track.mp3"),
+        ("D:\\Music\\Track.mp3", False, True, "D:/Music/Track.mp3"),
+        ("D:\\Music\\TRACK.mp3", True, False, "d:\\music\\track.mp3"),
+        ("D:\\Music/Straße.MP3", True, True, "d:/music/strasse.mp3"),
+    ],
+)
+def test_normalize_location(
+    location: str, ignore_case: bool, any_separator: bool, expected: str
+) -> None:
+    """It normalizes location only in requested ways."""
+    assert normalize_location(location, ignore_case, any_separator) == expected
+
+
+def test_disk_index_finds_seen_locations(tmp_path: Path) -> None:
+    """It remembers locations in temporary database and deletes it."""
+    with DiskLocationIndex(tmp_path / "cache") as index:
+        assert index.add("Track 01.mp3")
+        assert index.add("Track 02.mp3")
+        assert not index.add("Track 01.mp3")
+    assert list((tmp_path / "cache").iterdir()) == []
+
+
+def test_duplicate_filter_counts_duplicates() -> None:
+    """It keeps only the first occurrence of each location."""
+    entries = [
+        PlaylistEntry("D:\\Music\\Track 01.mp3", ("#EXTINF:1,Track 01",)),
+        PlaylistEntry("d:/music/track 01.mp3", ("#EXTINF:2,Track 01",)),
+        PlaylistEntry("D:\\Music\\Track 02.mp3"),
+        PlaylistEntry(" D:\\Music\\Track 02.mp3"),
+    ]
+    keep = DuplicateFilter(LocationIndex())
+    assert [entry.location for entry in filter(keep, entries)] == [
+        "D:\\Music\\Track 01.mp3",
+        "d:/music/track 01.mp3",
+        "D:\\Music\\Track 02.mp3",
+    ]
+    assert keep.duplicates == 1
+
+    keep = DuplicateFilter(LocationIndex(), ignore_case=True, any_separator=True)
+    assert len(list(filter(keep, entries))) == 2
+    assert keep.duplicates == 2
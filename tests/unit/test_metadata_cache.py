@@ -0,0 +1,58 @@
+"""Unit-tests for the _metadata_cache module."""
+from pathlib import Path
+import sqlite3
+
+from click.testing import CliRunner
+
+from playlist_along._metadata_cache import MetadataCache
+
+
+def test_metadata_cache_returns_only_fresh_records(runner: CliRunner) -> None:
+    """It returns metadata only for the same size and mtime."""
+    with runner.isolated_filesystem():
+        with MetadataCache(Path("cache.sqlite3")) as cache:
+            cache.put("/music/Track 01.mp3", 100, 1, 22)
+            assert cache.get("/music/Track 01.mp3", 100, 1) == 22
+            assert cache.get("/music/Track 01.mp3", 100, 2) is None
+            assert cache.get("/music/Track 02.mp3", 100, 1) is None
+            assert (cache.hits, cache.misses) == (1, 2)
+        with MetadataCache(Path("cache.sqlite3")) as cache:
+            assert cache.get("/music/Track 01.mp3", 100, 1) == 22
+
+
+def test_metadata_cache_keeps_recently_used_records(runner: CliRunner) -> None:
+    """It deletes least recently used records over the limit."""
+    with runner.isolated_filesystem():
+        with MetadataCache(Path("cache.sqlite3"), max_entries=2) as cache:
+            for i in range(3):
+                cache.put(f"Track {i}.mp3", 1, 1, i)
+        with MetadataCache(Path("cache.sqlite3")) as cache:
+            assert cache.get("Track 0.mp3", 1, 1) is None
+            assert cache.get("Track 2.mp3", 1, 1) == 2
+
+
+def test_metadata_cache_recreates_broken_database(runner: CliRunner) -> None:
+    """It ignores a broken cache file."""
+    with runner.isolated_filesystem():
+        Path("cache.sqlite3").write_text("Not a database at all" * 100)
+        with MetadataCache(Path("cache.sqlite3")) as cache:
+            assert cache.get("Track 0.mp3", 1, 1) is None
+
+
+def test_metadata_cache_uses_database_with_titles(runner: CliRunner) -> None:
+    """It reads and writes cache, which was created with column of titles."""
+    with runner.isolated_filesystem():
+        connection = sqlite3.connect("cache.sqlite3")
+        connection.execute(
+            "CREATE TABLE audio (path TEXT PRIMARY KEY, size INTEGER, "
+            "mtime_ns INTEGER, duration INTEGER, title TEXT, used_at REAL)"
+        )
+        connection.execute(
+            "INSERT INTO audio VALUES ('Track 1.mp3', 1, 1, 11, 'Track 1', 0)"
+        )
+        connection.commit()
+        connection.close()
+        with MetadataCache(Path("cache.sqlite3")) as cache:
+            assert cache.get("Track 1.mp3", 1, 1) == 11
+            cache.put("Track 2.mp3", 1, 1, 22)
+            assert cache.get("Track 2.mp3", 1, 1) == 22
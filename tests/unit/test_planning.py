@@ -0,0 +1,85 @@
+"""Unit-tests for the _planning module."""
+import os
+from pathlib import Path
+from typing import List
+
+import pytest
+from pytest_mock import MockFixture
+
+from playlist_along import _planning
+from playlist_along._copying import CopyTask
+
+
+def make_tasks(sizes: List[int]) -> List[CopyTask]:
+    """Return copy tasks with given sizes."""
+    return [
+        CopyTask(Path(f"Track {size}.mp3"), Path(f"sub/Track {size}.mp3"), size)
+        for size in sizes
+    ]
+
+
+def test_stat_tracks_finds_only_existing_files(
+    tmp_path: Path, mocker: MockFixture
+) -> None:
+    """It lists folder once and stats only its listed files."""
+    for name in ("Track 01.mp3", "Track 02.flac"):
+        (tmp_path / name).write_text(f"Here are music bytes of {name}")
+    (tmp_path / "Folder.mp3").mkdir()
+    scandir = mocker.spy(os, "scandir")
+    os_stat = mocker.spy(os, "stat")
+    tracks = [
+        str(tmp_path / name)
+        for name in ("Track 01.mp3", "Track 02.flac", "Absent.mp3", "Folder.mp3")
+    ]
+    stats = _planning.stat_tracks(tracks)
+    assert scandir.call_count == 1
+    assert os_stat.call_count == 0
+    assert sorted(stats) == tracks[:2]
+    assert stats[tracks[1]].st_size == len("Here are music bytes of Track 02.flac")
+
+
+def test_stat_tracks_checks_names_differing_in_case(
+    tmp_path: Path, mocker: MockFixture
+) -> None:
+    """It stats name separately, only if listing has it in another case."""
+    (tmp_path / "Track 01.mp3").write_text("Here are music bytes")
+    os_stat = mocker.spy(os, "stat")
+    _planning.stat_tracks([str(tmp_path / "TRACK 01.mp3"), str(tmp_path / "A.mp3")])
+    assert os_stat.call_args_list == [mocker.call(str(tmp_path / "TRACK 01.mp3"))]
+
+
+def test_balance_tasks_mixes_large_and_small_files() -> None:
+    """It puts the largest and the smallest files in turn."""
+    tasks = make_tasks([5, 100, 1, 50, 10])
+    balanced = _planning.balance_tasks(tasks)
+    assert [task.size for task in balanced] == [100, 1, 50, 5, 10]
+
+
+def test_plan_counts_replaced_files_as_free_space(
+    tmp_path: Path, mocker: MockFixture
+) -> None:
+    """It subtracts size of replaced files, if free space isn't enough."""
+    mocker.patch("shutil.disk_usage", return_value=mocker.Mock(free=100))
+    target = tmp_path / "Track 01.mp3"
+    target.write_bytes(b"0" * 60)
+    plan = _planning.CopyPlan([CopyTask(Path("Track 01.mp3"), target, 150)])
+    assert not plan.check_space(tmp_path)
+    assert plan.check_space(tmp_path, replaces=True)
+    assert plan.required_space == 90
+
+
+@pytest.mark.parametrize(
+    "seconds, expected", [(42.4, "42 s"), (150, "2 min 30 s"), (3900, "1 h 5 min")]
+)
+def test_format_duration(seconds: float, expected: str) -> None:
+    """It shows duration in the largest units."""
+    assert _planning.format_duration(seconds) == expected
+
+
+def test_estimate_is_limited_by_files_per_second() -> None:
+    """It takes the slowest of reading speed and limits."""
+    plan = _planning.CopyPlan(make_tasks([1000] * 10))
+    assert _planning.estimate_seconds(plan, 1000.0) == 10
+    assert _planning.estimate_seconds(plan, 1000.0, 500) == 20
+    assert _planning.estimate_seconds(plan, 1000.0, 500, 0.1) == 100
+    assert _planning.estimate_seconds(plan, None) is None
@@ -160,3 +160,148 @@ def test_playlist_fails_on_retreving_file_stat(
     with pytest.raises(ClickException) as exc_info:
         _ = playlist.is_file_too_small(Path("AnyPath.m3u"))
     assert exc_info.typename == "ClickException"
+
+
+def test_playlist_converts_lines_for_vlc_in_single_pass() -> None:
+    """It converts lines like consecutive conversion functions do."""
+    content = (
+        "#EXTM3U\n"
+        "#EXTINF:123,Artist - Title\n"
+        "D:\\Music\\Album #1\\Track [01].mp3\n"
+        "http://radio.example.com/stream.mp3\n"
+        "  /home/user/#Track 02.flac  \n"
+        "\n"
+    )
+    converted = list(playlist.convert_lines_for_vlc_android(content.splitlines()))
+    expected_content = playlist.substitute_vlc_invalid_characters(
+        playlist.make_relatives_paths_in_playlist(
+            playlist.clean_m3u_from_links(content)
+        )
+    )
+    assert converted == [
+        "#EXTM3U",
+        "#EXTINF:123,Artist - Title",
+        "Track %5B01%5D.mp3",
+        "%23Track 02.flac",
+    ]
+    assert "".join(line + "\n" for line in converted) == expected_content
+
+
+def test_playlist_reads_lines_lazily_like_splitlines(runner: CliRunner) -> None:
+    """It yields the same lines as 'splitlines()' for full content."""
+    with runner.isolated_filesystem():
+        content = "#EXTM3U\r\nTrack 01.mp3\x0c\n\nTrack 02.flac"
+        Path("temp.m3u").write_bytes(content.encode("utf-8"))
+        lines = playlist.read_playlist_lines(Path("temp.m3u"), "utf-8")
+        full_content = Path("temp.m3u").read_text(encoding="utf-8")
+        assert list(lines) == full_content.splitlines()
+
+
+def test_playlist_writer_keeps_target_on_error(runner: CliRunner) -> None:
+    """It does not touch target file if writing fails."""
+    with runner.isolated_filesystem():
+        target = Path("temp.m3u").resolve()
+        target.write_text("Track 01.mp3\n")
+        with pytest.raises(ClickException):
+            with playlist.PlaylistWriter(target, "cp1252") as writer:
+                writer.write_lines(["Track 02.mp3", "Кирилл.mp3"])
+        assert target.read_text() == "Track 01.mp3\n"
+        assert list(target.parent.iterdir()) == [target]
+
+
+def test_playlist_parses_entries_with_extended_info(runner: CliRunner) -> None:
+    """It parses header, entries with #EXTINF and comments."""
+    with runner.isolated_filesystem():
+        content = (
+            "#EXTM3U\n"
+            "#EXTINF:123,Artist - Title\n"
+            "D:\\Music\\Track 01.mp3\n"
+            "\n"
+            "# Just a comment.mp3\n"
+            "http://radio.example.com/stream.mp3\n"
+            "#EXTINF:-1,\n"
+        )
+        Path("temp.m3u").write_text(content, encoding="utf-8")
+        pls = playlist.Playlist("temp.m3u").load()
+        assert pls.entries is not None
+        first, second = pls.entries
+        assert pls.header == "#EXTM3U"
+        assert (first.duration, first.title) == (123, "Artist - Title")
+        assert first.location == "D:\\Music\\Track 01.mp3"
+        assert second.comments == ("", "# Just a comment.mp3")
+        assert second.duration is None
+        assert pls.trailing_comments == ("#EXTINF:-1,",)
+        assert list(pls.iter_local_tracks()) == [
+            "D:\\Music\\Track 01.mp3",
+            "# Just a comment.mp3",
+        ]
+        assert list(pls.iter_lines()) == content.splitlines()
+
+
+def test_playlist_reads_file_only_once_after_load(
+    runner: CliRunner,
+    mocker: MockFixture,
+) -> None:
+    """It uses parsed entries instead of reading file again."""
+    read_lines = mocker.spy(playlist, "read_playlist_lines")
+    with runner.isolated_filesystem():
+        Path("temp.m3u").write_text("#EXTM3U\nTrack 01.mp3\n", encoding="utf-8")
+        pls = playlist.Playlist("temp.m3u").load()
+        assert list(pls.iter_lines()) == ["#EXTM3U", "Track 01.mp3"]
+        assert list(pls.iter_local_tracks()) == ["Track 01.mp3"]
+        assert read_lines.call_count == 1
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        "D:\\Music\\Track 01.mp3",
+        "/music/Track 01.flac",
+        "Track.flac.mp3",
+        "Track 01.mp3 ",
+        "D:\\Music\\.mp3",
+        "/music/.flac",
+        "C:.mp3",
+        "//server/share.mp3",
+        "\\\\server\\share.mp3",
+        "/music/Track 01.mp3/",
+        "/music/Track 01.mp3/.",
+        "Track 01.MP3",
+        "http://example.com/Track 01.mp3",
+        "",
+    ],
+)
+def test_playlist_checks_local_track_like_path_suffix(line: str) -> None:
+    """It checks line endings with the same result as Path suffix check."""
+    expected = Path(line).suffix in playlist.SONG_FORMATS and "://" not in line
+    assert playlist.is_local_track(line) == expected
+
+
+def test_playlist_yields_tracks_without_parsing_entries(runner: CliRunner) -> None:
+    """It yields the same tracks for not loaded playlist."""
+    content = "#EXTM3U\n#EXTINF:1,Title.mp3\nD:\\Track 01.mp3\n\n#Comment.flac\n"
+    with runner.isolated_filesystem():
+        Path("temp.m3u").write_text(content + "Track 02.flac\n", encoding="utf-8")
+        loaded = list(playlist.Playlist("temp.m3u").load().iter_local_tracks())
+        streamed = list(playlist.Playlist("temp.m3u").iter_local_tracks())
+        assert loaded == streamed == [
+            "#EXTINF:1,Title.mp3",
+            "D:\\Track 01.mp3",
+            "#Comment.flac",
+            "Track 02.flac",
+        ]
+
+
+def test_playlist_yields_comment_lines_with_audio_extension(
+    runner: CliRunner,
+) -> None:
+    """It lists comment lines ending with audio extension as tracks."""
+    content = "#EXTM3U\n#EXTINF:2,x.mp3\nTrack 01.mp3\n"
+    with runner.isolated_filesystem():
+        Path("temp.m3u").write_text(content, encoding="utf-8")
+        expected = playlist.get_local_tracks_without_comment_lines(content)
+        assert expected == ["#EXTINF:2,x.mp3", "Track 01.mp3"]
+        streamed = playlist.Playlist("temp.m3u")
+        assert list(streamed.iter_local_tracks()) == expected
+        loaded = playlist.Playlist("temp.m3u").load()
+        assert list(loaded.iter_local_tracks()) == expected
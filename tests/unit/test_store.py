@@ -0,0 +1,103 @@
+"""Unit-tests for the _store module."""
+import os
+from pathlib import Path
+import platform
+from typing import List
+
+import pytest
+from pytest_mock import MockFixture
+
+from playlist_along import _store
+from playlist_along._copying import CopyReport, CopyTask
+
+
+def make_tasks(sources: List[Path], destination: Path) -> List[CopyTask]:
+    """Return copy tasks of sources into destination."""
+    destination.mkdir(exist_ok=True)
+    return [
+        CopyTask(
+            source,
+            destination / source.name,
+            source.stat().st_size,
+            source.stat().st_mtime_ns,
+        )
+        for source in sources
+    ]
+
+
+@pytest.fixture
+def library(tmp_path: Path) -> List[Path]:
+    """Fixture of tracks, two of them have the same content."""
+    tracks = []
+    for name, content in [("01.mp3", "one"), ("02.mp3", "two"), ("03.mp3", "one")]:
+        track = tmp_path / "library" / name
+        track.parent.mkdir(exist_ok=True)
+        track.write_text(f"Here are music bytes of {content}")
+        tracks.append(track)
+    return tracks
+
+
+def test_store_keeps_identical_tracks_once(
+    tmp_path: Path, library: List[Path]
+) -> None:
+    """It stores the same content once and hard links it into folders."""
+    store = _store.TrackStore(tmp_path / "store")
+    report = CopyReport()
+    store.run_copy_tasks(make_tasks(library, tmp_path / "a"), report, jobs=2)
+    store.run_copy_tasks(make_tasks(library[:2], tmp_path / "b"), report)
+    assert report.errors == {}
+    assert (store.added, store.reused) == (2, 3)
+    assert os.path.samefile(tmp_path / "a" / "01.mp3", tmp_path / "a" / "03.mp3")
+    assert os.path.samefile(tmp_path / "a" / "02.mp3", tmp_path / "b" / "02.mp3")
+    stored = list((tmp_path / "store" / _store.STORE_OBJECTS_DIR).glob("*/*.mp3"))
+    assert len(stored) == 2
+
+
+def test_store_reads_only_changed_tracks_again(
+    tmp_path: Path, library: List[Path], mocker: MockFixture
+) -> None:
+    """It takes hashes of unchanged tracks from cache."""
+    store = _store.TrackStore(tmp_path / "store")
+    store.run_copy_tasks(make_tasks(library, tmp_path / "a"), CopyReport())
+    library[1].write_text("Here are new music bytes")
+    digest = mocker.spy(_store, "calculate_file_digest")
+    report = CopyReport()
+    store.run_copy_tasks(make_tasks(library, tmp_path / "b"), report)
+    assert digest.call_count == 1
+    assert (tmp_path / "b" / "02.mp3").read_text() == "Here are new music bytes"
+    assert len(report.copied) == 3
+
+
+@pytest.mark.skipif(
+    platform.system() == "Windows", reason="symlinks need privileges on Windows"
+)
+def test_store_makes_symlinks(tmp_path: Path, library: List[Path]) -> None:
+    """It links tracks by symbolic links with 'symlink'."""
+    store = _store.TrackStore(tmp_path / "store", symlink=True)
+    store.run_copy_tasks(make_tasks(library, tmp_path / "a"), CopyReport())
+    track = tmp_path / "a" / "01.mp3"
+    assert track.is_symlink()
+    assert track.read_text() == "Here are music bytes of one"
+
+
+def test_store_registers_missing_track(tmp_path: Path, library: List[Path]) -> None:
+    """It registers error of unreadable track and exports other ones."""
+    tasks = make_tasks(library, tmp_path / "a")
+    library[0].unlink()
+    report = CopyReport()
+    _store.TrackStore(tmp_path / "store").run_copy_tasks(tasks, report)
+    assert list(report.errors) == [str(library[0])]
+    assert len(report.copied) == 2
+    assert not list((tmp_path / "a").glob(".*.part"))
+
+
+def test_hash_cache_recreates_broken_database(tmp_path: Path) -> None:
+    """It ignores a broken cache file like metadata cache."""
+    file = tmp_path / "cache" / _store.HASH_CACHE_FILE_NAME
+    file.parent.mkdir()
+    file.write_text("Not a database at all" * 100)
+    with _store.HashCache(file) as cache:
+        assert cache.get("Track 01.mp3", 1, 1) is None
+        cache.put("Track 01.mp3", 1, 1, "digest")
+    with _store.HashCache(file) as cache:
+        assert cache.get("Track 01.mp3", 1, 1) == "digest"
@@ -0,0 +1,88 @@
+"""Unit-tests for the _throttling module."""
+from pathlib import Path
+from typing import List
+
+import pytest
+from pytest_mock import MockFixture
+
+from playlist_along import _throttling
+from playlist_along import _transfer
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [("100", 100), ("512K", 524288), ("1.5m", 1572864), ("1GiB", 1073741824)],
+)
+def test_parse_size(value: str, expected: int) -> None:
+    """It converts size with unit into bytes."""
+    assert _throttling.parse_size(value) == expected
+
+
+@pytest.mark.parametrize("value", ["", "fast", "10T", "0K"])
+def test_parse_size_fails_on_wrong_value(value: str) -> None:
+    """It raises error for not a size."""
+    with pytest.raises(ValueError):
+        _throttling.parse_size(value)
+
+
+def test_token_bucket_waits_for_borrowed_tokens(mocker: MockFixture) -> None:
+    """It lets burst of capacity and then keeps the rate."""
+    mocker.patch("time.monotonic", return_value=100.0)
+    bucket = _throttling.TokenBucket(rate=10)
+    assert bucket.reserve(10) == 0.0
+    assert bucket.reserve(5) == pytest.approx(0.5)
+    assert bucket.reserve(5) == pytest.approx(1.0)
+    mocker.patch("time.monotonic", return_value=101.0)
+    assert bucket.reserve(1) == pytest.approx(0.1)
+
+
+@pytest.mark.parametrize("kernel_copy", [True, False])
+def test_backend_copies_within_bandwidth(
+    tmp_path: Path, mocker: MockFixture, kernel_copy: bool
+) -> None:
+    """It reserves bandwidth before each small chunk and waits for it."""
+    delays: List[float] = []
+    reserved: List[int] = []
+    mocker.patch("time.monotonic", return_value=100.0)
+    mocker.patch("time.sleep", side_effect=delays.append)
+    # Cloned file isn't transferred, so it isn't throttled
+    mocker.patch.object(_transfer, "KERNEL_METHODS", _transfer.KERNEL_METHODS[1:])
+    source = tmp_path / "Track 01.mp3"
+    source.write_bytes(b"0" * 2 * 1024**2)
+    target = tmp_path / "copy.mp3"
+    throttle = _throttling.CopyThrottle(max_bandwidth=1024**2)
+    wait_bytes = throttle.wait_bytes
+
+    def reserve(size: int) -> None:
+        written = target.stat().st_size if target.exists() else 0
+        assert written <= sum(reserved)
+        reserved.append(size)
+        wait_bytes(size)
+
+    mocker.patch.object(throttle, "wait_bytes", side_effect=reserve)
+    backend = _transfer.TransferBackend(throttle=throttle)
+    backend.kernel_copy = kernel_copy and _transfer.IS_LINUX
+    backend.transfer(source, target)
+    assert sum(reserved) == 2 * 1024**2
+    assert max(reserved) == 1024**2 // 10
+    assert delays[-1] == pytest.approx(1.0)
+    assert target.read_bytes() == source.read_bytes()
+
+
+@pytest.mark.parametrize(
+    "rate, expected", [(100, 65536), (2 * 1024**2, 209715), (1024**3, 1048576)]
+)
+def test_throttled_chunk_takes_tenth_of_second(rate: int, expected: int) -> None:
+    """It caps size of chunk by bandwidth within limits."""
+    assert _transfer.get_throttled_chunk_size(rate) == expected
+
+
+def test_throughput_meter_shows_current_and_average(mocker: MockFixture) -> None:
+    """It shows throughput of the last seconds and of the whole time."""
+    monotonic = mocker.patch("time.monotonic", return_value=0.0)
+    meter = _throttling.ThroughputMeter(window=2.0)
+    monotonic.return_value = 1.0
+    meter.add(4 * 1024**2)
+    monotonic.return_value = 4.0
+    line = meter.add(2 * 1024**2)
+    assert line == "1.0 MiB/s (avg 1.5 MiB/s)"
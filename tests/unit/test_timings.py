@@ -0,0 +1,44 @@
+"""Unit-tests for the _timings module."""
+import json
+import time
+from typing import Iterator
+
+from playlist_along._timings import StageTimings
+
+
+def test_timings_record_nothing_when_disabled() -> None:
+    """It passes iterables through and records nothing by default."""
+    timings = StageTimings()
+    lines = ["a", "b"]
+    assert timings.iter_stage("read", lines) is lines
+    with timings.measure("write") as stage:
+        stage.items += 1
+    assert timings.stages == {}
+
+
+def test_timings_exclude_time_of_nested_stages() -> None:
+    """It counts items and excludes time of nested stages."""
+    timings = StageTimings()
+    timings.start()
+
+    def slow_lines() -> Iterator[str]:
+        time.sleep(0.05)
+        yield from ["a", "b", "c"]
+
+    with timings.measure("write") as stage:
+        for _ in timings.iter_stage("read", slow_lines()):
+            stage.items += 1
+        stage.bytes = 3
+    timings.stop()
+    data = timings.as_dict()
+    stages = {stage["stage"]: stage for stage in data["stages"]}
+    assert stages["write"]["items"] == 3 and stages["write"]["bytes"] == 3
+    assert stages["read"]["items"] == 3
+    assert stages["write"]["seconds"] < 0.05 <= data["total_seconds"]
+    assert json.loads(timings.format_json()) == data
+    assert timings.format_table().splitlines()[0].split() == [
+        "Stage",
+        "Seconds",
+        "Bytes",
+        "Items",
+    ]
@@ -0,0 +1,92 @@
+"""Unit-tests for the _transfer module."""
+import errno
+import os
+from pathlib import Path
+import platform
+
+import pytest
+from pytest_mock import MockFixture
+
+from playlist_along import _transfer
+
+
+linux_only = pytest.mark.skipif(
+    platform.system() != "Linux", reason="in-kernel copy is only on Linux"
+)
+
+
+@pytest.fixture
+def source(tmp_path: Path) -> Path:
+    """Fixture of track with old modification time."""
+    track = tmp_path / "Track 01.mp3"
+    track.write_bytes(b"Here are music bytes" * 1000)
+    os.utime(track, ns=(1_000_000_000, 1_000_000_000))
+    return track
+
+
+@linux_only
+def test_transfer_copies_in_kernel(source: Path, tmp_path: Path) -> None:
+    """It copies content and metadata without user space buffers."""
+    target = tmp_path / "copy.mp3"
+    method = _transfer.TransferBackend().transfer(source, target)
+    assert method in (_transfer.METHOD_CLONE, _transfer.METHOD_COPY_FILE_RANGE)
+    assert target.read_bytes() == source.read_bytes()
+    assert target.stat().st_mtime_ns == 1_000_000_000
+
+
+def test_transfer_makes_hardlink_if_allowed(source: Path, tmp_path: Path) -> None:
+    """It links file on the same drive with 'hardlink'."""
+    target = tmp_path / "link.mp3"
+    method = _transfer.TransferBackend(hardlink=True).transfer(source, target)
+    assert method == _transfer.METHOD_HARDLINK
+    assert os.path.samefile(source, target)
+
+
+@linux_only
+def test_transfer_falls_back_to_copy2(
+    source: Path, tmp_path: Path, mocker: MockFixture
+) -> None:
+    """It copies file by shutil.copy2, if in-kernel methods are unsupported."""
+    mocker.patch("fcntl.ioctl", side_effect=OSError(errno.ENOTTY, "Not a tty"))
+    mocker.patch("os.copy_file_range", side_effect=OSError(errno.EXDEV, "Cross"))
+    mocker.patch("os.sendfile", side_effect=OSError(errno.ENOSYS, "No sendfile"))
+    target = tmp_path / "copy.mp3"
+    method = _transfer.TransferBackend().transfer(source, target)
+    assert method == _transfer.METHOD_COPY
+    assert target.read_bytes() == source.read_bytes()
+    assert target.stat().st_mtime_ns == 1_000_000_000
+
+
+@linux_only
+def test_transfer_fails_on_partial_kernel_copy(
+    source: Path, tmp_path: Path, mocker: MockFixture
+) -> None:
+    """It raises error, if file is copied partially."""
+    mocker.patch("fcntl.ioctl", side_effect=OSError(errno.ENOTTY, "Not a tty"))
+    mocker.patch("os.copy_file_range", side_effect=[10, OSError(errno.EIO, "EIO")])
+    with pytest.raises(OSError):
+        _transfer.TransferBackend().transfer(source, tmp_path / "copy.mp3")
+
+
+@linux_only
+def test_transfer_falls_back_if_kernel_copies_nothing(
+    source: Path, tmp_path: Path, mocker: MockFixture
+) -> None:
+    """It tries the next method, if the first call reports end of file."""
+    mocker.patch("fcntl.ioctl", side_effect=OSError(errno.ENOTTY, "Not a tty"))
+    mocker.patch("os.copy_file_range", return_value=0)
+    target = tmp_path / "copy.mp3"
+    method = _transfer.TransferBackend().transfer(source, target)
+    assert method == _transfer.METHOD_SENDFILE
+    assert target.read_bytes() == source.read_bytes()
+
+
+@linux_only
+def test_transfer_fails_on_short_kernel_copy(
+    source: Path, tmp_path: Path, mocker: MockFixture
+) -> None:
+    """It raises error, if end of file is reported before its size."""
+    mocker.patch("fcntl.ioctl", side_effect=OSError(errno.ENOTTY, "Not a tty"))
+    mocker.patch("os.copy_file_range", side_effect=[10, 0])
+    with pytest.raises(OSError, match="Copied 10 of 20000 bytes"):
+        _transfer.TransferBackend().transfer(source, tmp_path / "copy.mp3")
@@ -3,11 +3,14 @@
 from pathlib import Path
 from unittest.mock import Mock
 
+import charset_normalizer
 from click import ClickException
+from click.testing import CliRunner
 import pytest
 from pytest_mock import MockFixture
 
 from playlist_along._utils import _detect_file_encoding
+from playlist_along._utils import encoding_cache, EncodingCache
 
 
 @pytest.fixture
@@ -32,3 +35,89 @@ def test_util_fails_on_encoding_detection_error(
     with pytest.raises(ClickException) as exc_info:
         _ = _detect_file_encoding(Path("AnyPath.m3u"))
     assert exc_info.typename == "ClickException"
+
+
+def test_util_detects_encoding_once_for_unchanged_file(
+    runner: CliRunner,
+    mocker: MockFixture,
+) -> None:
+    """It takes encoding from cache for unchanged file."""
+    encoding_cache.clear()
+    from_path = mocker.spy(charset_normalizer, "from_path")
+    with runner.isolated_filesystem():
+        playlist = Path("temp.m3u")
+        playlist.write_text("Кирилл - Track_01!.mp3\n", encoding="cp1251")
+        first = _detect_file_encoding(playlist)
+        second = _detect_file_encoding(playlist)
+        assert first == second == "cp1251"
+        assert from_path.call_count == 1
+
+        playlist.write_text("Мефодий - Track_02!.mp3\n", encoding="cp1251")
+        _detect_file_encoding(playlist)
+        assert from_path.call_count == 2
+
+
+def test_encoding_cache_evicts_least_recently_used() -> None:
+    """It keeps only 'max_size' recently used encodings."""
+    cache = EncodingCache(max_size=2)
+    cache.put(("a.m3u", 1, 1), "utf-8")
+    cache.put(("b.m3u", 1, 1), "cp1251")
+    assert cache.get(("a.m3u", 1, 1)) == "utf-8"
+    cache.put(("c.m3u", 1, 1), "cp1252")
+    assert len(cache) == 2
+    assert cache.get(("b.m3u", 1, 1)) is None
+    assert cache.get(("a.m3u", 1, 1)) == "utf-8"
+
+
+def test_encoding_cache_is_saved_and_loaded(runner: CliRunner) -> None:
+    """It keeps encodings in file between runs."""
+    with runner.isolated_filesystem():
+        cache_file = Path("cache", "encodings.json")
+        cache = EncodingCache()
+        cache.load(cache_file)
+        cache.put(("a.m3u", 1, 1), "cp1251")
+        cache.save()
+
+        loaded = EncodingCache()
+        loaded.load(cache_file)
+        assert loaded.get(("a.m3u", 1, 1)) == "cp1251"
+
+
+@pytest.mark.parametrize(
+    "content, expected",
+    [
+        (b"\xef\xbb\xbfTrack 01.mp3\n", "utf-8-sig"),
+        ("﻿Track 01.mp3\n".encode("utf-16-le"), "utf_16_le"),
+        ("Кирилл - Track_01!.mp3\n".encode("utf-8"), "utf-8"),
+        (b"Track 01.mp3\n", "utf-8"),
+    ],
+)
+def test_util_detects_obvious_encoding_without_statistics(
+    runner: CliRunner,
+    mocker: MockFixture,
+    content: bytes,
+    expected: str,
+) -> None:
+    """It detects encoding by BOM or UTF-8 decoding of sample only."""
+    encoding_cache.clear()
+    from_path = mocker.spy(charset_normalizer, "from_path")
+    with runner.isolated_filesystem():
+        playlist = Path("temp.m3u")
+        playlist.write_bytes(content)
+        assert _detect_file_encoding(playlist) == expected
+        from_path.assert_not_called()
+
+
+def test_util_detects_statistically_after_ascii_sample(
+    runner: CliRunner,
+    mocker: MockFixture,
+) -> None:
+    """It performs statistical detection if sample has only ASCII characters."""
+    encoding_cache.clear()
+    from_path = mocker.spy(charset_normalizer, "from_path")
+    with runner.isolated_filesystem():
+        playlist = Path("temp.m3u")
+        content = "Track 01.mp3\nКирилл - Track_02!.mp3\n".encode("cp1251")
+        playlist.write_bytes(content)
+        assert _detect_file_encoding(playlist, sample_size=8) == "cp1251"
+        from_path.assert_called_once()
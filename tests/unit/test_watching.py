@@ -0,0 +1,76 @@
+"""Unit-tests for the _watching module."""
+import os
+from pathlib import Path
+from typing import List
+
+from click.testing import CliRunner
+
+from playlist_along._watching import PlaylistWatcher
+
+
+def test_watcher_reports_settled_changes_once(runner: CliRunner) -> None:
+    """It reports a burst of changes once after debounce time."""
+    with runner.isolated_filesystem():
+        playlist = Path("a.m3u")
+        playlist.write_text("Track 01.mp3\n")
+        now: List[float] = [0.0]
+        watcher = PlaylistWatcher(lambda: [playlist], 2.0, clock=lambda: now[0])
+        watcher.prime()
+        assert watcher.poll() == []
+
+        playlist.write_text("Track 01.mp3\nTrack 02.mp3\n")
+        assert watcher.poll() == []
+        now[0] = 1.5
+        playlist.write_text("Track 01.mp3\nTrack 02.mp3\nTrack 03.mp3\n")
+        assert watcher.poll() == []
+        now[0] = 3.0
+        assert watcher.poll() == []
+        now[0] = 3.5
+        assert watcher.poll() == [playlist.absolute()]
+
+        watcher.mark_processed(playlist.absolute())
+        now[0] = 10.0
+        assert watcher.poll() == []
+
+
+def test_watcher_ignores_files_written_by_itself(runner: CliRunner) -> None:
+    """It doesn't report files, which current state is ignored."""
+    with runner.isolated_filesystem():
+        converted = Path("a_vlc.m3u")
+        watcher = PlaylistWatcher(lambda: sorted(Path().glob("*.m3u")))
+        converted.write_text("Track 01.mp3\n")
+        watcher.ignore_current_state(converted)
+        assert watcher.poll() == []
+
+        os.utime(converted, ns=(1, 1))
+        assert watcher.poll() == [converted.absolute()]
+
+
+def test_watcher_retries_failed_playlist_with_backoff(runner: CliRunner) -> None:
+    """It reports unchanged failed playlist after doubled delays only."""
+    with runner.isolated_filesystem():
+        playlist = Path("a.m3u")
+        playlist.write_text("Track 01.mp3\n")
+        now: List[float] = [0.0]
+        watcher = PlaylistWatcher(lambda: [playlist], clock=lambda: now[0])
+        path = playlist.absolute()
+        assert watcher.poll() == [path]
+
+        watcher.mark_failed(path)
+        now[0] = 4.0
+        assert watcher.poll() == []
+        now[0] = 5.0
+        assert watcher.poll() == [path]
+
+        watcher.mark_failed(path)
+        now[0] = 14.0
+        assert watcher.poll() == []
+        now[0] = 15.0
+        assert watcher.poll() == [path]
+
+        watcher.mark_failed(path)
+        playlist.write_text("Track 01.mp3\nTrack 02.mp3\n")
+        assert watcher.poll() == [path]
+        watcher.mark_processed(path)
+        now[0] = 1000.0
+        assert watcher.poll() == []